@@ -0,0 +1,282 @@
+"""Card list, card lookup, ingest and vector indexing on synthetic catalogs.
+
+Builds a generated catalog (src/database/synthetic_data.py) per size in a
+scratch directory and measures:
+
+- cards: GET /api/cards filter scenarios through CardIndex (what the API
+  serves) and query_cards (the SQLite reference), plus the index build;
+  then GET /api/cards/autocomplete prefixes through NameIndex, and
+  POST /api/cards/resolve on a 60-line decklist with typos
+- card: single-card lookups through fetch_cards_by_ids (GET /api/cards/{id})
+- ingest: SWUApiClient.process_card_data and store_card_data on API-shaped
+  records, one commit per card as in build_database, on a build-profile
+  connection
+- vector: VectorDB.index_card and find_similar_cards against an in-process
+  Qdrant, with a deterministic local embedding in place of the OpenAI
+  call, so the numbers cover payload building and the upsert only; then
+  the card_neighbors build over the indexed cards and the precomputed
+  similar_cards lookup that replaces find_similar_cards
+
+Results are printed as JSON. Run from backend/:
+
+    python -m benchmarks.catalog [--sizes 1000,10000,100000] [--only cards,card]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import zlib
+from typing import Callable, Dict, List
+import numpy as np
+from src.api.card_filters import CardFilters
+from src.api.card_index import CardIndex
+from src.api.card_queries import fetch_cards_by_ids, load_all_cards, query_cards
+from src.api.name_index import NameIndex
+from src.database.synthetic_data import CATALOG_SIZES, build_catalog, to_api_record
+from src.api.swu_api_client import SWUApiClient
+
+BENCHMARKS = ("cards", "card", "ingest", "vector")
+
+# GET /api/cards filter combinations, from the bare list to the deck builder
+SCENARIOS: Dict[str, Callable[[List[Dict]], CardFilters]] = {
+    "all": lambda cards: CardFilters(),
+    "aspect": lambda cards: CardFilters(aspect=["Villainy"]),
+    "aspect_all": lambda cards: CardFilters(aspect=["Aggression", "Villainy"], aspect_mode="all"),
+    "type_cost": lambda cards: CardFilters(type=["Unit"], cost=[2, 3]),
+    "keyword": lambda cards: CardFilters(keyword=["Sentinel"]),
+    "trait_arena": lambda cards: CardFilters(trait=["Rebel"], arena=["Space"]),
+    "cost_range": lambda cards: CardFilters(ranges={"cost": (3, 5), "attack": (4, None)}),
+    "search": lambda cards: CardFilters(search="shield"),
+    "deck_builder": lambda cards: CardFilters(
+        leader=next(card["id"] for card in cards if card["type"] == "Leader"),
+        base=next(card["id"] for card in cards if card["type"] == "Base"),
+        type=["Unit"], ranges={"cost": (None, 4)},
+    ),
+}
+
+
+def _timings(func: Callable[[], object], repeat: int) -> Dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples) * 1e3, 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e3, 4),
+    }
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def bench_cards(db_path: str, cards: List[Dict], repeat: int) -> Dict:
+    conn = _connect(db_path)
+    try:
+        start = time.perf_counter()
+        index = CardIndex(load_all_cards(conn))
+        build_s = time.perf_counter() - start
+
+        scenarios = {}
+        for name, make_filters in SCENARIOS.items():
+            filters = make_filters(cards)
+            total, _ = index.query(filters)
+            scenarios[name] = {
+                "matches": total,
+                "index": _timings(lambda: index.query(filters, sort="cost", limit=20), repeat),
+                "sql": _timings(
+                    lambda: query_cards(conn, filters, sort="cost", limit=20), max(1, repeat // 5)
+                ),
+            }
+
+        start = time.perf_counter()
+        names = NameIndex(index.cards)
+        names_build_s = time.perf_counter() - start
+        # What a user types: one to six leading characters of a name
+        rng = random.Random(5)
+        prefixes = [card["name"][:rng.randint(1, 6)] for card in rng.sample(cards, min(len(cards), 200))]
+        autocomplete = {
+            "prefixes": len(prefixes),
+            "per_prefix": _timings(lambda: [names.complete(prefix) for prefix in prefixes], repeat),
+        }
+        autocomplete["per_prefix"] = {
+            key: round(value / len(prefixes), 4) for key, value in autocomplete["per_prefix"].items()
+        }
+        # One line in three misspelled by swapping two letters
+        decklist = []
+        for i, card in enumerate(rng.sample(cards, min(len(cards), 60))):
+            name = card["name"]
+            if i % 3 == 0 and len(name) > 4:
+                name = name[:2] + name[3] + name[2] + name[4:]
+            decklist.append(f"{rng.randint(1, 3)} {name}")
+        resolved = names.resolve(decklist)
+        resolve = {
+            "lines": len(decklist),
+            "matched": sum(result["match"] is not None for result in resolved),
+            "decklist": _timings(lambda: names.resolve(decklist), max(1, repeat // 5)),
+        }
+        return {"index_build_ms": round(build_s * 1e3, 1), "scenarios": scenarios,
+                "autocomplete_build_ms": round(names_build_s * 1e3, 1), "autocomplete": autocomplete,
+                "resolve": resolve}
+    finally:
+        conn.close()
+
+
+def bench_card(db_path: str, cards: List[Dict], repeat: int) -> Dict:
+    rng = random.Random(11)
+    card_ids = [rng.choice(cards)["id"] for _ in range(repeat)]
+    conn = _connect(db_path)
+    try:
+        lookups = iter(card_ids)
+        full = _timings(lambda: fetch_cards_by_ids(conn, [next(lookups)]), repeat)
+        lookups = iter(card_ids)
+        projected = _timings(
+            lambda: fetch_cards_by_ids(conn, [next(lookups)], ["id", "name", "energy_cost"]), repeat
+        )
+        return {"full": full, "projected": projected}
+    finally:
+        conn.close()
+
+
+def bench_ingest(cards: List[Dict], limit: int, scratch: str) -> Dict:
+    records = [to_api_record(card) for card in cards[:limit]]
+    with SWUApiClient(os.path.join(scratch, "ingest.db")) as client:
+        start = time.perf_counter()
+        processed = [client.process_card_data(record) for record in records]
+        process_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for card_dict, related_data in processed:
+            client.store_card_data(card_dict, related_data)
+        store_s = time.perf_counter() - start
+
+    return {
+        "cards": len(records),
+        "process_us_per_card": round(process_s / len(records) * 1e6, 1),
+        "store_us_per_card": round(store_s / len(records) * 1e6, 1),
+        "cards_per_s": round(len(records) / (process_s + store_s), 1),
+    }
+
+
+def _local_embedding(text: str, size: int = 1536) -> List[float]:
+    """Deterministic unit vector standing in for an OpenAI embedding."""
+    vector = np.random.default_rng(zlib.crc32(text.encode())).standard_normal(size)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def bench_vector(db_path: str, cards: List[Dict], limit: int, repeat: int) -> Dict:
+    from qdrant_client import QdrantClient
+    from src.api.card_neighbors import similar_cards, write_neighbors
+    from src.api.vector_db import VectorDB
+
+    vector_db = VectorDB.__new__(VectorDB)
+    vector_db.collection_name = "cards"
+    vector_db.rules_collection_name = "rules"
+    vector_db.qdrant = QdrantClient(":memory:")
+    vector_db.generate_embedding = _local_embedding
+    vector_db.setup_collections()
+
+    sample = cards[:limit]
+    start = time.perf_counter()
+    for card in sample:
+        vector_db.generate_card_embedding(card)
+    embed_s = time.perf_counter() - start
+
+    async def index_all():
+        for card in sample:
+            await vector_db.index_card(card)
+
+    start = time.perf_counter()
+    asyncio.run(index_all())
+    index_s = time.perf_counter() - start
+
+    rng = random.Random(13)
+    queries = iter([rng.choice(sample)["id"] for _ in range(repeat)])
+    search = _timings(lambda: asyncio.run(vector_db.find_similar_cards(next(queries))), repeat)
+
+    start = time.perf_counter()
+    card_ids, vectors = vector_db.card_vectors()
+    conn = sqlite3.connect(db_path)
+    try:
+        write_neighbors(conn, card_ids, vectors)
+        neighbors_s = time.perf_counter() - start
+        queries = iter([rng.choice(sample)["id"] for _ in range(repeat)])
+        lookup = _timings(lambda: similar_cards(conn, next(queries), 5), repeat)
+    finally:
+        conn.close()
+    return {
+        "cards": len(sample),
+        "index_us_per_card": round(index_s / len(sample) * 1e6, 1),
+        "upsert_us_per_card": round((index_s - embed_s) / len(sample) * 1e6, 1),
+        "similar": search,
+        "neighbors_build_s": round(neighbors_s, 3),
+        "similar_precomputed": lookup,
+    }
+
+
+def run(sizes=CATALOG_SIZES, only=BENCHMARKS, repeat: int = 50, ingest_cards: int = 2000,
+        vector_cards: int = 1000, seed: int = 7) -> Dict:
+    results: Dict = {"seed": seed, "repeat": repeat, "sizes": {}}
+    with tempfile.TemporaryDirectory() as scratch:
+        for size in sizes:
+            db_path = os.path.join(scratch, f"catalog_{size}.db")
+            start = time.perf_counter()
+            cards = build_catalog(db_path, size, seed)
+            result: Dict = {
+                "generate_s": round(time.perf_counter() - start, 2),
+                "db_bytes": os.path.getsize(db_path),
+            }
+            if "cards" in only:
+                result["cards"] = bench_cards(db_path, cards, repeat)
+            if "card" in only:
+                result["card"] = bench_card(db_path, cards, repeat)
+            if "ingest" in only:
+                result["ingest"] = bench_ingest(cards, min(size, ingest_cards), scratch)
+            if "vector" in only:
+                result["vector"] = bench_vector(db_path, cards, min(size, vector_cards), repeat)
+            results["sizes"][str(size)] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, CATALOG_SIZES)),
+                        help="Comma-separated catalog sizes")
+    parser.add_argument("--only", default=",".join(BENCHMARKS),
+                        help=f"Comma-separated subset of {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--ingest-cards", type=int, default=2000,
+                        help="Cards ingested per size (ingest commits per card)")
+    parser.add_argument("--vector-cards", type=int, default=1000,
+                        help="Cards indexed per size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    # Keep the ingest client's per-card INFO logging out of the measurements
+    logging.basicConfig(level=logging.WARNING)
+    results = run(
+        sizes=[int(size) for size in args.sizes.split(",")],
+        only=[name for name in args.only.split(",") if name],
+        repeat=args.repeat, ingest_cards=args.ingest_cards,
+        vector_cards=args.vector_cards, seed=args.seed,
+    )
+    body = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(body + "\n")
+    print(body)
+
+
+if __name__ == "__main__":
+    main()
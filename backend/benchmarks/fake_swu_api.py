@@ -0,0 +1,284 @@
+"""Local stand-in for the SWU admin API card-list endpoint.
+
+Serves a generated (src/database/synthetic_data.py) or recorded catalog
+at /api/card-list with Strapi pagination, and injects the failures ingest
+has to survive: latency, page size limits, rate limiting, 5xx responses
+and connections dropped before or during the response. Fault injection
+is seeded, so a run can be repeated.
+
+Run from backend/ and point the ingest client at it:
+
+    python -m benchmarks.fake_swu_api --cards 5000 --latency-ms 80 --error-rate 0.05
+    SWU_API_BASE_URL=http://127.0.0.1:8765/api/ python -m src.api.import_swu_data
+
+A recorded catalog is a JSON file holding either a list of card-list
+entries (e.g. SWUApiClient.fetch_all_cards() dumped with json.dump) or a
+single card-list response.
+"""
+import argparse
+import json
+import math
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from src.database.synthetic_data import generate_cards, to_api_record
+
+STRAPI_ERRORS = {
+    404: "NotFoundError",
+    429: "RateLimitError",
+    500: "InternalServerError",
+    502: "BadGatewayError",
+    503: "ServiceUnavailableError",
+}
+
+
+def load_catalog(path: str) -> List[Dict]:
+    """Card-list entries from a recorded catalog file."""
+    with open(path) as f:
+        data = json.load(f)
+    return data["data"] if isinstance(data, dict) else data
+
+
+def generated_catalog(count: int, seed: int = 7) -> List[Dict]:
+    return [to_api_record(card) for card in generate_cards(count, seed)]
+
+
+class FakeSWUApi:
+    """Threaded HTTP server answering /api/card-list like the SWU admin API.
+
+    Page sizes above max_page_size are clamped, as Strapi clamps to its
+    maxLimit. Each request independently may be rate limited (beyond
+    rate_limit requests per second, or at random with throttle_rate),
+    fail with a 5xx (error_rate) or have its connection dropped
+    (drop_rate), half of the drops after part of the body was sent.
+    """
+
+    def __init__(self, records: List[Dict], host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, max_page_size: int = 100,
+                 rate_limit: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1.0,
+                 error_rate: float = 0.0, drop_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            records: Card-list entries to serve, in order
+            host: Interface to bind
+            port: Port to bind; 0 picks a free one
+            latency_ms: Delay before every response
+            jitter_ms: Extra delay drawn uniformly from [0, jitter_ms]
+            max_page_size: Largest pagination[pageSize] honoured
+            rate_limit: Requests per second allowed before answering 429
+                (token bucket, burst of one second); 0 disables it
+            throttle_rate: Share of requests answered 429 regardless of rate
+            retry_after: Retry-After seconds sent with 429 responses
+            error_rate: Share of requests answered 500/502/503
+            drop_rate: Share of requests whose connection is dropped
+            seed: Seed for latency jitter and fault injection
+        """
+        self.records = records
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.max_page_size = max_page_size
+        self.rate_limit = rate_limit
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.stats = {"requests": 0, "pages": 0, "rate_limited": 0, "errors": 0, "dropped": 0}
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = rate_limit
+        self._refilled = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                api._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        """API root to pass to SWUApiClient(base_url=...)."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/"
+
+    def start(self) -> "FakeSWUApi":
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _rate_limited(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def _draw_fault(self) -> Tuple[Optional[str], int]:
+        """Wait out the latency and pick this request's fault, if any."""
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = (self.latency_ms + self._rng.uniform(0, self.jitter_ms)) / 1e3
+            if self._rate_limited() or self._rng.random() < self.throttle_rate:
+                fault = "rate_limited"
+            elif self._rng.random() < self.error_rate:
+                fault = "error"
+            elif self._rng.random() < self.drop_rate:
+                fault = "drop_early" if self._rng.random() < 0.5 else "drop_late"
+            else:
+                fault = None
+            error_status = self._rng.choice((500, 502, 503))
+        if delay:
+            time.sleep(delay)
+        return fault, error_status
+
+    def page(self, page: int, page_size: int) -> Dict:
+        """Strapi response body for a page of the catalog."""
+        page_size = max(1, min(page_size, self.max_page_size))
+        page = max(1, page)
+        start = (page - 1) * page_size
+        return {
+            "data": self.records[start:start + page_size],
+            "meta": {"pagination": {
+                "page": page,
+                "pageSize": page_size,
+                "pageCount": math.ceil(len(self.records) / page_size),
+                "total": len(self.records),
+            }},
+        }
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        url = urlsplit(handler.path)
+        if url.path.rstrip("/") != "/api/card-list":
+            self._send_error(handler, 404, "Not Found")
+            return
+
+        fault, error_status = self._draw_fault()
+        if fault == "rate_limited":
+            self._count("rate_limited")
+            self._send_error(handler, 429, "Too Many Requests",
+                             {"Retry-After": f"{self.retry_after:g}"})
+            return
+        if fault == "error":
+            self._count("errors")
+            self._send_error(handler, error_status, "Upstream failure")
+            return
+        if fault == "drop_early":
+            self._count("dropped")
+            self._drop(handler)
+            return
+
+        query = parse_qs(url.query)
+        try:
+            page = int(query.get("pagination[page]", ["1"])[0])
+            page_size = int(query.get("pagination[pageSize]", ["25"])[0])
+        except ValueError:
+            self._send_error(handler, 400, "Invalid pagination")
+            return
+        body = json.dumps(self.page(page, page_size)).encode()
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json; charset=utf-8")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        if fault == "drop_late":
+            self._count("dropped")
+            handler.wfile.write(body[:len(body) // 2])
+            handler.wfile.flush()
+            self._drop(handler)
+            return
+        handler.wfile.write(body)
+        self._count("pages")
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _send_error(self, handler: BaseHTTPRequestHandler, status: int, message: str,
+                    headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps({"data": None, "error": {
+            "status": status, "name": STRAPI_ERRORS.get(status, "ApplicationError"),
+            "message": message, "details": {},
+        }}).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json; charset=utf-8")
+        handler.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _drop(self, handler: BaseHTTPRequestHandler) -> None:
+        handler.close_connection = True
+        try:
+            handler.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--cards", type=int, default=1000, help="Size of a generated catalog")
+    source.add_argument("--catalog", help="Serve a recorded catalog instead")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--max-page-size", type=int, default=100)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    records = load_catalog(args.catalog) if args.catalog else generated_catalog(args.cards, args.seed)
+    api = FakeSWUApi(
+        records, host=args.host, port=args.port, latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, max_page_size=args.max_page_size, rate_limit=args.rate_limit,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+        error_rate=args.error_rate, drop_rate=args.drop_rate, seed=args.seed,
+    )
+    print(f"Serving {len(records)} cards at {api.base_url}card-list")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.server.server_close()
+        print(json.dumps(api.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""End-to-end ingest against the fake SWU API.
+
+Starts benchmarks.fake_swu_api on a free port with a generated catalog and
+the requested latency and faults, runs SWUApiClient.build_database into a
+scratch database and reports throughput, retries and what the server saw.
+Run from backend/:
+
+    python -m benchmarks.ingest [--cards 2000] [--latency-ms 50] [--error-rate 0.05]
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Dict
+from src.api.metrics import INGEST_RETRIES
+from src.api.swu_api_client import SWUApiClient
+from .fake_swu_api import FakeSWUApi, generated_catalog
+
+
+def run(cards: int = 2000, seed: int = 7, backoff: float = 0.05, max_retries: int = 5,
+        **server_options) -> Dict:
+    """Ingest a generated catalog through the fake API.
+
+    Args:
+        cards: Catalog size
+        seed: Catalog and fault injection seed
+        backoff: Client backoff; kept short so faults don't dominate the run
+        max_retries: Client retries per page
+        server_options: FakeSWUApi options (latency_ms, error_rate, ...)
+    """
+    records = generated_catalog(cards, seed)
+    retries_before = INGEST_RETRIES._value.get()
+    with tempfile.TemporaryDirectory() as scratch, \
+            FakeSWUApi(records, seed=seed, **server_options) as api:
+        with SWUApiClient(os.path.join(scratch, "ingest.db"), base_url=api.base_url,
+                          backoff=backoff, max_retries=max_retries) as client:
+            start = time.perf_counter()
+            client.build_database()
+            elapsed = time.perf_counter() - start
+            stored = client._get_db_connection().execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    return {
+        "cards": cards,
+        "stored": stored,
+        "seconds": round(elapsed, 3),
+        "cards_per_s": round(stored / elapsed, 1),
+        "client_retries": int(INGEST_RETRIES._value.get() - retries_before),
+        "server": api.stats,
+        "options": server_options,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--backoff", type=float, default=0.05)
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--max-page-size", type=int, default=100)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    # Keep the ingest client's per-card INFO logging out of the measurements
+    logging.basicConfig(level=logging.ERROR)
+    print(json.dumps(run(
+        cards=args.cards, seed=args.seed, backoff=args.backoff, max_retries=args.max_retries,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, max_page_size=args.max_page_size,
+        rate_limit=args.rate_limit, throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after, error_rate=args.error_rate, drop_rate=args.drop_rate,
+    ), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Overhead of the request metrics middleware and SQL instrumentation.
+
+Drives a minimal ASGI app and a one-route FastAPI app directly (no HTTP
+server, no test client) with and without MetricsMiddleware, and reads the
+same rows from SQLite with a plain sqlite3.Row factory and with
+instrument_connection. Run from backend/:
+
+    python -m benchmarks.metrics_overhead [--requests 20000] [--rows 10000]
+"""
+import argparse
+import asyncio
+import json
+import sqlite3
+import time
+from typing import Dict
+from fastapi import FastAPI
+from src.api.metrics import MetricsMiddleware, _request_sql, _SQLStats, instrument_connection
+
+SCOPE = {
+    "type": "http", "http_version": "1.1", "scheme": "http", "method": "GET",
+    "path": "/api/cards", "raw_path": b"/api/cards", "root_path": "",
+    "query_string": b"page=1", "headers": [], "server": ("test", 80), "client": ("test", 1),
+}
+
+
+async def _app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+async def _drive(app, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), _receive, _send)
+    return time.perf_counter() - start
+
+
+def middleware_overhead(requests: int) -> Dict:
+    bare = min(asyncio.run(_drive(_app, requests)) for _ in range(3))
+    measured = min(asyncio.run(_drive(MetricsMiddleware(_app), requests)) for _ in range(3))
+    return {
+        "bare_us": round(bare / requests * 1e6, 2),
+        "instrumented_us": round(measured / requests * 1e6, 2),
+        "overhead_us": round((measured - bare) / requests * 1e6, 2),
+    }
+
+
+def _fastapi_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+
+    @app.get("/api/cards")
+    async def cards(page: int = 1):
+        return {"page": page, "cards": []}
+
+    return app
+
+
+def fastapi_overhead(requests: int) -> Dict:
+    """The same comparison through a real FastAPI route, for scale."""
+    bare = min(asyncio.run(_drive(_fastapi_app(False), requests)) for _ in range(3))
+    measured = min(asyncio.run(_drive(_fastapi_app(True), requests)) for _ in range(3))
+    return {
+        "bare_us": round(bare / requests * 1e6, 2),
+        "instrumented_us": round(measured / requests * 1e6, 2),
+        "overhead_pct": round((measured - bare) / bare * 100, 1),
+    }
+
+
+def sql_overhead(rows: int) -> Dict:
+    query = (
+        "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < ?) "
+        "SELECT x, 'card ' || x AS name FROM n"
+    )
+
+    def read(conn) -> float:
+        start = time.perf_counter()
+        for row in conn.execute(query, [rows]):
+            row["name"]
+        return time.perf_counter() - start
+
+    plain = sqlite3.connect(":memory:")
+    plain.row_factory = sqlite3.Row
+    instrumented = instrument_connection(sqlite3.connect(":memory:"))
+
+    token = _request_sql.set(_SQLStats())
+    try:
+        plain_s = min(read(plain) for _ in range(5))
+        instrumented_s = min(read(instrumented) for _ in range(5))
+    finally:
+        _request_sql.reset(token)
+    return {
+        "rows": rows,
+        "plain_ms": round(plain_s * 1e3, 3),
+        "instrumented_ms": round(instrumented_s * 1e3, 3),
+        "overhead_ns_per_row": round((instrumented_s - plain_s) / rows * 1e9, 1),
+    }
+
+
+def run(requests: int = 20000, rows: int = 10000) -> Dict:
+    return {
+        "middleware": middleware_overhead(requests),
+        "fastapi_route": fastapi_overhead(requests // 4),
+        "sql": sql_overhead(rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests, args.rows), indent=2))
+
+
+if __name__ == "__main__":
+    main()
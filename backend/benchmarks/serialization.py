@@ -0,0 +1,124 @@
+"""Serialization time and bytes on the wire for a 100-card page.
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps) with
+ORJSONResponse, and the encoded page size uncompressed, gzipped and
+brotli-compressed. Run from backend/:
+
+    python -m benchmarks.serialization [--cards 100] [--repeat 200]
+"""
+import argparse
+import gzip
+import json
+import random
+import timeit
+from typing import Dict, List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASPECTS = ["Aggression", "Command", "Cunning", "Vigilance", "Heroism", "Villainy"]
+TRAITS = ["Rebel", "Imperial", "Trooper", "Vehicle", "Fighter", "Force", "Underworld", "Jedi"]
+KEYWORDS = ["Sentinel", "Overwhelm", "Raid 2", "Restore 1", "Saboteur", "Ambush", "Shielded"]
+ABILITIES = [
+    "When Played: Deal {n} damage to a unit.",
+    "On Attack: You may exhaust an enemy unit with {n} or less power.",
+    "When Defeated: Draw a card.",
+    "Each other friendly {trait} unit gets +{n}/+0.",
+    "Action [Exhaust]: Give a Shield token to a friendly unit.",
+    "While you control another {trait} unit, this unit gets +{n}/+{n}.",
+]
+
+
+def make_page(size: int, seed: int = 7) -> Dict:
+    """A /api/cards response body with realistic field lengths."""
+    rng = random.Random(seed)
+    cards: List[Dict] = []
+    for i in range(size):
+        trait = rng.choice(TRAITS)
+        text = " ".join(
+            rng.choice(ABILITIES).format(n=rng.randint(1, 4), trait=trait)
+            for _ in range(rng.randint(1, 3))
+        )
+        card_id = str(1000 + i)
+        cards.append({
+            "id": card_id,
+            "name": f"{trait} Card {i}",
+            "subtitle": rng.choice([None, "Veteran of the Rebellion", "Agent of the Empire"]),
+            "energy_cost": rng.randint(0, 8),
+            "type": rng.choice(["Unit", "Event", "Upgrade"]),
+            "type2": None,
+            "rarity": rng.choice(["Common", "Uncommon", "Rare", "Legendary"]),
+            "text": text,
+            "text_styled": f"<p>{text}</p>",
+            "epic_action": None,
+            "deploy_box": rng.choice([None, "Epic Action: Deploy this leader."]),
+            "attack": rng.randint(0, 8),
+            "health": rng.randint(1, 9),
+            "image_uri": f"https://cdn.starwarsunlimited.com/card_{card_id}_front.png",
+            "image_back_uri": None,
+            "price_usd": round(rng.uniform(0.1, 40), 2),
+            "set_name": "Spark of Rebellion",
+            "set_code": "SOR",
+            "card_number": str(i + 1),
+            "release_date": "2024-03-08",
+            "last_updated": "2024-06-01T12:00:00",
+            "is_unique": rng.random() < 0.3,
+            "artist": "Unknown Artist",
+            "serial_code": None,
+            "aspects": [
+                {"aspect_name": aspect, "aspect_color": None}
+                for aspect in rng.sample(ASPECTS, rng.randint(1, 2))
+            ],
+            "keywords": rng.sample(KEYWORDS, rng.randint(0, 2)),
+            "traits": [trait],
+            "arenas": [rng.choice(["Ground", "Space"])],
+        })
+    return {"total": 5000, "page": 1, "limit": size, "cards": cards}
+
+
+def run(cards: int = 100, repeat: int = 200) -> Dict:
+    page = make_page(cards)
+
+    def default_json():
+        return JSONResponse(jsonable_encoder(page)).body
+
+    def orjson_response():
+        return ORJSONResponse(page).body
+
+    timings = {
+        name: min(timeit.repeat(func, number=repeat, repeat=3)) / repeat * 1e3
+        for name, func in (("default_json", default_json), ("orjson", orjson_response))
+    }
+    body = orjson_response()
+    codecs = {"gzip": lambda: gzip.compress(body, compresslevel=6)}
+    if brotli is not None:
+        codecs["br"] = lambda: brotli.compress(body, quality=5)
+    wire = {"identity": len(body)}
+    compress_ms = {}
+    for name, codec in codecs.items():
+        wire[name] = len(codec())
+        compress_ms[name] = round(min(timeit.repeat(codec, number=20, repeat=3)) / 20 * 1e3, 4)
+
+    return {
+        "cards": cards,
+        "serialize_ms": {name: round(ms, 4) for name, ms in timings.items()},
+        "speedup": round(timings["default_json"] / timings["orjson"], 1),
+        "bytes": wire,
+        "compress_ms": compress_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.cards, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+from typing import Dict, List, Optional, Sequence
+from fastapi import HTTPException, Query
+
+# Columns of the cards table, in schema order
+CARD_COLUMNS = (
+    "id", "name", "subtitle", "energy_cost", "type", "type2", "rarity", "text",
+    "text_styled", "epic_action", "deploy_box", "attack", "health", "image_uri",
+    "image_back_uri", "price_usd", "set_name", "set_code", "card_number",
+    "release_date", "last_updated", "is_unique", "artist", "serial_code",
+)
+
+# Fields hydrated from the related tables
+RELATED_FIELDS = ("aspects", "keywords", "traits", "arenas")
+
+CARD_FIELDS = CARD_COLUMNS + RELATED_FIELDS
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated field list.
+
+    Args:
+        value: e.g. "name,energy_cost,type,aspects,image_uri"
+
+    Returns:
+        The requested fields in request order, always starting with "id",
+        or None when every field is wanted
+
+    Raises:
+        ValueError: If a field is not a card field
+    """
+    if not value:
+        return None
+    requested = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in CARD_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [field for field in dict.fromkeys(requested) if field != "id"]
+
+
+def card_fields(
+    fields: Optional[str] = Query(
+        None, description="Comma-separated card fields to return, e.g. name,energy_cost,aspects"
+    )
+) -> Optional[List[str]]:
+    """FastAPI dependency for the fields= projection parameter."""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def project_card(card: Dict, fields: Optional[Sequence[str]]) -> Dict:
+    """Copy of a card holding only the given fields (the card itself when None)."""
+    if fields is None:
+        return card
+    return {field: card[field] for field in fields}
@@ -0,0 +1,176 @@
+from typing import Dict, List, Optional, Tuple
+from fastapi import Query
+from pydantic import BaseModel
+
+# Related tables that back the multi-valued filters: facet -> (table, column)
+RELATED_FILTERS = {
+    "aspect": ("card_aspects", "aspect_name"),
+    "keyword": ("card_keywords", "keyword"),
+    "trait": ("card_traits", "trait"),
+    "arena": ("card_arenas", "arena"),
+}
+
+# Single-column filters on the cards table: facet -> column
+COLUMN_FILTERS = {
+    "type": "type",
+    "set": "set_code",
+    "rarity": "rarity",
+    "cost": "energy_cost",
+}
+
+# Range filters: stat -> column
+RANGE_FILTERS = {
+    "cost": "energy_cost",
+    "attack": "attack",
+    "health": "health",
+}
+
+
+class CardFilters(BaseModel):
+    """Server-side card filters shared by the card list, facet and stream endpoints.
+
+    Values within a multi-valued filter are OR-ed (or AND-ed for aspects
+    with aspect_mode="all") and all filters are AND-ed together.
+    """
+    search: Optional[str] = None
+    # Match search against card names by trigram similarity (card index only)
+    fuzzy: bool = False
+    aspect: List[str] = []
+    aspect_mode: str = "any"
+    type: List[str] = []
+    set: List[str] = []
+    rarity: List[str] = []
+    cost: List[int] = []
+    keyword: List[str] = []
+    trait: List[str] = []
+    arena: List[str] = []
+    ranges: Dict[str, Tuple[Optional[int], Optional[int]]] = {}
+    unique: Optional[bool] = None
+    leader: Optional[str] = None
+    base: Optional[str] = None
+
+    def selections(self) -> Dict[str, List]:
+        """Selected values per facet name."""
+        return {
+            "aspect": self.aspect, "type": self.type, "rarity": self.rarity,
+            "set": self.set, "cost": self.cost, "arena": self.arena,
+            "keyword": self.keyword, "trait": self.trait
+        }
+
+    def to_sql(self) -> Tuple[str, List]:
+        """Translate the filters into a WHERE clause over "cards c".
+
+        Multi-valued filters become "c.id IN (SELECT card_id ...)" semi-joins
+        so SQLite can drive them from the (value, card_id) covering indexes.
+
+        Returns:
+            Tuple of (WHERE clause, or "" when unfiltered, and its parameters)
+        """
+        conditions = []
+        params: List = []
+
+        for facet, column in COLUMN_FILTERS.items():
+            values = getattr(self, facet)
+            if values:
+                conditions.append(f"c.{column} IN ({', '.join(['?'] * len(values))})")
+                params.extend(values)
+
+        for facet, (table, column) in RELATED_FILTERS.items():
+            values = getattr(self, facet)
+            if not values:
+                continue
+            placeholders = ", ".join(["?"] * len(values))
+            subquery = f"SELECT card_id FROM {table} WHERE {column} IN ({placeholders})"
+            if facet == "aspect" and self.aspect_mode == "all":
+                subquery += f" GROUP BY card_id HAVING COUNT(*) = {len(set(values))}"
+            conditions.append(f"c.id IN ({subquery})")
+            params.extend(values)
+
+        for stat, (low, high) in self.ranges.items():
+            column = RANGE_FILTERS[stat]
+            if low is not None:
+                conditions.append(f"c.{column} >= ?")
+                params.append(low)
+            if high is not None:
+                conditions.append(f"c.{column} <= ?")
+                params.append(high)
+
+        if self.unique is not None:
+            conditions.append("c.is_unique = ?")
+            params.append(int(self.unique))
+
+        deck_ids = [card_id for card_id in (self.leader, self.base) if card_id]
+        if deck_ids:
+            # Cards with no aspect icons beyond those the leader and base provide
+            conditions.append(
+                "NOT EXISTS (SELECT 1 FROM card_aspects ca WHERE ca.card_id = c.id "
+                "AND ca.aspect_name NOT IN (SELECT aspect_name FROM card_aspects "
+                f"WHERE card_id IN ({', '.join(['?'] * len(deck_ids))})))"
+            )
+            params.extend(deck_ids)
+
+        # Fuzzy matching needs the in-memory trigram index, which callers
+        # use instead (see stream_cards); SQL keeps the substring match
+        if self.search:
+            conditions.append("(c.name LIKE ? OR c.text LIKE ?)")
+            search_param = f"%{self.search}%"
+            params.extend([search_param, search_param])
+
+        if not conditions:
+            return "", params
+        return " WHERE " + " AND ".join(conditions), params
+
+
+def card_filters(
+    search: Optional[str] = None,
+    fuzzy: bool = False,
+    aspect: Optional[List[str]] = Query(None),
+    aspect_mode: str = Query("any", pattern="^(any|all)$"),
+    type: Optional[List[str]] = Query(None),
+    set: Optional[List[str]] = Query(None),
+    rarity: Optional[List[str]] = Query(None),
+    cost: Optional[List[int]] = Query(None),
+    keyword: Optional[List[str]] = Query(None),
+    trait: Optional[List[str]] = Query(None),
+    arena: Optional[List[str]] = Query(None),
+    cost_min: Optional[int] = Query(None, ge=0),
+    cost_max: Optional[int] = Query(None, ge=0),
+    attack_min: Optional[int] = Query(None, ge=0),
+    attack_max: Optional[int] = Query(None, ge=0),
+    health_min: Optional[int] = Query(None, ge=0),
+    health_max: Optional[int] = Query(None, ge=0),
+    unique: Optional[bool] = None,
+    leader: Optional[str] = None,
+    base: Optional[str] = None
+) -> CardFilters:
+    """FastAPI dependency that collects the card filter query parameters.
+
+    List parameters are repeated in the query string, e.g.
+    ?aspect=Villainy&aspect=Aggression&aspect_mode=all&cost_max=3
+    """
+    ranges = {
+        stat: (low, high)
+        for stat, low, high in (
+            ("cost", cost_min, cost_max),
+            ("attack", attack_min, attack_max),
+            ("health", health_min, health_max),
+        )
+        if low is not None or high is not None
+    }
+    return CardFilters(
+        search=search or None,
+        fuzzy=fuzzy,
+        aspect=aspect or [],
+        aspect_mode=aspect_mode,
+        type=type or [],
+        set=set or [],
+        rarity=rarity or [],
+        cost=cost or [],
+        keyword=keyword or [],
+        trait=trait or [],
+        arena=arena or [],
+        ranges=ranges,
+        unique=unique,
+        leader=leader,
+        base=base
+    )
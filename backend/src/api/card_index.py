@@ -0,0 +1,258 @@
+import sqlite3
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .card_filters import CardFilters
+from .card_queries import load_all_cards
+from .name_index import NameIndex
+
+logger = logging.getLogger(__name__)
+
+# Facets backed by a single cards column
+FACET_COLUMNS = {
+    "type": "type",
+    "rarity": "rarity",
+    "set": "set_code",
+    "cost": "energy_cost",
+}
+
+FACETS = ("aspect", "type", "rarity", "set", "cost", "arena", "keyword", "trait")
+
+# Numeric card stats held as columns, keyed by their public name
+NUMERIC_COLUMNS = {
+    "cost": "energy_cost",
+    "attack": "attack",
+    "health": "health",
+}
+
+
+def _card_values(facet: str, card: Dict) -> List:
+    """The values a card contributes to a facet (zero, one or several)."""
+    if facet == "aspect":
+        return [a["aspect_name"] for a in card["aspects"]]
+    if facet == "keyword":
+        return card["keywords"]
+    if facet == "trait":
+        return card["traits"]
+    if facet == "arena":
+        return card["arenas"]
+    value = card[FACET_COLUMNS[facet]]
+    return [] if value is None else [value]
+
+
+class CardIndex:
+    """Columnar, in-memory index over the whole card catalog.
+
+    Every facet value owns a boolean array with one slot per card (a bitset
+    of the cards carrying that value), stacked into one matrix per facet,
+    and numeric stats are held as NumPy columns. Any filter combination is
+    answered with vectorized AND/OR operations and paged through
+    precomputed sort permutations, so SQLite is only read when the index
+    is built.
+    """
+
+    def __init__(self, cards: List[Dict]):
+        """Build the posting lists.
+
+        Args:
+            cards: Every card, hydrated with aspects, keywords, traits and arenas
+        """
+        self.cards = cards
+        self.ids = [card["id"] for card in cards]
+        self.size = len(cards)
+        self.position_by_id = {card_id: i for i, card_id in enumerate(self.ids)}
+        self.unique = np.array([bool(card["is_unique"]) for card in cards], dtype=bool)
+
+        # Lower-cased name and text for substring search
+        self._search_text = [
+            f"{card['name'] or ''}\n{card['text'] or ''}".lower() for card in cards
+        ]
+
+        self.facet_values: Dict[str, List] = {}
+        self.postings: Dict[str, np.ndarray] = {}
+        self._positions: Dict[str, Dict] = {}
+        for facet in FACETS:
+            values = sorted({value for card in cards for value in _card_values(facet, card)})
+            positions = {value: i for i, value in enumerate(values)}
+            matrix = np.zeros((len(values), self.size), dtype=bool)
+            for column, card in enumerate(cards):
+                for value in _card_values(facet, card):
+                    matrix[positions[value], column] = True
+
+            self.facet_values[facet] = values
+            self.postings[facet] = matrix
+            self._positions[facet] = positions
+
+        # Cards arrive ordered by name, so position doubles as name rank
+        name_rank = np.arange(self.size)
+        self.numeric: Dict[str, np.ndarray] = {
+            stat: np.array(
+                [np.nan if card[column] is None else card[column] for card in cards],
+                dtype=float
+            )
+            for stat, column in NUMERIC_COLUMNS.items()
+        }
+
+        self.permutations: Dict[str, np.ndarray] = {
+            "name": name_rank,
+            "-name": name_rank[::-1].copy(),
+        }
+        for stat, values in self.numeric.items():
+            missing = np.isnan(values)
+            # Cards without the stat sort last either way; ties go by name
+            self.permutations[stat] = np.lexsort((name_rank, values, missing))
+            self.permutations["-" + stat] = np.lexsort((name_rank, -values, missing))
+
+        # Autocomplete and fuzzy name matching, over the same positions
+        self.names = NameIndex(cards)
+
+        logger.info(f"Built card index over {self.size} cards")
+
+    @classmethod
+    def build(cls, conn: sqlite3.Connection) -> "CardIndex":
+        """Load the catalog from the database and index it."""
+        return cls(load_all_cards(conn))
+
+    def _coerce(self, facet: str, value):
+        if facet == "cost":
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+        return value
+
+    def facet_mask(self, facet: str, values: Iterable, match_all: bool = False) -> np.ndarray:
+        """Cards having any (or, with match_all, every) given value for a facet."""
+        values = [self._coerce(facet, value) for value in values]
+        rows = [self._positions[facet][key] for key in values if key in self._positions[facet]]
+        if match_all and len(rows) < len(set(values)):
+            # A value no card carries can never be matched
+            return np.zeros(self.size, dtype=bool)
+        if not rows:
+            return np.zeros(self.size, dtype=bool)
+        if match_all:
+            return self.postings[facet][rows].all(axis=0)
+        return self.postings[facet][rows].any(axis=0)
+
+    def range_mask(self, stat: str, low: Optional[int], high: Optional[int]) -> np.ndarray:
+        """Cards whose stat lies within [low, high]; cards without the stat never match."""
+        values = self.numeric[stat]
+        mask = ~np.isnan(values)
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+        return mask
+
+    def compatible_mask(self, card_ids: List[str]) -> np.ndarray:
+        """Cards playable without an aspect penalty alongside the given leader and base.
+
+        Raises:
+            ValueError: If a card ID is not in the catalog
+        """
+        unknown = [card_id for card_id in card_ids if card_id not in self.position_by_id]
+        if unknown:
+            raise ValueError(f"Unknown card IDs: {', '.join(unknown)}")
+        positions = [self.position_by_id[card_id] for card_id in card_ids]
+        aspects = self.postings["aspect"]
+        provided = aspects[:, positions].any(axis=1)
+        return ~aspects[~provided].any(axis=0)
+
+    def search_mask(self, search: str) -> np.ndarray:
+        """Cards whose name or text contains the search string."""
+        needle = search.lower()
+        return np.fromiter(
+            (needle in text for text in self._search_text), dtype=bool, count=self.size
+        )
+
+    def fuzzy_mask(self, search: str) -> np.ndarray:
+        """Cards whose name is similar to the search string, typos allowed."""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.names.fuzzy_positions(search)] = True
+        return mask
+
+    def _filter_masks(self, filters: CardFilters) -> Dict[str, np.ndarray]:
+        """One mask per active filter, keyed by facet name where there is one."""
+        masks = {
+            facet: self.facet_mask(
+                facet, values, match_all=facet == "aspect" and filters.aspect_mode == "all"
+            )
+            for facet, values in filters.selections().items()
+            if values
+        }
+        for stat, (low, high) in filters.ranges.items():
+            masks[f"{stat}_range"] = self.range_mask(stat, low, high)
+        if filters.unique is not None:
+            masks["unique"] = self.unique == filters.unique
+        deck_ids = [card_id for card_id in (filters.leader, filters.base) if card_id]
+        if deck_ids:
+            masks["compatible"] = self.compatible_mask(deck_ids)
+        if filters.search:
+            search_mask = self.fuzzy_mask if filters.fuzzy else self.search_mask
+            masks["search"] = search_mask(filters.search)
+        return masks
+
+    def filter_mask(self, filters: CardFilters) -> np.ndarray:
+        """Cards matching every filter."""
+        mask = np.ones(self.size, dtype=bool)
+        for filter_mask in self._filter_masks(filters).values():
+            mask &= filter_mask
+        return mask
+
+    def query(self, filters: CardFilters, sort: str = "name",
+              offset: int = 0, limit: int = 20) -> Tuple[int, List[Dict]]:
+        """Filter, sort and page the catalog.
+
+        Args:
+            filters: Card filters to apply
+            sort: Key into permutations, e.g. "name" or "-cost"
+            offset: Number of matching cards to skip
+            limit: Maximum number of cards to return
+
+        Returns:
+            Tuple of (total number of matching cards, cards on the page)
+        """
+        mask = self.filter_mask(filters)
+        order = self.permutations[sort]
+        matched = order[mask[order]]
+        return len(matched), [self.cards[i] for i in matched[offset:offset + limit]]
+
+    def matching_ids(self, filters: CardFilters, sort: str = "name") -> List[str]:
+        """IDs of every card matching the filters, in sort order."""
+        mask = self.filter_mask(filters)
+        order = self.permutations[sort]
+        return [self.ids[i] for i in order[mask[order]]]
+
+    def facet_counts(self, filters: CardFilters) -> Dict:
+        """Count cards per facet value for the current filter state.
+
+        Each facet's counts ignore that facet's own selection, so the sidebar
+        still shows how many cards every alternative value would match.
+
+        Args:
+            filters: Card filters to apply
+
+        Returns:
+            Dictionary with the number of matching cards and, per facet, a
+            list of values with their counts
+        """
+        masks = self._filter_masks(filters)
+        everything = np.ones(self.size, dtype=bool)
+
+        matched = everything.copy()
+        for mask in masks.values():
+            matched &= mask
+
+        facets = {}
+        for facet in FACETS:
+            base = everything.copy()
+            for name, mask in masks.items():
+                if name != facet:
+                    base &= mask
+            counts = np.count_nonzero(self.postings[facet] & base, axis=1)
+            facets[facet] = [
+                {"value": value, "count": int(count)}
+                for value, count in zip(self.facet_values[facet], counts)
+            ]
+
+        return {"total": int(np.count_nonzero(matched)), "facets": facets}
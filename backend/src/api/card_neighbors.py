@@ -0,0 +1,152 @@
+import os
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .card_queries import hydrate_cards
+from ..database.schema import NEIGHBOR_SCHEMA
+
+# Neighbors stored per card. More than any one request shows, so that
+# aspect/type filters applied at lookup time still have candidates left.
+NEIGHBORS_PER_CARD = 50
+
+# Query rows scored per matrix multiply; bounds the working set to
+# BLOCK_SIZE x catalog size similarities
+BLOCK_SIZE = 1024
+
+
+def top_k_neighbors(vectors: np.ndarray, k: int = NEIGHBORS_PER_CARD,
+                    block_size: int = BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact cosine top-k neighbors of every row, excluding the row itself.
+
+    Rows are normalized once and scored block by block with a matrix
+    multiply against the whole matrix; argpartition picks each row's top k
+    without sorting the full row.
+
+    Args:
+        vectors: One embedding per row
+        k: Neighbors per row (capped at rows - 1)
+        block_size: Rows scored per multiply
+
+    Returns:
+        Tuple of (neighbor row indexes, cosine similarities), both
+        rows x k and ordered most similar first
+    """
+    count = len(vectors)
+    k = min(k, count - 1)
+    if k <= 0:
+        return np.zeros((count, 0), dtype=np.int64), np.zeros((count, 0), dtype=np.float32)
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.where(norms == 0, 1, norms)
+
+    indexes = np.empty((count, k), dtype=np.int64)
+    scores = np.empty((count, k), dtype=np.float32)
+    for start in range(0, count, block_size):
+        end = min(start + block_size, count)
+        similarity = matrix[start:end] @ matrix.T
+        rows = np.arange(end - start)
+        similarity[rows, rows + start] = -np.inf
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        indexes[start:end] = np.take_along_axis(top, order, axis=1)
+        scores[start:end] = np.take_along_axis(top_scores, order, axis=1)
+    return indexes, scores
+
+
+def write_neighbors(conn: sqlite3.Connection, card_ids: Sequence[str], vectors: np.ndarray,
+                    k: int = NEIGHBORS_PER_CARD) -> int:
+    """Replace the card_neighbors table with the top-k neighbors of every card.
+
+    Args:
+        conn: Build connection
+        card_ids: Card ID of each row of vectors
+        vectors: Card embeddings
+
+    Returns:
+        Number of rows written
+    """
+    indexes, scores = top_k_neighbors(vectors, k)
+    card_ids = [str(card_id) for card_id in card_ids]
+    conn.executescript(NEIGHBOR_SCHEMA)
+    conn.execute("DELETE FROM card_neighbors")
+    conn.executemany(
+        "INSERT INTO card_neighbors (card_id, rank, neighbor_id, score) VALUES (?, ?, ?, ?)",
+        (
+            (card_id, rank, card_ids[index], round(float(score), 6))
+            for card_id, row, row_scores in zip(card_ids, indexes.tolist(), scores.tolist())
+            for rank, (index, score) in enumerate(zip(row, row_scores))
+        )
+    )
+    conn.commit()
+    return len(card_ids) * indexes.shape[1]
+
+
+def carry_over_neighbors(conn: sqlite3.Connection, published_path: str) -> int:
+    """Copy the neighbor table of the published database into a catalog build.
+
+    Embeddings only change when the vector build runs again, so a catalog
+    refresh keeps the neighbors of cards that are still in the catalog.
+
+    Returns:
+        Number of rows copied
+    """
+    if not os.path.exists(published_path):
+        return 0
+    conn.commit()
+    conn.execute("ATTACH DATABASE ? AS published", (published_path,))
+    try:
+        exists = conn.execute(
+            "SELECT 1 FROM published.sqlite_master WHERE type = 'table' AND name = 'card_neighbors'"
+        ).fetchone()
+        if not exists:
+            return 0
+        before = conn.total_changes
+        conn.execute(
+            "INSERT OR REPLACE INTO card_neighbors SELECT * FROM published.card_neighbors "
+            "WHERE card_id IN (SELECT id FROM cards) AND neighbor_id IN (SELECT id FROM cards)"
+        )
+        conn.commit()
+        return conn.total_changes - before
+    finally:
+        conn.execute("DETACH DATABASE published")
+
+
+def similar_cards(conn: sqlite3.Connection, card_id: str, limit: int = 10,
+                  aspects: Optional[List[str]] = None,
+                  types: Optional[List[str]] = None) -> List[Dict]:
+    """The nearest neighbors of a card, most similar first.
+
+    One range scan of the card_neighbors primary key, joined to cards and
+    optionally filtered by aspect and type.
+
+    Args:
+        conn: Connection to the card database
+        card_id: Card to find neighbors for
+        limit: Number of cards to return
+        aspects: Keep neighbors with any of these aspects
+        types: Keep neighbors of one of these types
+
+    Returns:
+        Hydrated cards, each with its cosine "score"; empty if the card has
+        no stored neighbors
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'card_neighbors'"
+    ).fetchone()
+    if not exists:
+        return []
+
+    sql = "SELECT c.*, n.score FROM card_neighbors n JOIN cards c ON c.id = n.neighbor_id WHERE n.card_id = ?"
+    params: List = [str(card_id)]
+    if types:
+        sql += f" AND c.type IN ({', '.join(['?'] * len(types))})"
+        params.extend(types)
+    if aspects:
+        sql += (f" AND EXISTS (SELECT 1 FROM card_aspects a WHERE a.card_id = c.id"
+                f" AND a.aspect_name IN ({', '.join(['?'] * len(aspects))}))")
+        params.extend(aspects)
+    cursor = conn.execute(sql + " ORDER BY n.rank LIMIT ?", params + [limit])
+    columns = [column[0] for column in cursor.description]
+    return hydrate_cards(conn, [dict(zip(columns, row)) for row in cursor])
@@ -0,0 +1,199 @@
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .card_filters import CardFilters, RANGE_FILTERS
+from .card_fields import CARD_COLUMNS
+
+# Related tables hydrated onto each card, keyed by the card field they fill.
+# Rows are read "ORDER BY 1, 2" (card_id, value) so every lookup path walks
+# the primary key and returns values in the same order.
+RELATED_TABLES = {
+    "aspects": "SELECT card_id, aspect_name, aspect_color FROM card_aspects",
+    "keywords": "SELECT card_id, keyword FROM card_keywords",
+    "traits": "SELECT card_id, trait FROM card_traits",
+    "arenas": "SELECT card_id, arena FROM card_arenas",
+}
+
+
+# Cards read and hydrated at a time by iter_card_batches
+STREAM_BATCH_SIZE = 500
+
+# ORDER BY clauses matching the CardIndex sort permutations: cards missing
+# the stat always sort last and ties are broken by name
+SQL_SORT = {"name": "c.name, c.id", "-name": "c.name DESC, c.id DESC"}
+for _stat, _column in RANGE_FILTERS.items():
+    SQL_SORT[_stat] = f"c.{_column} IS NULL, c.{_column}, c.name, c.id"
+    SQL_SORT["-" + _stat] = f"c.{_column} IS NULL, c.{_column} DESC, c.name, c.id"
+
+
+def select_columns(fields: Optional[Sequence[str]], alias: str = "") -> str:
+    """SELECT list for a field projection; every column when fields is None."""
+    prefix = f"{alias}." if alias else ""
+    if fields is None:
+        return f"{prefix}*"
+    columns = [column for column in CARD_COLUMNS if column in fields]
+    return ", ".join(prefix + column for column in columns)
+
+
+def _related_value(field: str, row: sqlite3.Row):
+    if field == "aspects":
+        return {"aspect_name": row[1], "aspect_color": row[2]}
+    return row[1]
+
+
+def hydrate_cards(conn: sqlite3.Connection, cards: List[Dict],
+                  fields: Optional[Sequence[str]] = None) -> List[Dict]:
+    """Attach aspects, keywords, traits and arenas to card rows.
+
+    Issues one query per related table for the whole batch instead of one
+    query per card and table.
+
+    Args:
+        conn: Connection to the card database
+        cards: Card dictionaries from the cards table
+        fields: Projection; related tables not listed are not queried
+
+    Returns:
+        The same card dictionaries, with the related fields filled in
+    """
+    related = [field for field in RELATED_TABLES if fields is None or field in fields]
+    by_id = {}
+    for card in cards:
+        card["id"] = str(card["id"])
+        for field in related:
+            card[field] = []
+        by_id[card["id"]] = card
+
+    if not by_id:
+        return cards
+
+    ids = list(by_id)
+    placeholders = ", ".join(["?"] * len(ids))
+    for field in related:
+        query = RELATED_TABLES[field]
+        cursor = conn.execute(f"{query} WHERE card_id IN ({placeholders}) ORDER BY 1, 2", ids)
+        for row in cursor:
+            by_id[str(row[0])][field].append(_related_value(field, row))
+
+    return cards
+
+
+def fetch_cards_by_ids(conn: sqlite3.Connection, card_ids: List[str],
+                       fields: Optional[Sequence[str]] = None) -> Dict[str, Dict]:
+    """Fetch and hydrate a batch of cards with one query per table.
+
+    Args:
+        conn: Connection to the card database
+        card_ids: IDs to look up; duplicates and unknown IDs are allowed
+        fields: Projection pushed into the column list and the related
+            tables queried; None returns every field
+
+    Returns:
+        Dictionary mapping each ID that exists to its hydrated card
+    """
+    unique_ids = list(dict.fromkeys(str(card_id) for card_id in card_ids))
+    if not unique_ids:
+        return {}
+
+    placeholders = ", ".join(["?"] * len(unique_ids))
+    cursor = conn.execute(
+        f"SELECT {select_columns(fields)} FROM cards WHERE id IN ({placeholders})", unique_ids
+    )
+    columns = [column[0] for column in cursor.description]
+    cards = hydrate_cards(conn, [dict(zip(columns, row)) for row in cursor], fields)
+    return {card["id"]: card for card in cards}
+
+
+def query_cards(conn: sqlite3.Connection, filters: CardFilters, sort: str = "name",
+                offset: int = 0, limit: int = 20,
+                fields: Optional[Sequence[str]] = None) -> Tuple[int, List[Dict]]:
+    """Filter, sort and page cards directly in SQLite.
+
+    The reference implementation of CardIndex.query, for callers that work
+    against the database rather than the in-memory index.
+
+    Returns:
+        Tuple of (total number of matching cards, hydrated cards on the page)
+    """
+    where, params = filters.to_sql()
+    total = conn.execute(f"SELECT COUNT(*) FROM cards c{where}", params).fetchone()[0]
+
+    cursor = conn.execute(
+        f"SELECT {select_columns(fields, 'c')} FROM cards c{where} "
+        f"ORDER BY {SQL_SORT[sort]} LIMIT ? OFFSET ?",
+        params + [limit, offset]
+    )
+    columns = [column[0] for column in cursor.description]
+    cards = [dict(zip(columns, row)) for row in cursor]
+    return total, hydrate_cards(conn, cards, fields)
+
+
+def iter_card_batches(conn: sqlite3.Connection, filters: CardFilters, sort: str = "name",
+                      fields: Optional[Sequence[str]] = None,
+                      batch_size: int = STREAM_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """Stream every matching card, hydrated, in batches from one cursor.
+
+    The query runs before this returns, so SQL errors surface to the
+    caller rather than mid-iteration. Rows are then fetched batch_size at a
+    time and each batch is hydrated with one query per related table, so
+    memory stays bounded by the batch size whatever the result size.
+
+    Returns:
+        Iterator over lists of at most batch_size hydrated cards
+    """
+    where, params = filters.to_sql()
+    cursor = conn.execute(
+        f"SELECT {select_columns(fields, 'c')} FROM cards c{where} ORDER BY {SQL_SORT[sort]}", params
+    )
+    columns = [column[0] for column in cursor.description]
+
+    def batches() -> Iterator[List[Dict]]:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield hydrate_cards(conn, [dict(zip(columns, row)) for row in rows], fields)
+
+    return batches()
+
+
+def iter_cards_by_ids(conn: sqlite3.Connection, card_ids: Sequence[str],
+                      fields: Optional[Sequence[str]] = None,
+                      batch_size: int = STREAM_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """Stream the given cards, hydrated, in batches and in the order given.
+
+    For result sets computed outside SQL, such as fuzzy name matches from
+    the card index.
+
+    Returns:
+        Iterator over lists of at most batch_size hydrated cards
+    """
+    for start in range(0, len(card_ids), batch_size):
+        batch = card_ids[start:start + batch_size]
+        found = fetch_cards_by_ids(conn, batch, fields)
+        yield [found[card_id] for card_id in batch if card_id in found]
+
+
+def load_all_cards(conn: sqlite3.Connection) -> List[Dict]:
+    """Load every card with its related data, ordered by name.
+
+    Reads each table exactly once, which is much cheaper than hydrating
+    the full catalog card by card.
+    """
+    cursor = conn.execute("SELECT * FROM cards ORDER BY name, id")
+    columns = [column[0] for column in cursor.description]
+    cards = [dict(zip(columns, row)) for row in cursor]
+
+    by_id = {}
+    for card in cards:
+        card["id"] = str(card["id"])
+        for field in RELATED_TABLES:
+            card[field] = []
+        by_id[card["id"]] = card
+
+    for field, query in RELATED_TABLES.items():
+        for row in conn.execute(f"{query} ORDER BY 1, 2"):
+            card = by_id.get(str(row[0]))
+            if card is not None:
+                card[field].append(_related_value(field, row))
+
+    return cards
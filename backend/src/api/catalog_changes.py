@@ -0,0 +1,196 @@
+"""Catalog versions and the per-card change log behind /api/catalog/changes.
+
+Every build that changes cards records the next catalog version (1, 2,
+...) and, per card, whether that version added, updated or removed it. A
+build tells what changed by comparing a digest of every hydrated card with
+the digests stored in the database it replaces. The log travels from
+build to build, trimmed to the last CHANGE_LOG_VERSIONS versions; clients
+further behind download /api/catalog/snapshot again, whose header carries
+the catalog_version it holds.
+"""
+import os
+import json
+import hashlib
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import quote
+from .card_queries import fetch_cards_by_ids, load_all_cards
+from ..database.schema import CHANGES_SCHEMA
+
+CHANGE_KINDS = ("added", "updated", "removed")
+
+# Versions whose changes are kept
+CHANGE_LOG_VERSIONS = 200
+
+# Cards fetched per query when hydrating a delta
+FETCH_BATCH_SIZE = 500
+
+# Stamped by every build, or moved by every price import, so not a change
+# in themselves
+DIGEST_IGNORED = ("last_updated", "price_usd")
+
+
+def card_digest(card: Dict) -> str:
+    """Fingerprint of a hydrated card's content."""
+    content = {field: value for field, value in card.items() if field not in DIGEST_IGNORED}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def card_digests(conn: sqlite3.Connection) -> Dict[str, str]:
+    """Digest of every card in a database, by card ID."""
+    row_factory = conn.row_factory
+    conn.row_factory = None
+    try:
+        return {card["id"]: card_digest(card) for card in load_all_cards(conn)}
+    finally:
+        conn.row_factory = row_factory
+
+
+def _has_table(conn: sqlite3.Connection, name: str, schema: str = "main") -> bool:
+    return conn.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def _published_digests(published_path: str) -> Dict[str, str]:
+    """Card digests of the published database, computed if it predates them."""
+    # A private connection: the API process may have this file open in a
+    # shared cache
+    conn = sqlite3.connect(f"file:{quote(os.path.abspath(published_path))}?mode=ro", uri=True)
+    try:
+        if _has_table(conn, "card_digests"):
+            return dict(conn.execute("SELECT card_id, digest FROM card_digests"))
+        return card_digests(conn)
+    finally:
+        conn.close()
+
+
+def current_version(conn: sqlite3.Connection) -> Optional[int]:
+    """Latest catalog version, or None for a database without a change log."""
+    try:
+        return conn.execute("SELECT MAX(version) FROM catalog_versions").fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+
+def record_changes(conn: sqlite3.Connection, published_path: Optional[str] = None) -> Dict:
+    """Record a new catalog version and the cards it changed, if any did.
+
+    Called on a build connection before the build is published (and before
+    write_snapshot, so the snapshot names the version).
+
+    Args:
+        conn: Build connection
+        published_path: Database the build replaces; its change log is
+            carried over and its cards are the ones compared against
+
+    Returns:
+        The new version and its added, updated and removed counts; the
+        current version, with zero counts, if no card changed
+    """
+    conn.executescript(CHANGES_SCHEMA)
+    previous: Dict[str, str] = {}
+    if published_path and os.path.exists(published_path):
+        conn.commit()
+        conn.execute("ATTACH DATABASE ? AS published", (published_path,))
+        try:
+            for table in ("catalog_versions", "card_changes"):
+                if _has_table(conn, table, "published"):
+                    conn.execute(f"INSERT OR IGNORE INTO {table} SELECT * FROM published.{table}")
+            conn.commit()
+        finally:
+            conn.execute("DETACH DATABASE published")
+        previous = _published_digests(published_path)
+
+    digests = card_digests(conn)
+    changes = [(card_id, "added") for card_id in digests if card_id not in previous]
+    changes += [(card_id, "updated") for card_id, digest in digests.items()
+                if card_id in previous and previous[card_id] != digest]
+    changes += [(card_id, "removed") for card_id in previous if card_id not in digests]
+    counts = {kind: sum(1 for _, change in changes if change == kind) for kind in CHANGE_KINDS}
+
+    version = current_version(conn)
+    conn.execute("DELETE FROM card_digests")
+    conn.executemany("INSERT INTO card_digests (card_id, digest) VALUES (?, ?)", digests.items())
+    if not changes and version is not None:
+        # An unchanged rebuild keeps the version: clients holding it have
+        # nothing to fetch, and the log isn't trimmed for nothing
+        conn.commit()
+        return {"version": version, **counts}
+
+    version = (version or 0) + 1
+    conn.execute(
+        "INSERT INTO catalog_versions (version, created, added, updated, removed) VALUES (?, ?, ?, ?, ?)",
+        (version, datetime.now().isoformat(), counts["added"], counts["updated"], counts["removed"])
+    )
+    conn.executemany(
+        "INSERT INTO card_changes (version, card_id, change) VALUES (?, ?, ?)",
+        ((version, card_id, change) for card_id, change in changes)
+    )
+    oldest = version - CHANGE_LOG_VERSIONS
+    conn.execute("DELETE FROM card_changes WHERE version <= ?", (oldest,))
+    conn.execute("DELETE FROM catalog_versions WHERE version <= ?", (oldest,))
+    conn.commit()
+    return {"version": version, **counts}
+
+
+def changes_since(conn: sqlite3.Connection, since: int,
+                  fields: Optional[Sequence[str]] = None) -> Optional[Dict]:
+    """Cards to add, update and remove to bring a client from since to now.
+
+    A card changed several times appears once, by its net change: added
+    then updated is added, added then removed is left out.
+
+    Args:
+        conn: Connection to the card database
+        since: Catalog version the client holds (0 for none)
+        fields: Projection of the added and updated cards
+
+    Returns:
+        The current "version", "since", "added" and "updated" cards and
+        "removed" IDs; None if the log no longer reaches back to since
+
+    Raises:
+        ValueError: If since is newer than the current version
+    """
+    version = current_version(conn)
+    if version is None:
+        return None
+    if since > version:
+        raise ValueError(f"Unknown catalog version: {since}")
+    oldest = conn.execute("SELECT MIN(version) FROM catalog_versions").fetchone()[0]
+    if since < oldest - 1:
+        return None
+
+    first: Dict[str, str] = {}
+    last: Dict[str, str] = {}
+    for card_id, change in conn.execute(
+        "SELECT card_id, change FROM card_changes WHERE version > ? ORDER BY version", (since,)
+    ):
+        first.setdefault(card_id, change)
+        last[card_id] = change
+
+    added: List[str] = []
+    updated: List[str] = []
+    removed: List[str] = []
+    for card_id, change in last.items():
+        if change == "removed":
+            if first[card_id] != "added":
+                removed.append(card_id)
+        elif first[card_id] == "added":
+            added.append(card_id)
+        else:
+            updated.append(card_id)
+
+    cards: Dict[str, Dict] = {}
+    wanted = added + updated
+    for start in range(0, len(wanted), FETCH_BATCH_SIZE):
+        cards.update(fetch_cards_by_ids(conn, wanted[start:start + FETCH_BATCH_SIZE], fields))
+    return {
+        "version": version,
+        "since": since,
+        "added": [cards[card_id] for card_id in added if card_id in cards],
+        "updated": [cards[card_id] for card_id in updated if card_id in cards],
+        "removed": removed,
+    }
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from starlette.concurrency import run_in_threadpool
+from .catalog_changes import card_digest
+from .database import BuildInProgress
+from .metrics import CATALOG_CHANGES, CATALOG_LAST_SYNC, CATALOG_SYNC_SECONDS, CATALOG_SYNCS
+
+logger = logging.getLogger(__name__)
+
+# Seconds between syncs from the SWU API; 0 (the default) disables them
+SYNC_INTERVAL_ENV = "SWU_SYNC_INTERVAL"
+# Seconds between checks for a database published by another process
+# (build_database, import_prices, a sync in another worker); 0 disables them
+RELOAD_CHECK_ENV = "SWU_RELOAD_CHECK_SECONDS"
+DEFAULT_RELOAD_CHECK = 30
+
+
+def catalog_diff(old: List[Dict], new: List[Dict]) -> Dict[str, int]:
+    """Cards added, updated and removed between two catalogs (load_all_cards lists)."""
+    old_by_id = {card["id"]: card for card in old}
+    new_ids = set()
+    added = updated = 0
+    for card in new:
+        new_ids.add(card["id"])
+        previous = old_by_id.get(card["id"])
+        if previous is None:
+            added += 1
+        elif card_digest(previous) != card_digest(card):
+            updated += 1
+    removed = sum(1 for card_id in old_by_id if card_id not in new_ids)
+    return {"added": added, "updated": updated, "removed": removed}
+
+
+def sync_catalog(database_path: str) -> Dict:
+    """Rebuild the database at path from the SWU API and publish it.
+
+    The build is written to a scratch file and swapped in atomically, so
+    the file being served is never modified.
+
+    Raises:
+        BuildInProgress: If another build of the database is running, in
+            this process or another one
+    """
+    from .swu_api_client import SWUApiClient
+
+    with SWUApiClient(database_path=database_path, wait_for_build=False) as client:
+        client.build_database()
+    return {"published": database_path}
+
+
+class CatalogRefresher:
+    """Keeps a serving process on the latest catalog.
+
+    Runs as a task on the event loop. Every check_interval seconds it asks
+    reload to swap in a database another process has published, and every
+    sync_interval seconds it runs sync (an SWUApiClient rebuild) followed
+    by reload. Both run in the thread pool, so requests keep being served
+    from the current indexes until the new ones are ready.
+    """
+
+    def __init__(self, reload: Callable[..., Optional[Dict]], sync: Optional[Callable[[], Dict]] = None,
+                 sync_interval: float = 0, check_interval: float = DEFAULT_RELOAD_CHECK):
+        """Configure the refresher; call start() from the event loop to run it.
+
+        Args:
+            reload: Swaps in the published database if it changed (or
+                always, when called with force=True); returns the diff
+                counts, or None when nothing changed
+            sync: Builds and publishes a new database
+            sync_interval: Seconds between syncs, 0 to only sync on demand
+            check_interval: Seconds between reload checks, 0 to disable
+        """
+        self.reload = reload
+        self.sync = sync
+        self.sync_interval = sync_interval
+        self.check_interval = check_interval
+        self.status: Dict = {
+            "syncs": 0, "reloads": 0, "running": False,
+            "last_sync": None, "last_sync_seconds": None, "last_sync_error": None,
+            "last_reload": None, "last_changes": None,
+        }
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Future] = None
+
+    @classmethod
+    def from_env(cls, reload: Callable[..., Optional[Dict]], sync: Callable[[], Dict]) -> "CatalogRefresher":
+        return cls(reload, sync, float(os.getenv(SYNC_INTERVAL_ENV, "0")),
+                   float(os.getenv(RELOAD_CHECK_ENV, str(DEFAULT_RELOAD_CHECK))))
+
+    def check(self, force: bool = False) -> Optional[Dict]:
+        """Swap in a newly published database, if there is one (or always, with force)."""
+        changes = self.reload(force=force)
+        if changes is not None:
+            self.status["reloads"] += 1
+            self.status["last_reload"] = datetime.now().isoformat()
+            self.status["last_changes"] = changes
+            for kind, count in changes.items():
+                CATALOG_CHANGES.labels(kind).set(count)
+            logger.info("Reloaded catalog: %s", changes)
+        return changes
+
+    def sync_now(self) -> Dict:
+        """Run a sync and swap in its result.
+
+        Returns:
+            The refresher status; a sync already in progress, here or in
+            another process, is not repeated
+        """
+        if self.sync is None or not self._lock.acquire(blocking=False):
+            return self.status
+        self.status["running"] = True
+        start = time.perf_counter()
+        busy = False
+        try:
+            self.sync()
+            self.status["last_sync_error"] = None
+            CATALOG_SYNCS.labels("ok").inc()
+            self.check()
+        except BuildInProgress:
+            # Another worker's sync or an import; the reload checks pick up
+            # what it publishes
+            busy = True
+            logger.info("Catalog build already in progress; skipping sync")
+            CATALOG_SYNCS.labels("busy").inc()
+        except Exception as e:
+            logger.error(f"Catalog sync failed: {str(e)}")
+            self.status["last_sync_error"] = str(e)
+            CATALOG_SYNCS.labels("error").inc()
+        finally:
+            self.status["running"] = False
+            if not busy:
+                elapsed = time.perf_counter() - start
+                self.status.update(last_sync=datetime.now().isoformat(), last_sync_seconds=round(elapsed, 3))
+                self.status["syncs"] += 1
+                CATALOG_SYNC_SECONDS.set(elapsed)
+                CATALOG_LAST_SYNC.set(time.time())
+            self._lock.release()
+        return self.status
+
+    def sync_in_background(self) -> bool:
+        """Start a sync on the thread pool without waiting for it.
+
+        Returns:
+            False if there is nothing to run or a sync is already running
+        """
+        if self.sync is None or self.status["running"]:
+            return False
+        self.status["running"] = True
+        self._sync_task = asyncio.ensure_future(run_in_threadpool(self.sync_now))
+        return True
+
+    async def run(self) -> None:
+        intervals = [interval for interval in (self.check_interval, self.sync_interval) if interval > 0]
+        if not intervals:
+            return
+        tick = min(intervals)
+        next_sync = time.monotonic() + self.sync_interval if self.sync_interval > 0 else None
+        while True:
+            await asyncio.sleep(tick)
+            try:
+                if next_sync is not None and time.monotonic() >= next_sync:
+                    await run_in_threadpool(self.sync_now)
+                    next_sync = time.monotonic() + self.sync_interval
+                elif self.check_interval > 0:
+                    await run_in_threadpool(self.check)
+            except Exception as e:
+                logger.error(f"Catalog reload failed: {str(e)}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,258 @@
+"""Compact columnar snapshot of the whole card catalog.
+
+Served by /api/catalog/snapshot so a client can load every card in one
+request. The layout is little-endian and 8-byte aligned:
+
+    b"SWUC" | uint32 header length | header (UTF-8 JSON) | padding | buffers
+
+The header holds the format number, the content version (also the
+response ETag), the catalog_version it was written for (the version
+/api/catalog/changes counts from; absent for databases without a change
+log), the row count and one entry per column:
+
+    {"name": "type", "type": "dict", "dtype": "u1", "data": [offset, length],
+     "dictionary": ["Base", "Event", ...]}
+
+Buffer spans are [offset, length] with offsets relative to the start of
+the buffers (the header length plus 8, rounded up to a multiple of 8),
+and dtype is a NumPy/typed-array element type. Column types:
+
+    int     integer stat; the dtype's minimum value means NULL
+    cents   price_usd in integer cents; the dtype's minimum value means NULL
+    dict    string column as indexes into "dictionary"; the dtype's maximum
+            value means NULL
+    list    related values: "offsets" (uint32, rows + 1) delimit each card's
+            slice of "data", which indexes "dictionary". Aspect dictionary
+            entries are [aspect_name, aspect_color] pairs.
+
+Rows are in load_all_cards order (by name). Dictionaries are sorted, so
+identical catalogs produce identical bytes and the same version.
+"""
+import json
+import struct
+import hashlib
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .card_fields import CARD_COLUMNS, RELATED_FIELDS
+from .card_queries import load_all_cards
+from .catalog_changes import current_version
+from ..database.schema import SNAPSHOT_SCHEMA
+
+MAGIC = b"SWUC"
+SNAPSHOT_FORMAT = 1
+MEDIA_TYPE = "application/vnd.swu.catalog"
+
+INT_COLUMNS = ("energy_cost", "attack", "health", "is_unique")
+CENTS_COLUMNS = ("price_usd",)
+
+ALIGNMENT = 8
+
+
+def _dict_dtype(size: int) -> np.dtype:
+    """Smallest unsigned dtype with room for size codes plus the NULL code."""
+    for dtype in ("<u1", "<u2", "<u4"):
+        if size < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError("Dictionary too large")
+
+
+def _int_dtype(values: List[Optional[int]]) -> np.dtype:
+    """Smallest signed dtype holding values with its minimum free for NULL."""
+    present = [value for value in values if value is not None]
+    low, high = (min(present), max(present)) if present else (0, 0)
+    for dtype in ("<i1", "<i2", "<i4", "<i8"):
+        info = np.iinfo(dtype)
+        if info.min < low and high <= info.max:
+            return np.dtype(dtype)
+    raise ValueError("Integer out of range")
+
+
+def _sort_key(value):
+    return json.dumps(value)
+
+
+def _encode_column(name: str, values: List) -> Tuple[Dict, List[np.ndarray]]:
+    """Header entry and buffers for one column."""
+    if name in INT_COLUMNS or name in CENTS_COLUMNS:
+        if name in CENTS_COLUMNS:
+            values = [None if value is None else int(round(value * 100)) for value in values]
+        else:
+            values = [None if value is None else int(value) for value in values]
+        dtype = _int_dtype(values)
+        null = np.iinfo(dtype).min
+        data = np.array([null if value is None else value for value in values], dtype=dtype)
+        kind = "cents" if name in CENTS_COLUMNS else "int"
+        return {"name": name, "type": kind, "dtype": dtype.str}, [data]
+
+    if name in RELATED_FIELDS:
+        if name == "aspects":
+            values = [[[a["aspect_name"], a["aspect_color"]] for a in card_values]
+                      for card_values in values]
+        dictionary = sorted({_sort_key(v) for card_values in values for v in card_values})
+        codes = {key: code for code, key in enumerate(dictionary)}
+        dtype = _dict_dtype(len(dictionary))
+        offsets = np.zeros(len(values) + 1, dtype="<u4")
+        offsets[1:] = np.cumsum([len(card_values) for card_values in values])
+        data = np.array([codes[_sort_key(v)] for card_values in values for v in card_values],
+                        dtype=dtype)
+        entry = {"name": name, "type": "list", "dtype": dtype.str,
+                 "dictionary": [json.loads(key) for key in dictionary]}
+        return entry, [offsets, data]
+
+    values = [None if value is None else str(value) for value in values]
+    dictionary = sorted({value for value in values if value is not None})
+    codes = {value: code for code, value in enumerate(dictionary)}
+    dtype = _dict_dtype(len(dictionary))
+    null = np.iinfo(dtype).max
+    data = np.array([null if value is None else codes[value] for value in values], dtype=dtype)
+    return {"name": name, "type": "dict", "dtype": dtype.str, "dictionary": dictionary}, [data]
+
+
+def _pad(length: int) -> int:
+    return -length % ALIGNMENT
+
+
+def encode_snapshot(cards: List[Dict], catalog_version: Optional[int] = None) -> bytes:
+    """Snapshot of hydrated cards (as returned by load_all_cards)."""
+    columns = [column for column in CARD_COLUMNS if not cards or column in cards[0]]
+    entries = []
+    buffers: List[np.ndarray] = []
+    for name in list(columns) + list(RELATED_FIELDS):
+        entry, column_buffers = _encode_column(name, [card.get(name) for card in cards])
+        entries.append((entry, column_buffers))
+        buffers.extend(column_buffers)
+
+    offset = 0
+    for entry, column_buffers in entries:
+        spans = []
+        for buffer in column_buffers:
+            spans.append([offset, buffer.nbytes])
+            offset += buffer.nbytes + _pad(buffer.nbytes)
+        if entry["type"] == "list":
+            entry["offsets"], entry["data"] = spans
+        else:
+            entry["data"] = spans[0]
+    body = b"".join(buffer.tobytes() + b"\0" * _pad(buffer.nbytes) for buffer in buffers)
+
+    header = {"format": SNAPSHOT_FORMAT, "rows": len(cards), "columns": [entry for entry, _ in entries]}
+    if catalog_version is not None:
+        header["catalog_version"] = catalog_version
+    header["version"] = hashlib.sha256(
+        json.dumps(header, sort_keys=True).encode() + body
+    ).hexdigest()[:16]
+    encoded = json.dumps(header, separators=(",", ":")).encode()
+    prefix = len(MAGIC) + 4 + len(encoded)
+    return MAGIC + struct.pack("<I", len(encoded)) + encoded + b"\0" * _pad(prefix) + body
+
+
+def read_header(data: bytes) -> Dict:
+    """Parsed header of a snapshot, plus "body": the offset buffers are relative to.
+
+    Raises:
+        ValueError: If data is not a snapshot of a supported format
+    """
+    if data[:4] != MAGIC:
+        raise ValueError("Not a catalog snapshot")
+    (length,) = struct.unpack_from("<I", data, 4)
+    header = json.loads(data[8:8 + length])
+    if header["format"] != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {header['format']}")
+    header["body"] = 8 + length + _pad(8 + length)
+    return header
+
+
+def _buffer(data: bytes, header: Dict, dtype: str, span: List[int]) -> np.ndarray:
+    return np.frombuffer(data, dtype=dtype, count=span[1] // np.dtype(dtype).itemsize,
+                         offset=header["body"] + span[0])
+
+
+def decode_snapshot(data: bytes) -> List[Dict]:
+    """Cards of a snapshot, in the shape load_all_cards returns."""
+    header = read_header(data)
+    cards: List[Dict] = [{} for _ in range(header["rows"])]
+    for column in header["columns"]:
+        name, kind = column["name"], column["type"]
+        values = _buffer(data, header, column["dtype"], column["data"]).tolist()
+        if kind in ("int", "cents"):
+            null = np.iinfo(column["dtype"]).min
+            scale = 100 if kind == "cents" else 1
+            for card, value in zip(cards, values):
+                card[name] = None if value == null else (value / scale if scale != 1 else value)
+        elif kind == "dict":
+            null = np.iinfo(column["dtype"]).max
+            dictionary = column["dictionary"]
+            for card, value in zip(cards, values):
+                card[name] = None if value == null else dictionary[value]
+        else:
+            offsets = _buffer(data, header, "<u4", column["offsets"]).tolist()
+            dictionary = column["dictionary"]
+            if name == "aspects":
+                dictionary = [{"aspect_name": n, "aspect_color": c} for n, c in dictionary]
+            for row, card in enumerate(cards):
+                card[name] = [dictionary[code] for code in values[offsets[row]:offsets[row + 1]]]
+    return cards
+
+
+def write_snapshot(conn: sqlite3.Connection) -> Dict:
+    """Store a snapshot of the catalog in the catalog_snapshot table.
+
+    Called on a build connection before the build is published, so the
+    snapshot is swapped in together with the catalog it describes.
+
+    Returns:
+        The snapshot's version and size
+    """
+    row_factory = conn.row_factory
+    conn.row_factory = None
+    try:
+        data = encode_snapshot(load_all_cards(conn), current_version(conn))
+    finally:
+        conn.row_factory = row_factory
+    version = read_header(data)["version"]
+    conn.executescript(SNAPSHOT_SCHEMA)
+    conn.execute(
+        "INSERT OR REPLACE INTO catalog_snapshot (format, version, created, data) VALUES (?, ?, ?, ?)",
+        (SNAPSHOT_FORMAT, version, datetime.now().isoformat(), data)
+    )
+    conn.commit()
+    return {"version": version, "bytes": len(data)}
+
+
+def read_snapshot(conn: sqlite3.Connection) -> Optional[bytes]:
+    """The stored snapshot, or None if the database was built without one."""
+    try:
+        row = conn.execute(
+            "SELECT data FROM catalog_snapshot WHERE format = ?", (SNAPSHOT_FORMAT,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return bytes(row[0]) if row else None
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Byte range of a single-range Range header, as (start, end inclusive).
+
+    Returns None when the whole representation should be sent: no header,
+    a unit other than bytes or several ranges.
+
+    Raises:
+        ValueError: If the range can't be satisfied (respond with 416)
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                raise ValueError("Empty suffix range")
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        raise ValueError(f"Invalid range: {header}")
+    if start >= size or end < start:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    return start, min(end, size - 1)
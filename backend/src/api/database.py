@@ -1,8 +1,336 @@
-def get_db():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.join(current_dir, '..', 'database', 'swu_cards.db')
-    if not os.path.exists(db_path):
-        raise HTTPException(status_code=500, detail=f"Database not found at {db_path}")
-    conn = sqlite3.connect(db_path)
+import os
+import glob
+import time
+import shutil
+import sqlite3
+import logging
+import tempfile
+from typing import Dict, Optional, Type
+from urllib.parse import quote
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Card database used by the API, the ingest client and the vector index
+# build. SWU_DB_PATH overrides the default in the user's home directory.
+DB_PATH_ENV = "SWU_DB_PATH"
+
+# Serving profile. The API never writes, and builds replace the file with
+# an atomic rename, so an open file never changes underneath a reader:
+# connections are read-only and, unless SWU_DB_IMMUTABLE=0, immutable (no
+# locking or change detection at all). Set SWU_DB_IMMUTABLE=0 if anything
+# writes the database in place.
+SERVING_IMMUTABLE = os.getenv("SWU_DB_IMMUTABLE", "1") != "0"
+SERVING_MMAP_SIZE = 256 * 1024 * 1024
+SERVING_CACHE_KIB = 64 * 1024
+SERVING_PRAGMAS = (
+    f"PRAGMA mmap_size = {SERVING_MMAP_SIZE}",
+    f"PRAGMA cache_size = -{SERVING_CACHE_KIB}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Build profile: a fresh file that is only published once complete, so
+# durability of individual commits does not matter
+BUILD_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA foreign_keys = ON",
+)
+
+# Serving connection kept open after warm-up. Serving connections share
+# one page cache per path, and it lives as long as any of them is open.
+_anchor: Optional[sqlite3.Connection] = None
+
+
+def database_path() -> str:
+    """Path of the card database, from SWU_DB_PATH or ~/.swu/swu_cards.db."""
+    path = os.getenv(DB_PATH_ENV)
+    if path:
+        return os.path.abspath(os.path.expanduser(path))
+    return os.path.join(os.path.expanduser("~"), ".swu", "swu_cards.db")
+
+
+def serving_uri(path: str, immutable: bool = SERVING_IMMUTABLE) -> str:
+    """file: URI opening a database read-only with a shared page cache."""
+    uri = f"file:{quote(os.path.abspath(path))}?mode=ro&cache=shared"
+    return uri + "&immutable=1" if immutable else uri
+
+
+def connect_serving(path: Optional[str] = None, factory: Type[sqlite3.Connection] = sqlite3.Connection,
+                    immutable: bool = SERVING_IMMUTABLE, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Open a read-only connection with the serving profile.
+
+    Args:
+        path: Database file; defaults to database_path()
+        factory: Connection class, e.g. TracedConnection
+        immutable: Open with immutable=1 (see SERVING_IMMUTABLE)
+        check_same_thread: Pass False for a connection that is handed from
+            thread to thread (never used by two at once), e.g. by a
+            streaming response
+
+    Raises:
+        sqlite3.OperationalError: If the file does not exist or can't be opened
+    """
+    conn = sqlite3.connect(serving_uri(path or database_path(), immutable), uri=True, factory=factory,
+                           check_same_thread=check_same_thread)
+    for pragma in SERVING_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def warm_up(path: Optional[str] = None) -> Dict:
+    """Read every page of the database into the shared page cache.
+
+    Runs PRAGMA quick_check, which walks every table and index b-tree, on a
+    serving connection that stays open so the cache outlives the
+    per-request connections. Calling it again reopens that connection,
+    picking up a database that has been swapped since.
+
+    Returns:
+        Page count, bytes read and seconds taken
+    """
+    global _anchor
+    close_serving()
+    start = time.perf_counter()
+    # Closed by whichever thread warms up next, e.g. a catalog reload
+    conn = connect_serving(path, check_same_thread=False)
+    result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    if result != "ok":
+        logger.warning("Database quick_check reported: %s", result)
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    _anchor = conn
+    return {
+        "pages": pages,
+        "bytes": pages * page_size,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def close_serving() -> None:
+    """Close the warm-up connection, releasing the shared page cache."""
+    global _anchor
+    if _anchor is not None:
+        _anchor.close()
+        _anchor = None
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def pin_serving(path: str) -> str:
+    """Private name for the database file currently published at path.
+
+    Serving connections share one page cache per file name, and while any
+    connection to a name is open, new connections join that cache, even
+    after a build has replaced the file. A process that swaps catalogs
+    while serving therefore opens every build under its own hard link
+    (one per process and file, in <path>.pins), so new connections see
+    the new build at once and requests still reading the old one finish
+    on it. Links left by processes that have exited are removed.
+
+    Returns:
+        Path of the link, or path itself where hard links aren't supported
+    """
+    pins = f"{path}.pins"
+    scratch = os.path.join(pins, f"{os.getpid()}.tmp")
+    try:
+        os.makedirs(pins, exist_ok=True)
+        if os.name != "nt":
+            for name in os.listdir(pins):
+                pid = name.split("-")[0].split(".")[0]
+                if pid.isdigit() and not _process_alive(int(pid)):
+                    os.remove(os.path.join(pins, name))
+        if os.path.exists(scratch):
+            os.remove(scratch)
+        # Link first, then name the link after the file it caught, in case
+        # the path is replaced in between
+        os.link(path, scratch)
+        pinned = os.path.join(pins, f"{os.getpid()}-{os.stat(scratch).st_ino}.db")
+        if os.path.exists(pinned):
+            os.remove(scratch)
+        else:
+            os.replace(scratch, pinned)
+    except OSError as e:
+        logger.warning("Serving %s directly, can't pin it: %s", path, e)
+        return path
+    return pinned
+
+
+def unpin_serving(pinned: str, path: str) -> None:
+    """Remove a link made by pin_serving; open connections keep working."""
+    if pinned != path:
+        try:
+            os.remove(pinned)
+        except OSError:
+            pass
+
+
+class BuildInProgress(Exception):
+    """Raised when another build of the same database holds its build lock."""
+
+
+# Build lock file descriptor of each unpublished build, by scratch path
+_build_locks: Dict[str, int] = {}
+
+BUILD_SUFFIXES = ("", "-wal", "-shm", "-journal")
+
+
+def _build_lock_path(path: str) -> str:
+    return f"{path}.lock"
+
+
+def _lock(fd: int, blocking: bool) -> None:
+    """Take an exclusive lock on an open lock file.
+
+    flock where available; on Windows, msvcrt.locking on the file's first
+    byte, polled since LK_LOCK gives up after ten seconds.
+
+    Raises:
+        BlockingIOError: If blocking is False and the lock is held
+    """
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        return
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return
+        except OSError:
+            if not blocking:
+                raise BlockingIOError(f"Lock file descriptor {fd} is held")
+        time.sleep(0.1)
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def build_in_progress(path: str) -> bool:
+    """Whether a build of the database at path holds its build lock."""
+    fd = os.open(_build_lock_path(path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        _lock(fd, blocking=False)
+        _unlock(fd)
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+    return False
+
+
+def prepare_build(path: str, copy_existing: bool = False, blocking: bool = True) -> str:
+    """Scratch file for a new build of the database at path.
+
+    Builds of one database run one at a time: this takes an exclusive lock
+    on "<path>.lock" (across processes), held until publish_build or
+    abandon_build. Without it, a build started while another is running
+    would publish over it and drop its changes. Leftovers of earlier,
+    unpublished builds are removed once the lock is held.
+
+    Args:
+        path: Database the build will replace
+        copy_existing: Start from a copy of the published database, for
+            builds that add to it rather than rebuild it
+        blocking: Wait for a running build to finish; if False, raise
+            BuildInProgress instead
+
+    Returns:
+        Path of the scratch file, unique to this build
+
+    Raises:
+        BuildInProgress: If blocking is False and another build is running
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd = os.open(_build_lock_path(path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        _lock(fd, blocking)
+        for leftover in glob.glob(glob.escape(path) + ".*.building*"):
+            os.remove(leftover)
+        scratch, build_path = tempfile.mkstemp(
+            prefix=f"{os.path.basename(path)}.", suffix=".building", dir=directory
+        )
+        os.close(scratch)
+        if copy_existing and os.path.exists(path):
+            # Published files are never written in place, so a plain copy is consistent
+            shutil.copyfile(path, build_path)
+    except BlockingIOError:
+        os.close(fd)
+        raise BuildInProgress(f"Another build of {path} is in progress")
+    except BaseException:
+        os.close(fd)
+        raise
+    _build_locks[build_path] = fd
+    return build_path
+
+
+def _release_build(build_path: str) -> None:
+    fd = _build_locks.pop(build_path, None)
+    if fd is not None:
+        _unlock(fd)
+        os.close(fd)
+
+
+def abandon_build(build_path: str) -> None:
+    """Remove an unpublished build and release the build lock."""
+    try:
+        for suffix in BUILD_SUFFIXES:
+            if os.path.exists(build_path + suffix):
+                os.remove(build_path + suffix)
+    finally:
+        _release_build(build_path)
+
+
+def connect_build(path: str) -> sqlite3.Connection:
+    """Open a connection with the build profile (WAL, bulk-load pragmas).
+
+    Meant for a fresh file that replaces the served database once complete;
+    call finish_build before publishing it.
+    """
+    conn = sqlite3.connect(path)
     conn.row_factory = sqlite3.Row
-    return conn
\ No newline at end of file
+    for pragma in BUILD_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def finish_build(conn: sqlite3.Connection) -> None:
+    """Prepare a built database for serving.
+
+    Folds the WAL back into the main file and switches back to a rollback
+    journal, so the result is a single file that read-only and immutable
+    connections can open, then refreshes the planner statistics.
+    """
+    conn.commit()
+    conn.execute("PRAGMA optimize")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("PRAGMA journal_mode = DELETE")
+
+
+def publish_build(build_path: str, path: str) -> None:
+    """Atomically replace the database at path with a finished build.
+
+    Releases the build lock taken by prepare_build.
+    """
+    try:
+        os.replace(build_path, path)
+    finally:
+        _release_build(build_path)
@@ -0,0 +1,185 @@
+import logging
+from typing import Dict, List
+import numpy as np
+from .card_index import CardIndex
+from .decklist import Decklist
+
+logger = logging.getLogger(__name__)
+
+# Costs at or above this value share the last cost curve bucket ("7+")
+MAX_CURVE_COST = 7
+
+# Each aspect icon not provided by the leader or base costs this many resources
+ASPECT_PENALTY = 2
+
+# Decks analyzed per set of matrix products
+ANALYSIS_CHUNK_SIZE = 256
+
+
+class DeckAnalyzer:
+    """Deck statistics computed over a precomputed per-card feature matrix.
+
+    Each deck is a vector of card counts over the catalog, so cost curve,
+    aspect, arena, trait and keyword totals for any number of decks are a
+    single matrix product each, and the aspect penalty is a product against
+    the aspects each deck's leader and base do not provide.
+    """
+
+    def __init__(self, card_index: CardIndex):
+        """Build the feature matrices from the card index.
+
+        Args:
+            card_index: Index over the card catalog
+        """
+        self.card_index = card_index
+        postings = card_index.postings
+
+        costs = card_index.numeric["cost"]
+        buckets = np.clip(np.nan_to_num(costs, nan=-1), -1, MAX_CURVE_COST).astype(int)
+        self.cost_labels = [str(c) for c in range(MAX_CURVE_COST)] + [f"{MAX_CURVE_COST}+"]
+        self.cost_features = np.zeros((card_index.size, MAX_CURVE_COST + 1), dtype=np.float32)
+        has_cost = buckets >= 0
+        self.cost_features[np.flatnonzero(has_cost), buckets[has_cost]] = 1
+        self.costs = np.nan_to_num(costs, nan=0).astype(np.float32)
+        self.has_cost = has_cost.astype(np.float32)
+
+        types = card_index.facet_values["type"]
+        self.is_unit = (
+            postings["type"][types.index("Unit")] if "Unit" in types
+            else np.zeros(card_index.size, dtype=bool)
+        )
+
+        self.aspect_values = card_index.facet_values["aspect"]
+        self.aspect_features = postings["aspect"].T.astype(np.float32)
+        self.arena_values = card_index.facet_values["arena"]
+        self.arena_features = (postings["arena"] & self.is_unit).T.astype(np.float32)
+        self.trait_values = card_index.facet_values["trait"]
+        self.trait_features = postings["trait"].T.astype(np.float32)
+        self.keyword_values = card_index.facet_values["keyword"]
+        self.keyword_features = postings["keyword"].T.astype(np.float32)
+
+        logger.info(f"Built deck feature matrix over {card_index.size} cards")
+
+    def _vectorize(self, decks: List[Decklist]):
+        """Turn decklists into a count matrix and a provided-aspects matrix.
+
+        The count matrix only has columns for the cards the decks contain,
+        so its size follows the decks rather than the catalog.
+
+        Returns:
+            Tuple of (catalog positions of the count matrix's columns, count
+            matrix, provided-aspects matrix, unknown card IDs per deck)
+        """
+        positions = self.card_index.position_by_id
+        provided = np.zeros((len(decks), len(self.aspect_values)), dtype=bool)
+        rows, cards, card_counts = [], [], []
+        unknown = []
+        for row, deck in enumerate(decks):
+            missing = []
+            for card in deck.cards:
+                position = positions.get(card.id)
+                if position is None:
+                    missing.append(card.id)
+                else:
+                    rows.append(row)
+                    cards.append(position)
+                    card_counts.append(card.count)
+            for card_id in (deck.leader, deck.base):
+                position = positions.get(card_id) if card_id else None
+                if position is None:
+                    if card_id:
+                        missing.append(card_id)
+                else:
+                    provided[row] |= self.card_index.postings["aspect"][:, position]
+            unknown.append(missing)
+
+        columns, column_of = np.unique(np.array(cards, dtype=np.int64), return_inverse=True)
+        counts = np.zeros((len(decks), len(columns)), dtype=np.float32)
+        np.add.at(counts, (np.array(rows, dtype=np.int64), column_of), card_counts)
+        return columns, counts, provided, unknown
+
+    @staticmethod
+    def _ranked(values: List[str], totals: np.ndarray, deck_size: float) -> List[Dict]:
+        present = np.flatnonzero(totals)
+        order = present[np.argsort(-totals[present], kind="stable")]
+        return [
+            {
+                "value": values[i],
+                "count": int(totals[i]),
+                "density": round(float(totals[i]) / deck_size, 3) if deck_size else 0.0
+            }
+            for i in order
+        ]
+
+    def analyze_many(self, decks: List[Decklist]) -> List[Dict]:
+        """Analyze a batch of decks with one matrix product per statistic.
+
+        Decks are analyzed ANALYSIS_CHUNK_SIZE at a time, which bounds the
+        memory a batch takes however many decks it holds.
+
+        Args:
+            decks: Decklists to analyze
+
+        Returns:
+            One statistics dictionary per deck, in input order
+        """
+        results = []
+        for start in range(0, len(decks), ANALYSIS_CHUNK_SIZE):
+            results.extend(self._analyze_chunk(decks[start:start + ANALYSIS_CHUNK_SIZE]))
+        return results
+
+    def _analyze_chunk(self, decks: List[Decklist]) -> List[Dict]:
+        columns, counts, provided, unknown = self._vectorize(decks)
+
+        sizes = counts.sum(axis=1)
+        costed = counts @ self.has_cost[columns]
+        total_cost = counts @ self.costs[columns]
+        curves = counts @ self.cost_features[columns]
+        aspects = counts @ self.aspect_features[columns]
+        arenas = counts @ self.arena_features[columns]
+        traits = counts @ self.trait_features[columns]
+        keywords = counts @ self.keyword_features[columns]
+
+        # Icons each card is missing given each deck's leader and base
+        missing_icons = (~provided).astype(np.float32) @ self.aspect_features[columns].T
+        penalties = ASPECT_PENALTY * missing_icons * (counts > 0)
+        penalty_totals = (penalties * counts).sum(axis=1)
+
+        results = []
+        for row in range(len(decks)):
+            size = float(sizes[row])
+            off_aspect = [
+                {
+                    "id": self.card_index.ids[columns[i]],
+                    "name": self.card_index.cards[columns[i]]["name"],
+                    "count": int(counts[row, i]),
+                    "penalty": int(penalties[row, i])
+                }
+                for i in np.flatnonzero(penalties[row])
+            ]
+            results.append({
+                "total_cards": int(size),
+                "unknown_cards": unknown[row],
+                "average_cost": round(float(total_cost[row] / costed[row]), 2) if costed[row] else None,
+                "cost_curve": dict(zip(self.cost_labels, curves[row].astype(int).tolist())),
+                "aspects": {
+                    value: int(count)
+                    for value, count in zip(self.aspect_values, aspects[row]) if count
+                },
+                "aspect_penalty": {
+                    "provided": [v for v, p in zip(self.aspect_values, provided[row]) if p],
+                    "total": int(penalty_totals[row]),
+                    "cards": off_aspect
+                },
+                "arenas": {
+                    value: int(count)
+                    for value, count in zip(self.arena_values, arenas[row]) if count
+                },
+                "traits": self._ranked(self.trait_values, traits[row], size),
+                "keywords": self._ranked(self.keyword_values, keywords[row], size)
+            })
+        return results
+
+    def analyze(self, deck: Decklist) -> Dict:
+        """Analyze a single deck."""
+        return self.analyze_many([deck])[0]
@@ -0,0 +1,160 @@
+import os
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from .card_index import CardIndex
+from .decklist import Decklist
+
+logger = logging.getLogger(__name__)
+
+# Deck construction rules per format (Comprehensive Rules 9.2 and 10)
+FORMATS = {
+    "premier": {"min_deck_size": 50, "max_copies": 3},
+    "limited": {"min_deck_size": 30, "max_copies": None},
+}
+
+# Comma-separated set codes legal for play, e.g. "SOR,SHD,TWI"; all sets when unset
+LEGAL_SETS_ENV = "SWU_LEGAL_SETS"
+
+
+def default_legal_sets() -> Optional[List[str]]:
+    value = os.getenv(LEGAL_SETS_ENV)
+    if not value:
+        return None
+    return [code.strip() for code in value.split(",") if code.strip()]
+
+
+def _error(code: str, message: str, **details) -> Dict:
+    return {"code": code, "message": message, **details}
+
+
+class DeckValidator:
+    """Deck legality checks over in-memory card lookups.
+
+    Each card ID maps to a small tuple of what the rules care about (copy
+    identity, type and set), so validating a deck is a handful of dictionary
+    reads per entry and never touches the database.
+    """
+
+    def __init__(self, card_index: CardIndex):
+        """Build the lookup table from the card index.
+
+        Args:
+            card_index: Index over the card catalog
+        """
+        self.card_index = card_index
+        # Reprints share a name and subtitle and count as copies of each other
+        self.cards: Dict[str, Tuple[Tuple[str, str], str, str, str]] = {
+            card["id"]: (
+                (card["name"], card["subtitle"] or ""),
+                card["type"],
+                card["set_code"],
+                card["name"] if not card["subtitle"] else f"{card['name']}, {card['subtitle']}"
+            )
+            for card in card_index.cards
+        }
+
+    def _check_command_card(self, card_id: Optional[str], expected_type: str,
+                            legal_sets: Optional[set], errors: List[Dict]) -> None:
+        slot = expected_type.lower()
+        if not card_id:
+            errors.append(_error(f"MISSING_{expected_type.upper()}",
+                                 f"Deck must have exactly one {slot}"))
+            return
+        card = self.cards.get(card_id)
+        if card is None:
+            errors.append(_error("UNKNOWN_CARD", f"Unknown card {card_id}", card_id=card_id))
+            return
+        if card[1] != expected_type:
+            errors.append(_error(f"INVALID_{expected_type.upper()}",
+                                 f"{card[3]} is a {card[1]}, not a {slot}", card_id=card_id))
+        if legal_sets is not None and card[2] not in legal_sets:
+            errors.append(_error("SET_NOT_LEGAL", f"{card[3]} is from a set that is not legal",
+                                 card_id=card_id, set_code=card[2]))
+
+    def validate_entries(self, leader: Optional[str], base: Optional[str],
+                         entries: Iterable[Tuple[str, int]], format: str = "premier",
+                         legal_sets: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Validate a deck given as plain values.
+
+        Args:
+            leader: Leader card ID
+            base: Base card ID
+            entries: (card ID, count) pairs for the main deck
+            format: Key into FORMATS
+            legal_sets: Set codes legal for play, or None for all sets
+
+        Returns:
+            List of violations, each with a code, a message and details;
+            empty when the deck is legal
+        """
+        rules = FORMATS[format]
+        legal = set(legal_sets) if legal_sets is not None else None
+        errors: List[Dict] = []
+
+        self._check_command_card(leader, "Leader", legal, errors)
+        self._check_command_card(base, "Base", legal, errors)
+
+        size = 0
+        copies: Dict[Tuple[str, str], int] = {}
+        names: Dict[Tuple[str, str], str] = {}
+        for card_id, count in entries:
+            card = self.cards.get(card_id)
+            if card is None:
+                errors.append(_error("UNKNOWN_CARD", f"Unknown card {card_id}", card_id=card_id))
+                continue
+            identity, card_type, set_code, name = card
+            size += count
+            copies[identity] = copies.get(identity, 0) + count
+            names[identity] = name
+            if card_type in ("Leader", "Base"):
+                errors.append(_error("COMMAND_CARD_IN_DECK",
+                                     f"{name} is a {card_type} and cannot be in the main deck",
+                                     card_id=card_id))
+            if legal is not None and set_code not in legal:
+                errors.append(_error("SET_NOT_LEGAL", f"{name} is from a set that is not legal",
+                                     card_id=card_id, set_code=set_code))
+
+        if size < rules["min_deck_size"]:
+            errors.append(_error("DECK_TOO_SMALL",
+                                 f"Deck has {size} cards, minimum is {rules['min_deck_size']}",
+                                 size=size, minimum=rules["min_deck_size"]))
+
+        max_copies = rules["max_copies"]
+        if max_copies is not None:
+            for identity, count in copies.items():
+                if count > max_copies:
+                    errors.append(_error("TOO_MANY_COPIES",
+                                         f"{count} copies of {names[identity]}, maximum is {max_copies}",
+                                         name=names[identity], count=count, maximum=max_copies))
+        return errors
+
+    def validate(self, deck: Decklist, format: str = "premier",
+                 legal_sets: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Validate a parsed decklist."""
+        return self.validate_entries(
+            deck.leader, deck.base, ((card.id, card.count) for card in deck.cards),
+            format, legal_sets
+        )
+
+    def validate_raw(self, data, format: str = "premier",
+                     legal_sets: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Validate a decklist decoded straight from JSON.
+
+        Skips model parsing for bulk imports; malformed decklists are
+        reported as an INVALID_DECKLIST violation instead of raising.
+        """
+        try:
+            entries = [
+                (str(card["id"]), int(card.get("count", 1)))
+                for card in data.get("cards", [])
+            ]
+            if any(count < 1 for _, count in entries):
+                raise ValueError("card counts must be positive")
+            leader = data.get("leader")
+            base = data.get("base")
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            return [_error("INVALID_DECKLIST", f"Malformed decklist: {e}")]
+        return self.validate_entries(
+            str(leader) if leader else None, str(base) if base else None,
+            entries, format, legal_sets
+        )
@@ -0,0 +1,14 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class DeckCard(BaseModel):
+    id: str
+    count: int = Field(1, ge=1)
+
+
+class Decklist(BaseModel):
+    """A deck as submitted by clients: leader, base and main-deck cards with counts."""
+    leader: Optional[str] = None
+    base: Optional[str] = None
+    cards: List[DeckCard] = []
@@ -0,0 +1,139 @@
+import os
+import hashlib
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .metrics import cache_hit
+
+# Cache-Control per path prefix, first match wins. Aspects and types only
+# change with a new set, so browsers and the CDN may keep them for a day.
+# Card art practically never changes, so images are kept for a week.
+CACHE_POLICIES: Tuple[Tuple[str, str], ...] = (
+    ("/api/images", "public, max-age=604800, stale-while-revalidate=2592000"),
+    ("/api/aspects", "public, max-age=86400, stale-while-revalidate=604800"),
+    ("/api/types", "public, max-age=86400, stale-while-revalidate=604800"),
+)
+
+# Everything else is revalidated after a minute; revalidation is a cheap 304
+DEFAULT_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+
+def database_version(db_path: str) -> Optional[str]:
+    """Version stamp for a database file, changing whenever it is rebuilt.
+
+    Returns:
+        Short hex digest of the file's size and modification time, or None
+        when the file does not exist
+    """
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+
+
+def make_etag(version: str, path: str, query_string: str) -> str:
+    """Weak ETag for a read request against a catalog version.
+
+    Query parameters are sorted so equivalent requests share an ETag. The
+    tag is weak because the compression middleware may encode the body
+    differently for different clients.
+    """
+    params = sorted(parse_qsl(query_string))
+    digest = hashlib.sha1(repr((version, path, params)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def cache_control_for(path: str) -> str:
+    for prefix, policy in CACHE_POLICIES:
+        if path.startswith(prefix):
+            return policy
+    return DEFAULT_CACHE_CONTROL
+
+
+class ConditionalCacheMiddleware:
+    """ETag and Cache-Control for read endpoints, answering revalidations with 304.
+
+    The ETag is derived from the catalog version and the normalized request,
+    so a matching If-None-Match is answered before the request reaches the
+    app and never touches the database.
+    """
+
+    def __init__(self, app: ASGIApp, version: Callable[[], Optional[str]],
+                 prefix: str = "/api/", exclude: Tuple[str, ...] = ()):
+        """
+        Args:
+            app: ASGI app to wrap
+            version: Returns the current catalog version, or None when
+                there is no catalog (no caching headers are sent then)
+            prefix: Only GET/HEAD requests under this path are cached
+            exclude: Path prefixes that are never cached
+        """
+        self.app = app
+        self.version = version
+        self.prefix = prefix
+        self.exclude = exclude
+
+    def _cacheable(self, scope: Scope) -> bool:
+        if scope["type"] != "http":
+            return False
+        path = scope["path"]
+        return (
+            scope["method"] in ("GET", "HEAD")
+            and path.startswith(self.prefix)
+            and not path.startswith(self.exclude)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self._cacheable(scope):
+            await self.app(scope, receive, send)
+            return
+
+        version = self.version()
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        etag = make_etag(version, path, scope.get("query_string", b"").decode("latin-1"))
+        cache_headers: Dict[str, str] = {
+            "ETag": etag,
+            "Cache-Control": cache_control_for(path),
+        }
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        revalidated = bool(if_none_match) and etag_matches(if_none_match, etag)
+        if if_none_match:
+            cache_hit("http", revalidated)
+        if revalidated:
+            headers = MutableHeaders(raw=[])
+            for name, value in cache_headers.items():
+                headers[name] = value
+            headers["Vary"] = "Accept-Encoding"
+            await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cache_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(raw=message["headers"])
+                for name, value in cache_headers.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_headers)
@@ -0,0 +1,359 @@
+import os
+import io
+import time
+import hashlib
+import logging
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+import requests
+from .metrics import cache_hit
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it only originals are served
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Cache directory and size bound; SWU_IMAGE_CACHE and SWU_IMAGE_CACHE_MB
+# override the defaults
+IMAGE_CACHE_ENV = "SWU_IMAGE_CACHE"
+IMAGE_CACHE_SIZE_ENV = "SWU_IMAGE_CACHE_MB"
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# Access times are only rewritten when older than this, so a burst of
+# requests for the same image doesn't turn every read into a write
+TOUCH_INTERVAL = 60.0
+
+
+@dataclass(frozen=True)
+class ImageVariant:
+    """A derived image: fit within max_size (None keeps the size) in a format."""
+    max_size: Optional[Tuple[int, int]]
+    format: str
+    quality: int
+
+    @property
+    def content_type(self) -> str:
+        return f"image/{self.format.lower()}"
+
+
+# Variants served by /api/images, keyed "<size>.<format>". Card art is
+# 5:7; thumbnails match the card grid at 2x.
+VARIANTS: Dict[str, ImageVariant] = {
+    "thumb.webp": ImageVariant((300, 420), "WEBP", 80),
+    "thumb.jpeg": ImageVariant((300, 420), "JPEG", 85),
+    "full.webp": ImageVariant(None, "WEBP", 85),
+    "full.jpeg": ImageVariant(None, "JPEG", 90),
+}
+
+# Variants generated ahead of time by build_database; the JPEG fallbacks
+# are generated on first request
+PREBUILT_VARIANTS = ("thumb.webp", "full.webp")
+
+INDEX_SCHEMA = '''
+    -- Remote image URL -> digest of the fetched bytes
+    CREATE TABLE IF NOT EXISTS sources (
+        url TEXT PRIMARY KEY,
+        digest TEXT NOT NULL
+    );
+
+    -- Derived images of an original, by variant name
+    CREATE TABLE IF NOT EXISTS variants (
+        digest TEXT,
+        variant TEXT,
+        blob TEXT NOT NULL,
+        PRIMARY KEY(digest, variant)
+    ) WITHOUT ROWID;
+
+    -- Stored files, named by the SHA-256 of their content
+    CREATE TABLE IF NOT EXISTS blobs (
+        digest TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        content_type TEXT NOT NULL,
+        last_access REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_blobs_access ON blobs(last_access);
+'''
+
+SIGNATURES = (
+    (b"\x89PNG", "image/png"),
+    (b"\xff\xd8", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+)
+
+
+class ImageFetchError(Exception):
+    """Raised when an image can't be fetched or decoded."""
+
+
+def image_cache_path() -> str:
+    """Cache directory (SWU_IMAGE_CACHE or ~/.swu/images)."""
+    path = os.getenv(IMAGE_CACHE_ENV)
+    if path:
+        return os.path.abspath(os.path.expanduser(path))
+    return os.path.join(os.path.expanduser("~"), ".swu", "images")
+
+
+def sniff_content_type(data: bytes) -> str:
+    """Content type of image bytes from their signature."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    return "application/octet-stream"
+
+
+def fetch_url(url: str, timeout: float = 30.0) -> bytes:
+    """Image bytes from an http(s) URL.
+
+    Image URLs come from upstream card data, so nothing else is fetched:
+    a file:// URL or local path would let the catalog read the server's
+    files.
+    """
+    if urlsplit(url).scheme not in ("http", "https"):
+        raise ImageFetchError(f"Refusing to fetch {url}: only http(s) image URLs are fetched")
+    try:
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.content
+    except requests.RequestException as e:
+        raise ImageFetchError(f"Failed to fetch {url}: {e}") from e
+
+
+def render_variant(data: bytes, variant: ImageVariant) -> bytes:
+    """Resize and re-encode an original image.
+
+    Raises:
+        ImageFetchError: If the original can't be decoded
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ImageFetchError(f"Unreadable image: {e}") from e
+    if variant.max_size is not None:
+        image.thumbnail(variant.max_size, Image.LANCZOS)
+    if variant.format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    out = io.BytesIO()
+    image.save(out, variant.format, quality=variant.quality)
+    return out.getvalue()
+
+
+class ImageCache:
+    """Content-addressed, size-bounded disk cache of card images.
+
+    Each remote image is fetched once. Originals and their variants are
+    stored as files named by the SHA-256 of their content, so art shared by
+    several cards is stored once, and a SQLite index maps URLs to originals
+    and originals to variants. When the files exceed max_bytes the least
+    recently used ones are evicted; an evicted original or variant is
+    fetched or rendered again on its next request.
+
+    Safe to use from several threads and processes: the index is a WAL
+    database opened per operation and files are written atomically.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None,
+                 fetch: Callable[[str], bytes] = fetch_url):
+        """
+        Args:
+            root: Cache directory; defaults to image_cache_path()
+            max_bytes: Size bound; defaults to SWU_IMAGE_CACHE_MB or 1 GiB
+            fetch: Returns the bytes of an image URL; replaceable for tests
+        """
+        self.root = root or image_cache_path()
+        if max_bytes is None:
+            megabytes = os.getenv(IMAGE_CACHE_SIZE_ENV)
+            max_bytes = int(megabytes) * 1024 * 1024 if megabytes else DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+        self.fetch = fetch
+        os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(INDEX_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Index connection for one transaction, committed and closed on exit."""
+        conn = sqlite3.connect(os.path.join(self.root, "index.db"), timeout=30)
+        try:
+            conn.execute("PRAGMA synchronous = NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def _read_blob(self, conn: sqlite3.Connection, digest: Optional[str]) -> Optional[Tuple[bytes, str]]:
+        """Contents and content type of a stored file, refreshing its access time."""
+        if digest is None:
+            return None
+        row = conn.execute(
+            "SELECT content_type, last_access FROM blobs WHERE digest = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(self.blob_path(digest), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            return None
+        now = time.time()
+        if now - row[1] > TOUCH_INTERVAL:
+            conn.execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (now, digest))
+        return data, row[0]
+
+    def _write_blob(self, conn: sqlite3.Connection, data: bytes, content_type: str) -> str:
+        """Store bytes under their digest and return it."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, scratch = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(scratch, path)
+        conn.execute(
+            "INSERT OR REPLACE INTO blobs (digest, size, content_type, last_access) VALUES (?, ?, ?, ?)",
+            (digest, len(data), content_type, time.time())
+        )
+        return digest
+
+    def original(self, url: str) -> Tuple[str, bytes, str]:
+        """Digest, bytes and content type of the image at url, fetching it on a miss.
+
+        Raises:
+            ImageFetchError: If the image has to be fetched and can't be
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT digest FROM sources WHERE url = ?", (url,)).fetchone()
+            stored = self._read_blob(conn, row[0] if row else None)
+        cache_hit("image", stored is not None)
+        if stored is not None:
+            return row[0], stored[0], stored[1]
+
+        data = self.fetch(url)
+        content_type = sniff_content_type(data)
+        with self._connect() as conn:
+            digest = self._write_blob(conn, data, content_type)
+            conn.execute("INSERT OR REPLACE INTO sources (url, digest) VALUES (?, ?)", (url, digest))
+        self.evict()
+        return digest, data, content_type
+
+    def get(self, url: str, variant: str) -> Tuple[bytes, str]:
+        """Bytes and content type of a variant of the image at url.
+
+        Variants are rendered from the original on first request. Without
+        Pillow the original is returned instead.
+
+        Raises:
+            KeyError: If variant is not in VARIANTS
+            ImageFetchError: If the original can't be fetched or decoded
+        """
+        spec = VARIANTS[variant]
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT v.blob FROM sources s JOIN variants v ON v.digest = s.digest "
+                "WHERE s.url = ? AND v.variant = ?", (url, variant)
+            ).fetchone()
+            stored = self._read_blob(conn, row[0] if row else None)
+        if stored is not None:
+            cache_hit("image_variant", True)
+            return stored
+
+        digest, data, content_type = self.original(url)
+        if Image is None:
+            return data, content_type
+        cache_hit("image_variant", False)
+        rendered = render_variant(data, spec)
+        with self._connect() as conn:
+            blob = self._write_blob(conn, rendered, spec.content_type)
+            conn.execute(
+                "INSERT OR REPLACE INTO variants (digest, variant, blob) VALUES (?, ?, ?)",
+                (digest, variant, blob)
+            )
+        self.evict()
+        return rendered, spec.content_type
+
+    def size(self) -> int:
+        """Bytes currently stored."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def evict(self) -> int:
+        """Remove least recently used files until the cache fits max_bytes.
+
+        URL mappings are kept, so a variant stays servable after its
+        original has been evicted.
+
+        Returns:
+            Number of files removed
+        """
+        removed = 0
+        with self._connect() as conn:
+            excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0] - self.max_bytes
+            if excess <= 0:
+                return 0
+            for digest, size in conn.execute(
+                    "SELECT digest, size FROM blobs ORDER BY last_access").fetchall():
+                if excess <= 0:
+                    break
+                try:
+                    os.remove(self.blob_path(digest))
+                except FileNotFoundError:
+                    pass
+                conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                conn.execute("DELETE FROM variants WHERE blob = ?", (digest,))
+                excess -= size
+                removed += 1
+        return removed
+
+    def prefetch(self, urls: Iterable[str], variants: Iterable[str] = PREBUILT_VARIANTS,
+                 workers: int = 8) -> Dict[str, int]:
+        """Fetch images and render variants ahead of time.
+
+        Args:
+            urls: Image URLs; duplicates are fetched once
+            variants: Variant names to render for each image
+            workers: Concurrent fetches
+
+        Returns:
+            Counts of images done and failed
+        """
+        variants = tuple(variants)
+
+        def warm(url: str) -> bool:
+            try:
+                for variant in variants:
+                    self.get(url, variant)
+                return True
+            except ImageFetchError as e:
+                logger.warning(str(e))
+                return False
+
+        unique = sorted(set(urls))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(warm, unique))
+        return {"images": results.count(True), "failed": results.count(False)}
+
+
+def card_image_urls(conn: sqlite3.Connection) -> Iterable[str]:
+    """Every front and back image URL in the card database."""
+    for front, back in conn.execute("SELECT image_uri, image_back_uri FROM cards"):
+        if front:
+            yield front
+        if back:
+            yield back
@@ -1,13 +1,14 @@
-from swu_api_client import SWUApiClient
-import os
+from .swu_api_client import SWUApiClient
+from .database import database_path
 
 def main():
-    # Use absolute path to the database in the backend directory
-    db_path = os.path.abspath('swu_cards.db')
+    # The database the API serves (SWU_DB_PATH or ~/.swu/swu_cards.db)
+    db_path = database_path()
     print(f"Using database at: {db_path}")
     
     # Create a new client instance
     client = SWUApiClient(database_path=db_path)
+    built = False
     
     try:
         # Build the database with real SWU data
@@ -35,13 +36,15 @@ def main():
         print("\nCard types:")
         for type_name, count in type_counts:
             print(f"  {type_name}: {count}")
+        built = True
             
     except Exception as e:
         print(f"Error building database: {e}")
         import traceback
         traceback.print_exc()
     finally:
-        client._close_db_connection()
+        # Only a complete build replaces the served database
+        client._close_db_connection(publish=built)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,19 +1,63 @@
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Depends, Header, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 import sqlite3
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple, Union
+import hmac
 import json
 import os
+import time
+import threading
 import logging
+import orjson
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import BaseModel, Field
 from .vector_db import VectorDB
+from .rules_index import RulesIndex
+from .card_index import CardIndex
+from .card_filters import CardFilters, card_filters
+from .card_queries import fetch_cards_by_ids, iter_card_batches, iter_cards_by_ids
+from .card_neighbors import similar_cards
+from .price_queries import price_movers, price_series, price_stats
+from .image_cache import ImageCache, ImageFetchError
+from .catalog_changes import changes_since
+from .catalog_refresh import CatalogRefresher, catalog_diff, sync_catalog
+from .catalog_snapshot import MEDIA_TYPE as SNAPSHOT_MEDIA_TYPE, encode_snapshot, parse_range, read_header, read_snapshot
+from .card_fields import card_fields, project_card
+from .decklist import Decklist
+from .deck_analysis import DeckAnalyzer
+from .deck_validation import FORMATS, DeckValidator, default_legal_sets
+from .compression import CompressionMiddleware
+from .http_cache import DEFAULT_CACHE_CONTROL, ConditionalCacheMiddleware, database_version, etag_matches
+from .metrics import (
+    WARMUP_SECONDS, MetricsMiddleware, cache_hit, instrument_connection, metrics_registry,
+    process_memory, update_process_memory
+)
+from .sql_trace import TracedConnection, query_tracer
+from .database import (
+    build_in_progress, close_serving, connect_serving, database_path, pin_serving, unpin_serving, warm_up
+)
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging. Debug output costs a formatted line per request, so it
+# is opt-in with SWU_LOG_LEVEL=DEBUG; force replaces vector_db's import-time setup
+logging.basicConfig(level=os.getenv("SWU_LOG_LEVEL", "INFO").upper(), force=True)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Star Wars Unlimited API")
+app = FastAPI(title="Star Wars Unlimited API", default_response_class=ORJSONResponse)
 
-# Configure CORS for frontend access
+# Negotiated gzip/brotli for anything over a typical single-card payload
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# ETag/Cache-Control on read endpoints; revalidations are answered with 304
+# before reaching a handler. The catalog snapshot carries its own strong
+# ETag, which range requests need.
+app.add_middleware(
+    ConditionalCacheMiddleware, version=lambda: get_catalog_version(),
+    exclude=("/api/admin", "/api/catalog/snapshot")
+)
+
+# Configure CORS for frontend access (outermost, so 304s carry CORS headers too)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
@@ -22,15 +66,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and SQL counts, outermost so every response is measured
+app.add_middleware(MetricsMiddleware)
+
 # Initialize vector database
 vector_db = VectorDB()
 
-def get_db():
-    # Use the database in the user's home directory
-    home_dir = os.path.expanduser("~")
-    db_path = os.path.join(home_dir, '.swu', 'swu_cards.db')
+# Card database (SWU_DB_PATH or ~/.swu/swu_cards.db)
+DB_PATH = database_path()
+# File serving connections open: DB_PATH, or after a hot swap a private
+# link to the build that was swapped in (see pin_serving)
+serving_path: str = DB_PATH
+# Link swapped out by the last catalog swap, removed by the next one:
+# requests that read serving_path just before a swap may still be opening it
+retired_path: Optional[str] = None
+# Serializes catalog swaps
+reload_lock = threading.Lock()
+catalog_refresher: Optional[CatalogRefresher] = None
+
+# In-memory indexes, built on first use
+rules_index: Optional[RulesIndex] = None
+card_index: Optional[CardIndex] = None
+# Version stamp of the database the card index was built from
+catalog_version: Optional[str] = None
+deck_analyzer: Optional[DeckAnalyzer] = None
+deck_validator: Optional[DeckValidator] = None
+image_cache: Optional[ImageCache] = None
+# (catalog version, snapshot version, snapshot bytes) of the served snapshot
+catalog_snapshot: Optional[Tuple[str, str, bytes]] = None
+
+def get_db(check_same_thread: bool = True):
+    db_path = serving_path
     
-    logger.debug(f"Attempting to connect to database at: {db_path}")
+    logger.debug("Attempting to connect to database at: %s", db_path)
     
     if not os.path.exists(db_path):
         logger.error(f"Database not found at {db_path}")
@@ -40,8 +108,9 @@ def get_db():
         )
     
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
+        conn = instrument_connection(connect_serving(
+            db_path, factory=TracedConnection, check_same_thread=check_same_thread
+        ))
         logger.debug("Successfully connected to database")
         return conn
     except sqlite3.Error as e:
@@ -51,176 +120,695 @@ def get_db():
             detail=f"Failed to connect to database: {str(e)}"
         )
 
+def get_rules_index() -> RulesIndex:
+    global rules_index
+    cache_hit("rules_index", rules_index is not None)
+    if rules_index is None:
+        db = get_db()
+        try:
+            rules_index = RulesIndex.build(db)
+        finally:
+            db.close()
+    return rules_index
+
+def get_card_index() -> CardIndex:
+    global card_index, catalog_version
+    cache_hit("card_index", card_index is not None)
+    if card_index is None:
+        db = get_db()
+        try:
+            card_index = CardIndex.build(db)
+        finally:
+            db.close()
+        catalog_version = database_version(serving_path)
+    return card_index
+
+def get_catalog_version() -> Optional[str]:
+    # Responses are versioned by the catalog the card index serves
+    if card_index is None:
+        try:
+            get_card_index()
+        except HTTPException:
+            return None
+    return catalog_version
+
+def known_card_filters(filters: CardFilters = Depends(card_filters)) -> CardFilters:
+    """card_filters, rejecting leader and base IDs that are not in the catalog.
+
+    An unknown ID would otherwise provide no aspects and quietly narrow the
+    results to aspectless cards.
+    """
+    for param in ("leader", "base"):
+        card_id = getattr(filters, param)
+        if card_id and card_id not in get_card_index().position_by_id:
+            raise HTTPException(status_code=422, detail=f"Unknown {param} card ID: {card_id}")
+    return filters
+
+def get_deck_analyzer() -> DeckAnalyzer:
+    global deck_analyzer
+    index = get_card_index()
+    # The feature matrix follows whichever card index is current
+    if deck_analyzer is None or deck_analyzer.card_index is not index:
+        deck_analyzer = DeckAnalyzer(index)
+    return deck_analyzer
+
+def get_deck_validator() -> DeckValidator:
+    global deck_validator
+    index = get_card_index()
+    if deck_validator is None or deck_validator.card_index is not index:
+        deck_validator = DeckValidator(index)
+    return deck_validator
+
+def get_image_cache() -> ImageCache:
+    global image_cache
+    if image_cache is None:
+        image_cache = ImageCache()
+    return image_cache
+
+def get_catalog_snapshot() -> Tuple[str, bytes]:
+    global catalog_snapshot
+    version = get_catalog_version()
+    if catalog_snapshot is None or catalog_snapshot[0] != version:
+        db = get_db()
+        try:
+            data = read_snapshot(db)
+        finally:
+            db.close()
+        if data is None:
+            # Databases built before snapshots were added
+            data = encode_snapshot(get_card_index().cards)
+        catalog_snapshot = (version, read_header(data)["version"], data)
+    return catalog_snapshot[1], catalog_snapshot[2]
+
+def reload_catalog(force: bool = False) -> Optional[Dict]:
+    """Swap in the database published at DB_PATH if it isn't the one being served.
+
+    The new indexes are built while the current ones keep serving, then
+    every global is switched over; requests already running finish on the
+    old database and indexes.
+
+    Args:
+        force: Rebuild the indexes even if the file hasn't changed
+
+    Returns:
+        Cards added, updated and removed, or None if nothing changed
+    """
+    global serving_path, retired_path, card_index, catalog_version, rules_index
+    global deck_analyzer, deck_validator, catalog_snapshot
+    with reload_lock:
+        version = database_version(DB_PATH)
+        if version is None or (version == catalog_version and not force):
+            return None
+        pinned = pin_serving(DB_PATH)
+        try:
+            conn = instrument_connection(connect_serving(pinned, factory=TracedConnection))
+            try:
+                new_index = CardIndex.build(conn)
+                new_rules = RulesIndex.build(conn)
+            finally:
+                conn.close()
+            previous_cards = card_index.cards if card_index is not None else []
+            changes = catalog_diff(previous_cards, new_index.cards)
+            new_analyzer, new_validator = DeckAnalyzer(new_index), DeckValidator(new_index)
+            warm_up(pinned)
+        except Exception:
+            if pinned != serving_path:
+                unpin_serving(pinned, DB_PATH)
+            raise
+
+        previous_path = serving_path
+        serving_path, card_index, rules_index = pinned, new_index, new_rules
+        deck_analyzer, deck_validator, catalog_snapshot = new_analyzer, new_validator, None
+        catalog_version = database_version(pinned)
+        if previous_path != pinned:
+            if retired_path is not None and retired_path != pinned:
+                unpin_serving(retired_path, DB_PATH)
+            retired_path = previous_path
+        return changes
+
+def preload_indexes() -> None:
+    """Build every in-memory index and cache the catalog serves from.
+
+    Called by the startup hook, and by serve.py in the parent process
+    before it forks workers, which then find them built.
+    """
+    get_card_index()
+    get_rules_index()
+    get_deck_analyzer()
+    get_deck_validator()
+    get_catalog_snapshot()
+
+@app.on_event("startup")
+async def build_indexes():
+    # Warm the page cache and the in-memory indexes so the first requests
+    # don't pay for them
+    start = time.perf_counter()
+    try:
+        if os.path.exists(DB_PATH):
+            warmed = warm_up(serving_path)
+            logger.info("Warmed %d database pages (%.1f MB) in %.3fs",
+                        warmed["pages"], warmed["bytes"] / 1e6, warmed["seconds"])
+        preload_indexes()
+        # Indexes inherited from a pre-fork parent may predate the file
+        reload_catalog()
+    except HTTPException as e:
+        logger.warning(f"Skipping index warm-up: {e.detail}")
+    except sqlite3.Error as e:
+        logger.warning(f"Skipping database warm-up: {e}")
+    elapsed = time.perf_counter() - start
+    WARMUP_SECONDS.labels("startup").set(elapsed)
+    update_process_memory()
+    memory = process_memory()
+    logger.info("Process %d ready in %.3fs: RSS %.1f MB (%.1f MB shared, %.1f MB private)",
+                os.getpid(), elapsed, memory["rss"] / 1e6, memory["shared"] / 1e6, memory["private"] / 1e6)
+
+@app.on_event("startup")
+async def start_catalog_refresh():
+    global catalog_refresher
+    catalog_refresher = CatalogRefresher.from_env(reload_catalog, lambda: sync_catalog(DB_PATH))
+    catalog_refresher.start()
+
+@app.on_event("shutdown")
+async def close_database():
+    if catalog_refresher is not None:
+        catalog_refresher.stop()
+    close_serving()
+
 @app.get("/")
 async def root():
     return {"message": "Star Wars Unlimited API"}
 
+@app.get("/metrics")
+async def metrics():
+    update_process_memory()
+    # Set the header directly: media_type would get a second charset appended
+    return Response(generate_latest(metrics_registry()), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
 @app.get("/api/cards")
 async def get_cards(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    search: Optional[str] = None,
-    type: Optional[str] = None,
-    aspect: Optional[str] = None
+    sort: str = Query("name", pattern="^-?(name|cost|attack|health)$"),
+    filters: CardFilters = Depends(known_card_filters),
+    fields: Optional[List[str]] = Depends(card_fields)
 ):
     try:
-        logger.debug(f"Getting cards with params: page={page}, limit={limit}, search={search}, type={type}, aspect={aspect}")
-        db = get_db()
+        logger.debug("Getting cards with params: page=%s, limit=%s, sort=%s, filters=%s, fields=%s", page, limit, sort, filters, fields)
         offset = (page - 1) * limit
+        total, cards = get_card_index().query(filters, sort, offset, limit)
+        cards = [project_card(card, fields) for card in cards]
+        logger.debug("Successfully retrieved %s cards out of %s total", len(cards), total)
         
-        # Start with base query
-        query = "SELECT DISTINCT c.* FROM cards c"
-        conditions = []
-        params = []
-        count_params = []  # Separate params for count query
-        
-        # Add joins and conditions
-        if aspect:
-            query += " LEFT JOIN card_aspects ca ON c.id = ca.card_id"
-            conditions.append("ca.aspect_name = ?")
-            params.append(aspect)
-            count_params.append(aspect)
-        
-        if search:
-            conditions.append("(c.name LIKE ? OR c.text LIKE ?)")
-            search_param = f"%{search}%"
-            params.extend([search_param, search_param])
-            count_params.extend([search_param, search_param])
-        
-        if type:
-            conditions.append("c.type = ?")
-            params.append(type)
-            count_params.append(type)
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        # Add pagination
-        query += " ORDER BY c.name LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-        
-        logger.debug(f"Executing query: {query}")
-        logger.debug(f"With parameters: {params}")
-        
-        cursor = db.execute(query, params)
-        cards = []
-        
-        for row in cursor:
-            card = dict(row)
-            card_id = str(card["id"])  # Convert ID to string
-            
-            # Get aspects
-            aspects_cursor = db.execute(
-                "SELECT aspect_name, aspect_color FROM card_aspects WHERE card_id = ?",
-                [card_id]
-            )
-            card["aspects"] = [dict(row) for row in aspects_cursor]
-            
-            # Get keywords
-            keywords_cursor = db.execute(
-                "SELECT keyword FROM card_keywords WHERE card_id = ?",
-                [card_id]
-            )
-            card["keywords"] = [row["keyword"] for row in keywords_cursor]
-            
-            # Get traits
-            traits_cursor = db.execute(
-                "SELECT trait FROM card_traits WHERE card_id = ?",
-                [card_id]
-            )
-            card["traits"] = [row["trait"] for row in traits_cursor]
-            
-            # Get arenas
-            arenas_cursor = db.execute(
-                "SELECT arena FROM card_arenas WHERE card_id = ?",
-                [card_id]
-            )
-            card["arenas"] = [row["arena"] for row in arenas_cursor]
-            
-            cards.append(card)
-        
-        # Get total count with the same conditions but without pagination
-        count_query = "SELECT COUNT(DISTINCT c.id) as total FROM cards c"
-        if aspect:
-            count_query += " LEFT JOIN card_aspects ca ON c.id = ca.card_id"
-        if conditions:
-            count_query += " WHERE " + " AND ".join(conditions)
-            
-        logger.debug(f"Executing count query: {count_query}")
-        logger.debug(f"With count parameters: {count_params}")
-        
-        cursor = db.execute(count_query, count_params)
-        total = cursor.fetchone()[0]
-        
-        db.close()
-        logger.debug(f"Successfully retrieved {len(cards)} cards out of {total} total")
-        
-        return {
+        return ORJSONResponse({
             "total": total,
             "page": page,
             "limit": limit,
             "cards": cards
-        }
+        })
     except sqlite3.Error as e:
         logger.error(f"Database error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Server error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
 
-@app.get("/api/cards/{card_id}")
-async def get_card(card_id: str):
+@app.get("/api/cards/facets")
+async def get_card_facets(filters: CardFilters = Depends(known_card_filters)):
     try:
-        logger.debug(f"Getting card with ID: {card_id}")
+        logger.debug("Getting card facets with filters: %s", filters)
+        return ORJSONResponse(get_card_index().facet_counts(filters))
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Upper bound on IDs per batch lookup, well below SQLite's parameter limit
+MAX_BATCH_SIZE = 500
+
+class CardBatchItem(BaseModel):
+    id: str
+    count: int = Field(1, ge=1)
+
+class CardBatchRequest(BaseModel):
+    cards: List[Union[str, CardBatchItem]] = Field(..., max_length=MAX_BATCH_SIZE)
+
+@app.get("/api/cards/autocomplete")
+async def autocomplete_cards(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50)
+):
+    try:
+        return ORJSONResponse({"query": q, "cards": get_card_index().names.complete(q, limit)})
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/api/cards/stream")
+async def stream_cards(
+    sort: str = Query("name", pattern="^-?(name|cost|attack|health)$"),
+    filters: CardFilters = Depends(known_card_filters),
+    fields: Optional[List[str]] = Depends(card_fields)
+):
+    # The response iterator runs in the thread pool, one step per thread
+    db = get_db(check_same_thread=False)
+    try:
+        logger.debug("Streaming cards with params: sort=%s, filters=%s, fields=%s", sort, filters, fields)
+        if filters.fuzzy and filters.search:
+            # Fuzzy matching needs the trigram index; stream its matches by ID
+            card_ids = get_card_index().matching_ids(filters, sort)
+            batches = iter_cards_by_ids(db, card_ids, fields)
+        else:
+            batches = iter_card_batches(db, filters, sort, fields)
+    except sqlite3.Error as e:
+        db.close()
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    def ndjson():
+        try:
+            for batch in batches:
+                yield b"".join(orjson.dumps(card) + b"\n" for card in batch)
+        except sqlite3.Error as e:
+            logger.error(f"Database error while streaming cards: {str(e)}")
+            raise
+        finally:
+            db.close()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@app.post("/api/cards/batch")
+async def get_cards_batch(
+    request: CardBatchRequest,
+    fields: Optional[List[str]] = Depends(card_fields)
+):
+    try:
+        items = [
+            CardBatchItem(id=item) if isinstance(item, str) else item
+            for item in request.cards
+        ]
+        logger.debug("Getting batch of %s cards", len(items))
         db = get_db()
-        cursor = db.execute("SELECT * FROM cards WHERE id = ?", [card_id])
-        result = cursor.fetchone()
+        try:
+            found = fetch_cards_by_ids(db, [item.id for item in items], fields)
+        finally:
+            db.close()
         
-        if not result:
-            logger.warning(f"Card not found with ID: {card_id}")
-            raise HTTPException(status_code=404, detail="Card not found")
-            
-        card = dict(result)
-        card_id = str(card["id"])  # Convert ID to string
+        # Preserve request order; every entry carries its requested count
+        cards = [{**found[item.id], "count": item.count} for item in items if item.id in found]
+        missing = [item.id for item in items if item.id not in found]
+        if missing:
+            logger.warning(f"Cards not found in batch: {missing}")
         
-        # Get aspects
-        aspects_cursor = db.execute(
-            "SELECT aspect_name, aspect_color FROM card_aspects WHERE card_id = ?",
-            [card_id]
-        )
-        card["aspects"] = [dict(row) for row in aspects_cursor]
-        
-        # Get keywords
-        keywords_cursor = db.execute(
-            "SELECT keyword FROM card_keywords WHERE card_id = ?",
-            [card_id]
-        )
-        card["keywords"] = [row["keyword"] for row in keywords_cursor]
-        
-        # Get traits
-        traits_cursor = db.execute(
-            "SELECT trait FROM card_traits WHERE card_id = ?",
-            [card_id]
+        return ORJSONResponse({"cards": cards, "missing": missing})
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+class CardResolveRequest(BaseModel):
+    names: List[str] = Field(..., max_length=MAX_BATCH_SIZE)
+    limit: int = Field(3, ge=1, le=10)
+
+@app.post("/api/cards/resolve")
+async def resolve_card_names(request: CardResolveRequest):
+    try:
+        logger.debug("Resolving %s card names", len(request.names))
+        results = get_card_index().names.resolve(request.names, request.limit)
+        unresolved = [result["query"] for result in results if result["match"] is None]
+        return ORJSONResponse({"results": results, "unresolved": unresolved})
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/api/catalog/snapshot")
+async def get_catalog_snapshot_file(
+    range: Optional[str] = Header(None),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    try:
+        version, data = get_catalog_snapshot()
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": DEFAULT_CACHE_CONTROL}
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    # A stale If-Range validator means the client's partial copy is of an
+    # older snapshot, so it gets the whole new one
+    try:
+        byte_range = None if if_range and if_range.strip() != etag else parse_range(range, len(data))
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{len(data)}"})
+    if byte_range is None:
+        return Response(content=data, media_type=SNAPSHOT_MEDIA_TYPE, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+    return Response(content=data[start:end + 1], status_code=206,
+                    media_type=SNAPSHOT_MEDIA_TYPE, headers=headers)
+
+@app.get("/api/catalog/changes")
+async def get_catalog_changes(
+    since: int = Query(..., ge=0),
+    fields: Optional[List[str]] = Depends(card_fields)
+):
+    try:
+        db = get_db()
+        try:
+            changes = changes_since(db, since, fields)
+        finally:
+            db.close()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if changes is None:
+        # Too far behind (or no change log): start over from the snapshot
+        raise HTTPException(
+            status_code=410,
+            detail=f"Changes since version {since} are not available; download /api/catalog/snapshot"
         )
-        card["traits"] = [row["trait"] for row in traits_cursor]
+    return ORJSONResponse(changes)
+
+@app.get("/api/cards/{card_id}")
+async def get_card(card_id: str, fields: Optional[List[str]] = Depends(card_fields)):
+    try:
+        logger.debug("Getting card with ID: %s, fields=%s", card_id, fields)
+        db = get_db()
+        try:
+            card = fetch_cards_by_ids(db, [card_id], fields).get(card_id)
+        finally:
+            db.close()
         
-        # Get arenas
-        arenas_cursor = db.execute(
-            "SELECT arena FROM card_arenas WHERE card_id = ?",
-            [card_id]
-        )
-        card["arenas"] = [row["arena"] for row in arenas_cursor]
+        if not card:
+            logger.warning(f"Card not found with ID: {card_id}")
+            raise HTTPException(status_code=404, detail="Card not found")
         
-        db.close()
-        logger.debug(f"Successfully retrieved card: {card['name']}")
-        return card
+        logger.debug("Successfully retrieved card: %s", card_id)
+        return ORJSONResponse(card)
     except sqlite3.Error as e:
         logger.error(f"Database error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Server error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
 
+@app.get("/api/cards/{card_id}/rules")
+async def get_card_rules(card_id: str):
+    try:
+        logger.debug("Getting rules for card with ID: %s", card_id)
+        rules = get_rules_index().rules_for_card(card_id)
+        if rules is None:
+            logger.warning(f"Card not found with ID: {card_id}")
+            raise HTTPException(status_code=404, detail="Card not found")
+        return {"card_id": card_id, "keywords": rules}
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/api/cards/{card_id}/similar")
+async def get_similar_cards(
+    card_id: str,
+    limit: int = Query(10, ge=1, le=50),
+    aspect: Optional[List[str]] = Query(None),
+    type: Optional[List[str]] = Query(None)
+):
+    try:
+        logger.debug("Getting cards similar to %s (aspect=%s, type=%s)", card_id, aspect, type)
+        db = get_db()
+        try:
+            if db.execute("SELECT 1 FROM cards WHERE id = ?", (card_id,)).fetchone() is None:
+                logger.warning(f"Card not found with ID: {card_id}")
+                raise HTTPException(status_code=404, detail="Card not found")
+            cards = similar_cards(db, card_id, limit, aspect, type)
+        finally:
+            db.close()
+        return ORJSONResponse({"card_id": card_id, "cards": cards})
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Price series bounds are bucket start dates
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+@app.get("/api/cards/{card_id}/prices")
+async def get_card_prices(
+    card_id: str,
+    interval: str = Query("day", pattern="^(day|week)$"),
+    since: Optional[str] = Query(None, pattern=DATE_PATTERN),
+    until: Optional[str] = Query(None, pattern=DATE_PATTERN)
+):
+    try:
+        logger.debug("Getting %s prices for card %s (%s..%s)", interval, card_id, since, until)
+        db = get_db()
+        try:
+            if db.execute("SELECT 1 FROM cards WHERE id = ?", (card_id,)).fetchone() is None:
+                logger.warning(f"Card not found with ID: {card_id}")
+                raise HTTPException(status_code=404, detail="Card not found")
+            points = price_series(db, card_id, interval, since, until)
+            stats = price_stats(db, card_id)
+        finally:
+            db.close()
+        return ORJSONResponse({"card_id": card_id, "interval": interval, "stats": stats, "points": points})
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/api/prices/movers")
+async def get_price_movers(
+    window: str = Query("7d", pattern="^(1d|7d|30d)$"),
+    direction: str = Query("up", pattern="^(up|down)$"),
+    limit: int = Query(20, ge=1, le=100),
+    min_price: float = Query(0.0, ge=0)
+):
+    try:
+        db = get_db()
+        try:
+            cards = price_movers(db, window, direction, limit, min_price)
+        finally:
+            db.close()
+        return ORJSONResponse({"window": window, "direction": direction, "cards": cards})
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/api/images/{card_id}")
+async def get_card_image(
+    card_id: str,
+    size: str = Query("thumb", pattern="^(thumb|full)$"),
+    format: str = Query("webp", pattern="^(webp|jpeg)$"),
+    side: str = Query("front", pattern="^(front|back)$")
+):
+    try:
+        column = "image_uri" if side == "front" else "image_back_uri"
+        db = get_db()
+        try:
+            row = db.execute(f"SELECT {column} FROM cards WHERE id = ?", (card_id,)).fetchone()
+        finally:
+            db.close()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Card not found")
+        if not row[0]:
+            raise HTTPException(status_code=404, detail=f"Card has no {side} image")
+        # A miss fetches and resizes the image, so keep it off the event loop
+        data, content_type = await run_in_threadpool(get_image_cache().get, row[0], f"{size}.{format}")
+        return Response(content=data, media_type=content_type)
+    except ImageFetchError as e:
+        logger.error(f"Image error: {str(e)}")
+        raise HTTPException(status_code=502, detail="Card image unavailable")
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/api/rules/{reference}")
+async def get_rule(reference: str):
+    try:
+        logger.debug("Getting rule: %s", reference)
+        rule = get_rules_index().lookup(reference)
+        if rule is None:
+            logger.warning(f"Rule not found: {reference}")
+            raise HTTPException(status_code=404, detail="Rule not found")
+        return rule
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Upper bound on decks per bulk analysis request
+MAX_DECKS_PER_REQUEST = 10000
+
+class DecklistBatch(BaseModel):
+    decks: List[Decklist] = Field(..., max_length=MAX_DECKS_PER_REQUEST)
+
+@app.post("/api/decks/analyze")
+async def analyze_deck(deck: Decklist):
+    try:
+        logger.debug("Analyzing deck with %s entries", len(deck.cards))
+        return get_deck_analyzer().analyze(deck)
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.post("/api/decks/analyze/batch")
+async def analyze_decks(batch: DecklistBatch):
+    try:
+        logger.debug("Analyzing %s decks", len(batch.decks))
+        # Up to MAX_DECKS_PER_REQUEST decks; keep the event loop free meanwhile
+        results = await run_in_threadpool(get_deck_analyzer().analyze_many, batch.decks)
+        return {"decks": results}
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+DECK_FORMAT_PATTERN = f"^({'|'.join(FORMATS)})$"
+
+@app.post("/api/decks/validate")
+async def validate_deck(
+    deck: Decklist,
+    format: str = Query("premier", pattern=DECK_FORMAT_PATTERN),
+    legal_set: Optional[List[str]] = Query(None)
+):
+    try:
+        logger.debug("Validating deck with %s entries", len(deck.cards))
+        errors = get_deck_validator().validate(deck, format, legal_set or default_legal_sets())
+        return {"valid": not errors, "errors": errors}
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Upper bound on a bulk validation body; MAX_DECKS_PER_REQUEST caps its lines
+MAX_BULK_BODY_BYTES = 16 * 1024 * 1024
+
+@app.post("/api/decks/validate/bulk")
+async def validate_decks(
+    request: Request,
+    format: str = Query("premier", pattern=DECK_FORMAT_PATTERN),
+    legal_set: Optional[List[str]] = Query(None)
+):
+    """Validate newline-delimited JSON decklists.
+
+    Each request line holds one decklist; the response has one result line
+    per decklist, in order, with its zero-based line index. Decklists are
+    validated chunk by chunk while the body is read, but the response is
+    only sent once the whole body has been: answering before a client has
+    finished sending can deadlock clients that don't read while they send.
+    Bodies over MAX_BULK_BODY_BYTES or MAX_DECKS_PER_REQUEST lines get a 413.
+    """
+    try:
+        validator = get_deck_validator()
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    legal_sets = legal_set or default_legal_sets()
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"Bulk validation takes up to {MAX_DECKS_PER_REQUEST} decklists "
+               f"and {MAX_BULK_BODY_BYTES} bytes per request"
+    )
+    if int(request.headers.get("content-length") or 0) > MAX_BULK_BODY_BYTES:
+        raise too_large
+
+    def validate_lines(first: int, lines: List[bytes]) -> bytes:
+        output = []
+        for index, line in enumerate(lines, first):
+            try:
+                errors = validator.validate_raw(orjson.loads(line), format, legal_sets)
+            except ValueError as e:
+                errors = [{"code": "INVALID_JSON", "message": f"Invalid JSON: {e}"}]
+            output.append(orjson.dumps({"index": index, "valid": not errors, "errors": errors}) + b"\n")
+        return b"".join(output)
+
+    index = 0
+    received = 0
+    pending = b""
+    results: List[bytes] = []
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > MAX_BULK_BODY_BYTES:
+            raise too_large
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        lines = [line for line in lines if line.strip()]
+        if index + len(lines) > MAX_DECKS_PER_REQUEST:
+            raise too_large
+        if lines:
+            results.append(await run_in_threadpool(validate_lines, index, lines))
+            index += len(lines)
+    if pending.strip():
+        if index + 1 > MAX_DECKS_PER_REQUEST:
+            raise too_large
+        results.append(await run_in_threadpool(validate_lines, index, [pending]))
+        index += 1
+    logger.debug("Validated %s decklists", index)
+
+    return Response(content=b"".join(results), media_type="application/x-ndjson")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # Admin endpoints expose SQL text and parameters and trigger catalog
+    # rebuilds, so they are disabled until SWU_ADMIN_TOKEN is set
+    token = os.getenv("SWU_ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set SWU_ADMIN_TOKEN")
+    if not hmac.compare_digest((x_admin_token or "").encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.get("/api/admin/sql/top", dependencies=[Depends(require_admin)])
+async def get_top_statements(
+    limit: int = Query(20, ge=1, le=200),
+    order: str = Query("total_ms", pattern="^(total_ms|max_ms|mean_ms|samples)$")
+):
+    return {
+        "sample_rate": query_tracer.sample_rate,
+        "statements": query_tracer.top(limit, order)
+    }
+
+@app.get("/api/admin/sql/slow", dependencies=[Depends(require_admin)])
+async def get_slow_queries():
+    return {
+        "threshold_ms": query_tracer.slow_ms,
+        "queries": list(reversed(query_tracer.slow_log))
+    }
+
+def get_catalog_refresher() -> CatalogRefresher:
+    global catalog_refresher
+    if catalog_refresher is None:
+        # Not started (no startup events, e.g. under a bare TestClient)
+        catalog_refresher = CatalogRefresher(reload_catalog, lambda: sync_catalog(DB_PATH))
+    return catalog_refresher
+
+@app.get("/api/admin/catalog", dependencies=[Depends(require_admin)])
+async def get_catalog_status():
+    refresher = get_catalog_refresher()
+    return {
+        "version": catalog_version,
+        "cards": card_index.size if card_index is not None else None,
+        "sync_interval": refresher.sync_interval,
+        "check_interval": refresher.check_interval,
+        **refresher.status
+    }
+
+@app.post("/api/admin/catalog/sync", status_code=202, dependencies=[Depends(require_admin)])
+async def sync_catalog_now():
+    # A sync takes minutes; it runs in the background and shows up in
+    # GET /api/admin/catalog. Another worker may be building already.
+    if build_in_progress(DB_PATH):
+        return {"started": False}
+    return {"started": get_catalog_refresher().sync_in_background()}
+
+@app.post("/api/admin/catalog/reload", dependencies=[Depends(require_admin)])
+async def reload_catalog_now(force: bool = False):
+    try:
+        changes = await run_in_threadpool(get_catalog_refresher().check, force)
+        return {"version": catalog_version, "changes": changes}
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
 @app.get("/api/aspects")
 async def get_aspects():
     try:
@@ -229,7 +817,7 @@ async def get_aspects():
         cursor = db.execute("SELECT DISTINCT aspect_name, aspect_color FROM card_aspects")
         aspects = [dict(row) for row in cursor]
         db.close()
-        logger.debug(f"Successfully retrieved {len(aspects)} aspects")
+        logger.debug("Successfully retrieved %s aspects", len(aspects))
         return aspects
     except sqlite3.Error as e:
         logger.error(f"Database error: {str(e)}")
@@ -243,7 +831,7 @@ async def get_types():
         cursor = db.execute("SELECT DISTINCT type FROM cards")
         types = [row["type"] for row in cursor]
         db.close()
-        logger.debug(f"Successfully retrieved {len(types)} types")
+        logger.debug("Successfully retrieved %s types", len(types))
         return types
     except sqlite3.Error as e:
         logger.error(f"Database error: {str(e)}")
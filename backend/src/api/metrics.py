@@ -0,0 +1,246 @@
+import os
+import sys
+import sqlite3
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client.multiprocess import MultiProcessCollector
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Multi-process mode: serve.py points PROMETHEUS_MULTIPROC_DIR at a
+# directory shared by its workers before any metric is created. Every
+# process then writes its values to files there and /metrics aggregates
+# them (metrics_registry); gauges say how in multiprocess_mode, which is
+# ignored otherwise.
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+MULTIPROCESS = MULTIPROC_DIR_ENV in os.environ
+
+# HTTP
+REQUEST_LATENCY = Histogram(
+    "swu_http_request_duration_seconds", "Request latency by route",
+    ["method", "route"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+REQUESTS = Counter("swu_http_requests_total", "Requests by route and status", ["method", "route", "status"])
+IN_FLIGHT = Gauge("swu_http_requests_in_flight", "Requests currently being served",
+                  multiprocess_mode="livesum")
+
+# SQL. Statements are counted everywhere (index builds and ingest included);
+# rows only while serving requests, to keep the per-row cost to a field update
+SQL_STATEMENTS = Counter("swu_sql_statements_total", "SQL statements executed")
+SQL_ROWS = Counter("swu_sql_rows_total", "Rows read by SQL queries while serving requests")
+SQL_STATEMENTS_PER_REQUEST = Histogram(
+    "swu_sql_statements_per_request", "SQL statements executed per request", ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100)
+)
+SQL_ROWS_PER_REQUEST = Histogram(
+    "swu_sql_rows_per_request", "Rows read per request", ["route"],
+    buckets=(0, 1, 10, 100, 1000, 10000, 100000)
+)
+
+# Caches: hit ratio = hits / (hits + misses) per cache
+CACHE_REQUESTS = Counter("swu_cache_requests_total", "Cache lookups by cache and result", ["cache", "result"])
+
+# Ingest (SWUApiClient)
+INGEST_PAGES = Counter("swu_ingest_pages_total", "Card list pages fetched from the SWU API")
+INGEST_CARDS = Counter("swu_ingest_cards_total", "Cards stored by ingest")
+INGEST_ERRORS = Counter("swu_ingest_errors_total", "Failed SWU API requests")
+INGEST_RETRIES = Counter("swu_ingest_retries_total", "Retried SWU API requests")
+INGEST_FETCH_SECONDS = Histogram("swu_ingest_fetch_seconds", "SWU API page fetch latency")
+
+# Vector index (VectorDB)
+VECTOR_EMBEDDINGS = Counter("swu_vector_embeddings_total", "Embeddings generated")
+VECTOR_EMBEDDING_SECONDS = Histogram("swu_vector_embedding_seconds", "Embedding request latency")
+VECTOR_UPSERTS = Counter("swu_vector_upserts_total", "Points upserted", ["collection"])
+VECTOR_SEARCHES = Counter("swu_vector_searches_total", "Vector searches", ["collection"])
+
+# Catalog refresh (CatalogRefresher): syncs from the SWU API and the cards
+# changed by the last swap
+CATALOG_SYNCS = Counter("swu_catalog_syncs_total", "Catalog syncs by result", ["result"])
+CATALOG_SYNC_SECONDS = Gauge("swu_catalog_sync_seconds", "Duration of the last catalog sync",
+                             multiprocess_mode="mostrecent")
+CATALOG_LAST_SYNC = Gauge("swu_catalog_last_sync_timestamp_seconds", "Unix time of the last catalog sync",
+                          multiprocess_mode="max")
+CATALOG_CHANGES = Gauge("swu_catalog_changes", "Cards changed by the last catalog swap", ["kind"],
+                        multiprocess_mode="mostrecent")
+
+# Serving process: memory (shared counts pages still shared copy-on-write
+# with the pre-fork parent, see serve.py) and index warm-up time by stage
+PROCESS_MEMORY = Gauge("swu_process_memory_bytes", "Memory of this serving process", ["kind"],
+                       multiprocess_mode="liveall")
+WARMUP_SECONDS = Gauge("swu_warmup_seconds", "Seconds spent warming caches and indexes", ["stage"],
+                       multiprocess_mode="max")
+
+# /proc/<pid>/smaps_rollup fields, in kB, summed into process_memory kinds
+_SMAPS_FIELDS = {
+    "Rss": "rss", "Pss": "pss",
+    "Shared_Clean": "shared", "Shared_Dirty": "shared",
+    "Private_Clean": "private", "Private_Dirty": "private",
+}
+
+
+class _SQLStats:
+    __slots__ = ("statements", "rows")
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+
+
+# SQL counts for the request being served, if any
+_request_sql: ContextVar[Optional[_SQLStats]] = ContextVar("request_sql", default=None)
+
+
+def cache_hit(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def process_memory(pid: str = "self") -> Dict[str, int]:
+    """Resident memory of a process in bytes: rss, pss, shared and private.
+
+    Read from /proc/<pid>/smaps_rollup (Linux). Elsewhere only the peak
+    RSS of the current process is available, reported as rss.
+    """
+    memory = {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                field, _, value = line.partition(":")
+                if field in _SMAPS_FIELDS:
+                    memory[_SMAPS_FIELDS[field]] += int(value.split()[0]) * 1024
+    except OSError:
+        if pid == "self" and sys.platform != "win32":
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Bytes on macOS, kB elsewhere
+            memory["rss"] = peak if sys.platform == "darwin" else peak * 1024
+    return memory
+
+
+def update_process_memory() -> None:
+    """Record this process's memory in PROCESS_MEMORY.
+
+    Only needed in multi-process mode, where values are read from files
+    and can't be computed at scrape time; a worker's values are those of
+    its last update.
+    """
+    if MULTIPROCESS:
+        for kind, value in process_memory().items():
+            PROCESS_MEMORY.labels(kind).set(value)
+
+
+if not MULTIPROCESS:
+    for _kind in ("rss", "pss", "shared", "private"):
+        PROCESS_MEMORY.labels(_kind).set_function(lambda kind=_kind: process_memory()[kind])
+
+
+def metrics_registry():
+    """Registry /metrics exposes: this process's, or every worker's aggregated."""
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
+
+
+def _count_statement(statement: str) -> None:
+    SQL_STATEMENTS.inc()
+    stats = _request_sql.get()
+    if stats is not None:
+        stats.statements += 1
+
+
+def _counting_row(cursor: sqlite3.Cursor, row: tuple) -> sqlite3.Row:
+    stats = _request_sql.get()
+    if stats is not None:
+        stats.rows += 1
+    return sqlite3.Row(cursor, row)
+
+
+def instrument_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Count statements and rows read on a connection.
+
+    Installs a trace callback and a row factory producing sqlite3.Row, so
+    callers see the same rows as with row_factory = sqlite3.Row.
+    """
+    conn.set_trace_callback(_count_statement)
+    conn.row_factory = _counting_row
+    return conn
+
+
+def _route_path(scope: Scope) -> str:
+    """Path template of the route serving a request."""
+    route = scope.get("route")
+    if route is None:
+        # Answered by a middleware (e.g. a 304) before routing; match it here
+        router = getattr(scope.get("app"), "router", None)
+        for candidate in getattr(router, "routes", ()):
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", "unmatched")
+
+
+# Labelled children per (method, route, status); .labels() costs about as
+# much as the observation itself, so each combination is resolved once
+_children: Dict[Tuple[str, str, int], Tuple] = {}
+
+
+def _route_children(method: str, route: str, status: int) -> Tuple:
+    key = (method, route, status)
+    children = _children.get(key)
+    if children is None:
+        children = _children.setdefault(key, (
+            REQUEST_LATENCY.labels(method, route),
+            REQUESTS.labels(method, route, str(status)),
+            SQL_STATEMENTS_PER_REQUEST.labels(route),
+            SQL_ROWS_PER_REQUEST.labels(route),
+        ))
+    return children
+
+
+class MetricsMiddleware:
+    """Per-route latency, status and SQL counts for every HTTP request.
+
+    Routes are labelled by their path template (e.g. /api/cards/{card_id})
+    to keep the number of series bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status: List[int] = [500]
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        stats = _SQLStats()
+        token = _request_sql.set(stats)
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec()
+            _request_sql.reset(token)
+
+            latency, requests, statements, rows = _route_children(
+                scope["method"], _route_path(scope), status[0]
+            )
+            latency.observe(elapsed)
+            requests.inc()
+            statements.observe(stats.statements)
+            rows.observe(stats.rows)
+            if stats.rows:
+                SQL_ROWS.inc(stats.rows)
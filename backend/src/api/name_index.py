@@ -0,0 +1,218 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+
+# Anything that isn't a letter or digit separates words: "Darth Vader,
+# Dark Lord of the Sith" and "darth vader dark lord" share a prefix
+_SEPARATORS = re.compile(r"[^0-9a-z]+")
+
+# Key tiers, searched in order: whole names (with or without the subtitle),
+# then subtitles, then words inside the name ("vader" -> "Darth Vader")
+NAME, SUBTITLE, WORD = range(3)
+
+# Minimum trigram similarity of a fuzzy match (the pg_trgm default), and
+# of a resolved decklist line
+FUZZY_THRESHOLD = 0.3
+RESOLVE_THRESHOLD = 0.5
+
+# "3 Darth Vader", "3x Darth Vader": a decklist line's leading count
+_LINE_COUNT = re.compile(r"^\s*(\d+)\s*x?\s+", re.IGNORECASE)
+
+# Fields of each suggestion; small enough to render a dropdown row
+SUGGESTION_FIELDS = ("id", "name", "subtitle", "type", "set_code", "card_number", "image_uri")
+
+
+def normalize(text: str) -> str:
+    """Lower-case text with accents stripped and punctuation folded to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _SEPARATORS.sub(" ", stripped.casefold()).strip()
+
+
+def trigrams(key: str) -> Set[str]:
+    """Trigrams of a normalized key, padded so word starts weigh more."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def thumbnail_url(card_id: str) -> str:
+    """Locally cached thumbnail of a card (see /api/images)."""
+    return f"/api/images/{card_id}?size=thumb"
+
+
+class NameIndex:
+    """Prefix and trigram indexes over card names for type-ahead and fuzzy search.
+
+    Each tier is a sorted list of normalized keys with the card position
+    of every key alongside, so a prefix is one bisect into each tier and a
+    forward scan that stops as soon as enough cards are found. Within a
+    tier, shorter keys sort first, so an exact name ranks above longer
+    names that start with it.
+
+    Typo-tolerant matching uses a trigram index over the same names and
+    "name subtitle" keys: every distinct key gets an ID, and every trigram
+    a NumPy array of the IDs of keys containing it. A lookup counts shared
+    trigrams per key with one bincount over the needle's posting lists
+    and scores keys by Jaccard similarity.
+    """
+
+    def __init__(self, cards: List[Dict]):
+        """Build the key tiers and the trigram posting lists.
+
+        Args:
+            cards: Every card; only the suggestion fields are kept
+        """
+        self.suggestions = [
+            {**{field: card.get(field) for field in SUGGESTION_FIELDS},
+             "thumbnail": thumbnail_url(card["id"])}
+            for card in cards
+        ]
+        keyed: List[List[Tuple[str, int]]] = [[], [], []]
+        for position, card in enumerate(cards):
+            name = normalize(card.get("name") or "")
+            subtitle = normalize(card.get("subtitle") or "")
+            if name:
+                keyed[NAME].append((name, position))
+            if subtitle:
+                keyed[SUBTITLE].append((subtitle, position))
+                if name:
+                    keyed[NAME].append((f"{name} {subtitle}", position))
+            # Every later word of the name starts a key running to the end
+            words = f"{name} {subtitle}".split()
+            for start in range(1, len(words)):
+                keyed[WORD].append((" ".join(words[start:]), position))
+
+        self.tiers: List[Tuple[List[str], List[int]]] = []
+        for pairs in keyed:
+            pairs = sorted(set(pairs))
+            self.tiers.append(([key for key, _ in pairs], [position for _, position in pairs]))
+
+        # Distinct whole-name keys and the cards (printings) behind each
+        self.key_ids: Dict[str, int] = {}
+        self.key_cards: List[List[int]] = []
+        for key, position in zip(*self.tiers[NAME]):
+            if key not in self.key_ids:
+                self.key_ids[key] = len(self.key_cards)
+                self.key_cards.append([])
+            self.key_cards[self.key_ids[key]].append(position)
+
+        postings: Dict[str, List[int]] = {}
+        gram_counts = []
+        for key, key_id in self.key_ids.items():
+            grams = trigrams(key)
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(key_id)
+        self.gram_counts = np.array(gram_counts, dtype=np.int32)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    @property
+    def size(self) -> int:
+        return len(self.suggestions)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Cards whose name, subtitle or "name, subtitle" starts with prefix.
+
+        Args:
+            prefix: What the user has typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            Suggestions, whole-name matches first, each card at most once
+        """
+        needle = normalize(prefix)
+        if not needle:
+            return []
+        seen = set()
+        found: List[Dict] = []
+        for keys, positions in self.tiers:
+            index = bisect_left(keys, needle)
+            while index < len(keys) and keys[index].startswith(needle):
+                position = positions[index]
+                index += 1
+                if position in seen:
+                    continue
+                seen.add(position)
+                found.append(self.suggestions[position])
+                if len(found) >= limit:
+                    return found
+        return found
+
+    def fuzzy_keys(self, name: str, threshold: float = FUZZY_THRESHOLD) -> List[Tuple[int, float]]:
+        """Key IDs similar to name, as (key ID, similarity), best first.
+
+        An exact key short-circuits with similarity 1.0.
+        """
+        needle = normalize(name)
+        if not needle:
+            return []
+        if needle in self.key_ids:
+            return [(self.key_ids[needle], 1.0)]
+        grams = trigrams(needle)
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.key_cards))
+        candidates = np.flatnonzero(shared)
+        common = shared[candidates]
+        scores = common / (len(grams) + self.gram_counts[candidates] - common)
+        keep = scores >= threshold
+        candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))
+        return list(zip(candidates[order].tolist(), scores[order].tolist()))
+
+    def fuzzy_positions(self, name: str, threshold: float = FUZZY_THRESHOLD) -> List[int]:
+        """Positions of every card whose name is similar to name."""
+        return sorted({position for key_id, _ in self.fuzzy_keys(name, threshold)
+                       for position in self.key_cards[key_id]})
+
+    def fuzzy(self, name: str, limit: int = 5, threshold: float = FUZZY_THRESHOLD) -> List[Dict]:
+        """Cards whose name (or "name, subtitle") is similar to name.
+
+        Args:
+            name: A possibly misspelled card name
+            limit: Maximum number of candidates
+            threshold: Minimum trigram similarity
+
+        Returns:
+            Suggestions with their "score", best first; reprints of a card
+            appear once
+        """
+        found: List[Dict] = []
+        seen = set()
+        for key_id, score in self.fuzzy_keys(name, threshold):
+            position = self.key_cards[key_id][0]
+            if position in seen:
+                continue
+            seen.add(position)
+            found.append({**self.suggestions[position], "score": round(score, 3)})
+            if len(found) >= limit:
+                break
+        return found
+
+    def resolve(self, lines: List[str], limit: int = 3) -> List[Dict]:
+        """Resolve pasted decklist lines to cards.
+
+        Args:
+            lines: Card names, optionally led by a count ("3x Darth Vader")
+            limit: Candidates per line
+
+        Returns:
+            Per line: the "query", its "count" (None without one), the
+            ranked "candidates" and "match", the best candidate if it
+            scores at least RESOLVE_THRESHOLD
+        """
+        results = []
+        for line in lines:
+            count: Optional[int] = None
+            name = line
+            leading = _LINE_COUNT.match(line)
+            # Card names can start with a number too
+            if leading and normalize(line) not in self.key_ids:
+                count, name = int(leading.group(1)), line[leading.end():]
+            candidates = self.fuzzy(name, limit)
+            match = candidates[0] if candidates and candidates[0]["score"] >= RESOLVE_THRESHOLD else None
+            results.append({"query": line, "count": count, "match": match, "candidates": candidates})
+        return results
@@ -0,0 +1,107 @@
+import sqlite3
+from typing import Dict, List, Optional
+
+# Downsampling intervals served by /api/cards/{card_id}/prices; each maps
+# to a price_buckets period (see database/import_prices.py)
+INTERVALS = ("day", "week")
+
+# Rolling windows served by /api/prices/movers, by price_stats column suffix
+MOVER_WINDOWS = ("1d", "7d", "30d")
+
+BUCKET_COLUMNS = ("bucket_start", "open", "high", "low", "close", "mean", "samples")
+
+
+def has_price_data(conn: sqlite3.Connection) -> bool:
+    """Whether the database has the derived price tables.
+
+    Databases built before price import was added don't; they are served
+    as having no price history rather than failing.
+    """
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'price_stats'"
+    ).fetchone() is not None
+
+
+def price_series(conn: sqlite3.Connection, card_id: str, interval: str = "day",
+                 since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+    """Downsampled price series of a card, oldest bucket first.
+
+    Args:
+        conn: Connection to the card database
+        card_id: Card to chart
+        interval: "day" or "week"
+        since: First bucket start date to include (YYYY-MM-DD)
+        until: Last bucket start date to include (YYYY-MM-DD)
+
+    Returns:
+        One dict per bucket with its start date, open/high/low/close, mean
+        and number of snapshots
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown interval: {interval}")
+    if not has_price_data(conn):
+        return []
+    sql = f"SELECT {', '.join(BUCKET_COLUMNS)} FROM price_buckets WHERE card_id = ? AND period = ?"
+    params = [card_id, interval]
+    if since:
+        sql += " AND bucket_start >= ?"
+        params.append(since)
+    if until:
+        sql += " AND bucket_start <= ?"
+        params.append(until)
+    rows = conn.execute(sql + " ORDER BY bucket_start", params).fetchall()
+    return [dict(zip(BUCKET_COLUMNS, row)) for row in rows]
+
+
+def price_stats(conn: sqlite3.Connection, card_id: str) -> Optional[Dict]:
+    """Latest price and rolling aggregates of a card, or None without history."""
+    if not has_price_data(conn):
+        return None
+    cursor = conn.execute("SELECT * FROM price_stats WHERE card_id = ?", (card_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    stats = dict(zip((column[0] for column in cursor.description), row))
+    del stats["card_id"]
+    return stats
+
+
+def price_movers(conn: sqlite3.Connection, window: str = "7d", direction: str = "up",
+                 limit: int = 20, min_price: float = 0.0) -> List[Dict]:
+    """Cards with the largest relative price change over a rolling window.
+
+    Args:
+        conn: Connection to the card database
+        window: "1d", "7d" or "30d"
+        direction: "up" for the largest gains, "down" for the largest drops
+        limit: Number of cards to return
+        min_price: Ignore cards currently priced below this, whose
+            percentage moves are mostly noise
+
+    Returns:
+        Card id, name, subtitle and set with the current price and the
+        absolute and percentage change, largest move first
+    """
+    if window not in MOVER_WINDOWS:
+        raise ValueError(f"Unknown window: {window}")
+    if direction not in ("up", "down"):
+        raise ValueError(f"Unknown direction: {direction}")
+    if not has_price_data(conn):
+        return []
+    order = "DESC" if direction == "up" else "ASC"
+    comparison = ">" if direction == "up" else "<"
+    rows = conn.execute(f'''
+        SELECT s.card_id, c.name, c.subtitle, c.set_code, s.last_price, s.last_timestamp,
+               s.change_{window}, s.pct_{window}
+        FROM price_stats s JOIN cards c ON c.id = s.card_id
+        WHERE s.pct_{window} {comparison} 0 AND s.last_price >= ?
+        ORDER BY s.pct_{window} {order}, s.card_id
+        LIMIT ?
+    ''', (min_price, limit)).fetchall()
+    return [
+        {
+            "id": row[0], "name": row[1], "subtitle": row[2], "set_code": row[3],
+            "price_usd": row[4], "last_timestamp": row[5], "change": row[6], "pct_change": row[7],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,163 @@
+import os
+import re
+import sqlite3
+import logging
+from typing import Dict, List, Optional
+from ..database.rules_parser import parse_glossary, parse_keyword_rules
+
+logger = logging.getLogger(__name__)
+
+RULEBOOK_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'rules', 'rulebook_cleaned.txt'
+)
+
+# Keyword abilities live under rule 7.5 (e.g. 7.5.11. Sentinel)
+KEYWORD_RULES_PREFIX = "7.5."
+
+_RULE_NUMBER_PATTERN = re.compile(r'^\d+(?:\.\d+)*\.?$')
+_KEYWORD_VALUE_PATTERN = re.compile(r'\s+(?:\d+|X|\[.*\])$')
+
+
+def normalize_rule_number(number: str) -> str:
+    """Normalize a rule number so "7.5.11." and "7.5.11" are the same key."""
+    return number.strip().rstrip('.')
+
+
+def normalize_term(term: str) -> str:
+    """Normalize a glossary term or card keyword for lookups.
+
+    Strips quotes and keyword values, so "Raid 2", "RAID" and "raid" all map
+    to the same term.
+    """
+    term = _KEYWORD_VALUE_PATTERN.sub('', term.strip().strip('"'))
+    return " ".join(term.lower().split())
+
+
+class RulesIndex:
+    """In-memory lookup tables over the comprehensive rules.
+
+    Built once from the parsed rulebook and the card_keywords table so that
+    rule, glossary and card-to-rules lookups are plain dictionary reads and
+    never need an embedding or vector search.
+    """
+
+    def __init__(self, glossary: List[Dict], keyword_passages: Dict[str, str],
+                 card_keywords: Dict[str, List[str]]):
+        """Build the lookup tables.
+
+        Args:
+            glossary: Entries from parse_glossary
+            keyword_passages: Keyword passages from parse_keyword_rules
+            card_keywords: Mapping of every card ID to its keywords
+        """
+        self.rules: Dict[str, Dict] = {}
+        self.terms: Dict[str, Dict] = {}
+        passages = {normalize_term(k): v for k, v in keyword_passages.items()}
+
+        for entry in glossary:
+            summary = entry["text"].split(" See ")[0].strip()
+            numbers = []
+            for reference in entry["references"]:
+                number = normalize_rule_number(reference["number"])
+                numbers.append(number)
+                rule = self.rules.setdefault(number, {
+                    "number": number,
+                    "title": reference["title"],
+                    "text": passages.get(normalize_term(reference["title"]), summary),
+                    "terms": []
+                })
+                rule["terms"].append(entry["term"])
+
+            term = {"term": entry["term"], "text": summary, "rules": numbers}
+            for alias in self._term_aliases(entry["term"]):
+                self.terms.setdefault(alias, term)
+
+        # Sub-rules known to the index, e.g. 7.5 -> [7.5.5, 7.5.6, ...]
+        for number, rule in self.rules.items():
+            rule["children"] = sorted(
+                (n for n in self.rules if n.startswith(number + ".")),
+                key=lambda n: [int(part) for part in n.split(".")]
+            )
+
+        # Resolve each card's keywords to rule passages up front
+        self.card_rules: Dict[str, List[Dict]] = {
+            card_id: [
+                {"keyword": keyword, "rules": self.rules_for_keyword(keyword)}
+                for keyword in keywords
+            ]
+            for card_id, keywords in card_keywords.items()
+        }
+
+        logger.info(
+            f"Built rules index with {len(self.rules)} rules, {len(self.terms)} terms "
+            f"and {len(self.card_rules)} cards"
+        )
+
+    @staticmethod
+    def _term_aliases(term: str) -> List[str]:
+        """All the names a glossary term can be looked up by.
+
+        "CONTROL, CONTROLLER" is reachable as either word and
+        "LOSE (AN ABILITY)" also as plain "lose".
+        """
+        aliases = [normalize_term(term)]
+        aliases.extend(normalize_term(part) for part in term.split(",") if part.strip())
+        aliases.append(normalize_term(re.sub(r'\(.*?\)', '', term)))
+        return [alias for alias in aliases if alias]
+
+    @classmethod
+    def build(cls, conn: sqlite3.Connection, rulebook_path: str = RULEBOOK_PATH) -> "RulesIndex":
+        """Parse the rulebook and load card keywords to build the index.
+
+        Args:
+            conn: Connection to the card database
+            rulebook_path: Path to the cleaned rulebook text file
+        """
+        glossary = parse_glossary(rulebook_path)
+        keywords = [
+            reference["title"]
+            for entry in glossary
+            for reference in entry["references"]
+            if reference["number"].startswith(KEYWORD_RULES_PREFIX)
+        ]
+        keyword_passages = parse_keyword_rules(rulebook_path, keywords)
+
+        card_keywords: Dict[str, List[str]] = {}
+        cursor = conn.execute(
+            "SELECT c.id, k.keyword FROM cards c "
+            "LEFT JOIN card_keywords k ON c.id = k.card_id"
+        )
+        for card_id, keyword in cursor:
+            keywords_for_card = card_keywords.setdefault(str(card_id), [])
+            if keyword:
+                keywords_for_card.append(keyword)
+
+        return cls(glossary, keyword_passages, card_keywords)
+
+    def get_rule(self, number: str) -> Optional[Dict]:
+        """Look up a rule passage by its number."""
+        return self.rules.get(normalize_rule_number(number))
+
+    def get_term(self, term: str) -> Optional[Dict]:
+        """Look up a glossary term together with the rules it refers to."""
+        entry = self.terms.get(normalize_term(term))
+        if entry is None:
+            return None
+        return {**entry, "rules": [self.rules[number] for number in entry["rules"]]}
+
+    def lookup(self, reference: str) -> Optional[Dict]:
+        """Look up either a rule number ("7.5.11") or a glossary term ("Sentinel")."""
+        if _RULE_NUMBER_PATTERN.match(reference.strip()):
+            return self.get_rule(reference)
+        return self.get_term(reference)
+
+    def rules_for_keyword(self, keyword: str) -> List[Dict]:
+        """Rule passages that define a card keyword, empty if it has none."""
+        entry = self.terms.get(normalize_term(keyword))
+        if entry is None:
+            return []
+        return [self.rules[number] for number in entry["rules"]]
+
+    def rules_for_card(self, card_id: str) -> Optional[List[Dict]]:
+        """Keyword rules for a card, or None if the card is unknown."""
+        return self.card_rules.get(str(card_id))
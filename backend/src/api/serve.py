@@ -0,0 +1,280 @@
+"""Pre-forking multi-worker server for the API.
+
+uvicorn --workers starts every worker as a fresh interpreter, so each one
+loads the catalog and builds the card, name, deck and rules indexes on its
+own. This launcher builds them once in the parent, freezes the garbage
+collector so collections don't write to the inherited objects, and then
+forks the workers, which share those pages copy-on-write and serve one
+listening socket. Only SQLite connections are per worker: the parent
+closes its own before forking and each worker's startup hook reopens the
+warm-up connection.
+
+Every worker logs its startup time and memory (RSS, and how much of it is
+still shared with the parent) and exports them as swu_warmup_seconds and
+swu_process_memory_bytes. The parent logs a per-worker memory report every
+SWU_WORKER_REPORT_SECONDS (default 300, 0 disables) and restarts workers
+that exit unexpectedly, backing off exponentially while a worker keeps
+failing soon after it starts.
+
+Metrics are collected in multi-process mode: the parent points
+PROMETHEUS_MULTIPROC_DIR (a fresh temporary directory unless set) at a
+directory every process writes its values to, so /metrics reports the
+totals of all workers whichever one answers.
+
+Catalog syncs (SWU_SYNC_INTERVAL, see catalog_refresh.py) run in the first
+worker only; the others pick up the published database with their reload
+checks. A sync requested from any worker's admin endpoint is skipped while
+another build holds the database's build lock (database.prepare_build).
+
+Run from backend/:
+
+    python -m src.api.serve [--workers 4] [--host 0.0.0.0] [--port 8000]
+"""
+import argparse
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+WORKERS_ENV = "SWU_WORKERS"
+REPORT_ENV = "SWU_WORKER_REPORT_SECONDS"
+# Read by prometheus_client itself, so not imported from metrics.py
+METRICS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Seconds a worker has to exit after SIGTERM before it is killed
+SHUTDOWN_TIMEOUT = 30
+
+# Restart delay after a worker fails, doubled for each further failure
+# within STABLE_SECONDS of starting, up to RESTART_BACKOFF_MAX
+RESTART_BACKOFF = 1.0
+RESTART_BACKOFF_MAX = 60.0
+STABLE_SECONDS = 30.0
+
+
+def default_workers() -> int:
+    return int(os.getenv(WORKERS_ENV) or os.cpu_count() or 1)
+
+
+def prepare_metrics_dir() -> str:
+    """Point PROMETHEUS_MULTIPROC_DIR at an empty directory for the workers' metrics.
+
+    Must run before prometheus_client is imported, which is when it picks
+    multi-process mode. Files left by an earlier run are removed.
+
+    Returns:
+        The directory
+    """
+    if "prometheus_client" in sys.modules:
+        logger.warning("prometheus_client already imported; metrics stay per process")
+    path = os.getenv(METRICS_DIR_ENV)
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+    else:
+        path = tempfile.mkdtemp(prefix="swu-metrics-")
+        os.environ[METRICS_DIR_ENV] = path
+    return path
+
+
+def preload() -> float:
+    """Build the API's indexes in this process and freeze them for forking.
+
+    Returns:
+        Seconds taken
+    """
+    from . import main
+    from .database import close_serving
+    from .metrics import WARMUP_SECONDS
+
+    start = time.perf_counter()
+    try:
+        main.preload_indexes()
+    except Exception as e:
+        # Workers retry on their own startup
+        logger.warning(f"Preload incomplete: {e}")
+    # SQLite connections must not cross a fork
+    close_serving()
+    gc.collect()
+    gc.freeze()
+    elapsed = time.perf_counter() - start
+    WARMUP_SECONDS.labels("preload").set(elapsed)
+    return elapsed
+
+
+def listen(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Listening socket shared by every worker."""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, log_level: str) -> None:
+    """Serve the app on an inherited socket until told to stop."""
+    import uvicorn
+    from .main import app
+
+    # The parent's handlers are not ours; uvicorn installs its own
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level.lower(), timeout_graceful_shutdown=SHUTDOWN_TIMEOUT)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def restart_delay(failures: int) -> float:
+    """Seconds to wait before restarting a worker after consecutive early failures."""
+    return min(RESTART_BACKOFF * 2 ** (failures - 1), RESTART_BACKOFF_MAX)
+
+
+class Supervisor:
+    """Forks workers from the preloaded parent and keeps them running."""
+
+    def __init__(self, sock: Optional[socket.socket], workers: int, log_level: str,
+                 report_seconds: float = 300,
+                 target: Callable[[socket.socket, str], None] = run_worker):
+        """
+        Args:
+            sock: Listening socket the workers serve
+            workers: Number of worker processes
+            log_level: uvicorn log level
+            report_seconds: Seconds between memory reports, 0 for none
+            target: Runs in each worker with (sock, log_level); the worker
+                exits when it returns
+        """
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.report_seconds = report_seconds
+        self.target = target
+        # Worker slot of each child process, and when each slot last started
+        self.children: Dict[int, int] = {}
+        self.started: Dict[int, float] = {}
+        # Consecutive early failures per slot, and when failed slots restart
+        self.failures: Dict[int, int] = {}
+        self.restarts: Dict[int, float] = {}
+        self.stopping = False
+
+    def spawn(self, slot: int) -> int:
+        from .catalog_refresh import SYNC_INTERVAL_ENV
+
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            # Only the first worker syncs from the SWU API
+            if slot > 0:
+                os.environ[SYNC_INTERVAL_ENV] = "0"
+            try:
+                self.target(self.sock, self.log_level)
+            except BaseException:
+                logger.exception("Worker failed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = slot
+        self.started[slot] = time.monotonic()
+        return pid
+
+    def reap(self, pid: int, status: int) -> None:
+        """Account for an exited worker and schedule its restart."""
+        slot = self.children.pop(pid, None)
+        if os.getenv(METRICS_DIR_ENV):
+            from prometheus_client.multiprocess import mark_process_dead
+            mark_process_dead(pid)
+        if slot is None or self.stopping:
+            return
+        if time.monotonic() - self.started[slot] < STABLE_SECONDS:
+            self.failures[slot] = self.failures.get(slot, 0) + 1
+        else:
+            self.failures[slot] = 1
+        delay = restart_delay(self.failures[slot])
+        logger.warning("Worker %d exited with status %d; restarting in %.1fs", pid, status, delay)
+        self.restarts[slot] = time.monotonic() + delay
+
+    def report(self) -> None:
+        from .metrics import process_memory
+
+        for pid in sorted(self.children):
+            memory = process_memory(str(pid))
+            logger.info("Worker %d: RSS %.1f MB, PSS %.1f MB (%.1f MB shared, %.1f MB private)",
+                        pid, memory["rss"] / 1e6, memory["pss"] / 1e6,
+                        memory["shared"] / 1e6, memory["private"] / 1e6)
+
+    def stop(self, signum=None, frame=None) -> None:
+        self.stopping = True
+        self.restarts.clear()
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        for slot in range(self.workers):
+            self.spawn(slot)
+        logger.info("Started %d workers: %s", self.workers, sorted(self.children))
+
+        next_report = time.monotonic() + min(self.report_seconds, 10) if self.report_seconds else None
+        deadline = None
+        while self.children or self.restarts:
+            pid, status = os.waitpid(-1, os.WNOHANG) if self.children else (0, 0)
+            if pid:
+                self.reap(pid, status)
+                continue
+            now = time.monotonic()
+            for slot, restart_at in list(self.restarts.items()):
+                if now >= restart_at:
+                    del self.restarts[slot]
+                    self.spawn(slot)
+            if self.stopping:
+                deadline = deadline or now + SHUTDOWN_TIMEOUT
+                if now > deadline:
+                    for child in self.children:
+                        os.kill(child, signal.SIGKILL)
+            elif next_report and now >= next_report:
+                self.report()
+                next_report = now + self.report_seconds
+            time.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API from preloaded, forked workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--log-level", default=os.getenv("SWU_LOG_LEVEL", "INFO"))
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("Pre-forked serving needs os.fork; use uvicorn --workers instead")
+
+    own_metrics_dir = not os.getenv(METRICS_DIR_ENV)
+    metrics_dir = prepare_metrics_dir()
+    from .metrics import process_memory
+
+    sock = listen(args.host, args.port)
+    seconds = preload()
+    memory = process_memory()
+    logger.info("Preloaded indexes in %.3fs: parent RSS %.1f MB", seconds, memory["rss"] / 1e6)
+    logger.info("Listening on %s:%d; worker metrics in %s", args.host, args.port, metrics_dir)
+    supervisor = Supervisor(sock, args.workers, args.log_level, float(os.getenv(REPORT_ENV, "300")))
+    signal.signal(signal.SIGINT, supervisor.stop)
+    signal.signal(signal.SIGTERM, supervisor.stop)
+    try:
+        supervisor.run()
+    finally:
+        if own_metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import os
+import re
+import time
+import random
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fraction of statements timed and aggregated (SWU_SQL_SAMPLE_RATE)
+SAMPLE_RATE = float(os.getenv("SWU_SQL_SAMPLE_RATE", "0.01"))
+# Sampled statements slower than this go to the slow-query log (SWU_SLOW_QUERY_MS)
+SLOW_QUERY_MS = float(os.getenv("SWU_SLOW_QUERY_MS", "100"))
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def normalize_statement(sql: str) -> str:
+    """Statement shape shared by executions that differ only in values.
+
+    Collapses whitespace, literals and IN lists of any length, so e.g.
+    batch lookups of 3 and of 300 IDs aggregate together.
+    """
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    sql = _LITERAL.sub("?", sql)
+    return _IN_LIST.sub("IN (?, ...)", sql)
+
+
+def explain(conn: sqlite3.Connection, sql: str, parameters=()) -> List[str]:
+    """EXPLAIN QUERY PLAN detail lines for a statement, or [] if it has no plan."""
+    try:
+        rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    except sqlite3.Error:
+        return []
+    return [row[3] for row in rows]
+
+
+class StatementStats:
+    """Aggregated timings of one statement shape."""
+    __slots__ = ("statement", "plan", "plan_fingerprint", "samples", "total", "max", "rows")
+
+    def __init__(self, statement: str, plan: List[str]):
+        self.statement = statement
+        self.plan = plan
+        self.plan_fingerprint = (
+            hashlib.sha1("\n".join(plan).encode()).hexdigest()[:12] if plan else None
+        )
+        self.samples = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+
+    def as_dict(self, sample_rate: float) -> Dict:
+        return {
+            "statement": self.statement,
+            "plan_fingerprint": self.plan_fingerprint,
+            "plan": self.plan,
+            "samples": self.samples,
+            "total_ms": round(self.total * 1e3, 3),
+            "mean_ms": round(self.total / self.samples * 1e3, 3) if self.samples else 0.0,
+            "max_ms": round(self.max * 1e3, 3),
+            "rows": self.rows,
+            # Scaled up by the sampling rate
+            "estimated_total_ms": round(self.total / sample_rate * 1e3, 3) if sample_rate else 0.0,
+        }
+
+
+class QueryTracer:
+    """Sampled per-statement timings, plan fingerprints and a slow-query log.
+
+    A sampled statement is timed from execute() until its last row is
+    fetched. Unsampled statements run untouched apart from one random draw.
+    """
+
+    def __init__(self, sample_rate: float = SAMPLE_RATE, slow_ms: float = SLOW_QUERY_MS,
+                 slow_log_size: int = 100):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.statements: Dict[str, StatementStats] = {}
+        self.slow_log: deque = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def statement_stats(self, conn: sqlite3.Connection, sql: str, parameters) -> StatementStats:
+        """Stats entry for a statement's shape; its plan is explained on first sight."""
+        key = normalize_statement(sql)
+        stats = self.statements.get(key)
+        if stats is None:
+            plan = explain(conn, sql, parameters)
+            with self._lock:
+                stats = self.statements.setdefault(key, StatementStats(key, plan))
+        return stats
+
+    def record(self, stats: StatementStats, elapsed: float, rows: int, sql: str, parameters) -> None:
+        with self._lock:
+            stats.samples += 1
+            stats.total += elapsed
+            stats.rows += rows
+            if elapsed > stats.max:
+                stats.max = elapsed
+        elapsed_ms = elapsed * 1e3
+        if elapsed_ms >= self.slow_ms:
+            self.slow_log.append({
+                "timestamp": time.time(),
+                "duration_ms": round(elapsed_ms, 3),
+                "statement": _WHITESPACE.sub(" ", sql).strip(),
+                "parameters": repr(parameters)[:200],
+                "rows": rows,
+                "plan_fingerprint": stats.plan_fingerprint,
+            })
+            logger.warning("Slow query (%.1f ms, %d rows): %s", elapsed_ms, rows, stats.statement)
+
+    def top(self, limit: int = 20, order: str = "total_ms") -> List[Dict]:
+        """Statement shapes ordered by total_ms, max_ms, mean_ms or samples."""
+        with self._lock:
+            entries = [stats.as_dict(self.sample_rate) for stats in self.statements.values()]
+        entries.sort(key=lambda entry: entry[order], reverse=True)
+        return entries[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.statements.clear()
+            self.slow_log.clear()
+
+
+# Process-wide tracer used by TracedConnection
+query_tracer = QueryTracer()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that samples statements for the connection's tracer."""
+
+    def execute(self, sql: str, parameters=()):
+        tracer: QueryTracer = self.connection.tracer
+        if not tracer.sampled():
+            return super().execute(sql, parameters)
+
+        stats = tracer.statement_stats(self.connection, sql, parameters)
+        # Only sampled cursors pay for timing every fetch
+        self.__class__ = _TimedCursor
+        self._trace = (tracer, stats, sql, parameters)
+        self._trace_elapsed = 0.0
+        self._trace_rows = 0
+        start = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            self._trace_elapsed += time.perf_counter() - start
+        if self.description is None:
+            self._finish()
+        return self
+
+
+class _TimedCursor(TracedCursor):
+    """A TracedCursor whose current statement is being timed."""
+
+    def _finish(self) -> None:
+        if self.__class__ is not _TimedCursor:
+            return
+        tracer, stats, sql, parameters = self._trace
+        self.__class__ = TracedCursor
+        tracer.record(stats, self._trace_elapsed, self._trace_rows, sql, parameters)
+
+    def execute(self, sql: str, parameters=()):
+        self._finish()
+        return TracedCursor.execute(self, sql, parameters)
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._trace_elapsed += time.perf_counter() - start
+            self._finish()
+            raise
+        self._trace_elapsed += time.perf_counter() - start
+        self._trace_rows += 1
+        return row
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._trace_elapsed += time.perf_counter() - start
+        if row is None:
+            self._finish()
+        else:
+            self._trace_rows += 1
+        return row
+
+    def fetchmany(self, size: Optional[int] = None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._trace_elapsed += time.perf_counter() - start
+        self._trace_rows += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._trace_elapsed += time.perf_counter() - start
+        self._trace_rows += len(rows)
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Cursors abandoned mid-result still report what they spent
+        self._finish()
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose statements are sampled by a QueryTracer.
+
+    Use as sqlite3.connect(path, factory=TracedConnection). executemany and
+    executescript are not traced.
+    """
+    tracer: QueryTracer = query_tracer
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters=()):
+        return self.cursor().execute(sql, parameters)
@@ -8,6 +8,15 @@ from typing import Dict, List, Optional, Tuple
 import logging
 from urllib.parse import urljoin
 import os
+from ..database.schema import CARD_SCHEMA, FILTER_INDEXES, NEIGHBOR_SCHEMA, PRICE_SCHEMA
+from ..database.import_prices import carry_over_prices
+from . import database
+from .card_neighbors import carry_over_neighbors
+from .catalog_changes import record_changes
+from .catalog_snapshot import write_snapshot
+from .metrics import (
+    INGEST_CARDS, INGEST_ERRORS, INGEST_FETCH_SECONDS, INGEST_PAGES, INGEST_RETRIES
+)
 
 class SWUApiClient:
     """Client for interacting with the Star Wars Unlimited official API.
@@ -19,13 +28,46 @@ class SWUApiClient:
     
     BASE_URL = "https://admin.starwarsunlimited.com/api/"
     
-    def __init__(self, database_path: str = "swu_cards.db"):
+    # Responses worth retrying: rate limiting and transient server errors
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    # Transport failures worth retrying, including bodies cut off mid-transfer
+    RETRY_EXCEPTIONS = (
+        requests.ConnectionError, requests.Timeout,
+        requests.exceptions.ChunkedEncodingError, requests.JSONDecodeError
+    )
+    
+    def __init__(self, database_path: Optional[str] = None, base_url: Optional[str] = None,
+                 max_retries: int = 3, backoff: float = 0.5, timeout: float = 30.0,
+                 wait_for_build: bool = True):
         """Initialize the API client with database connection and session management.
         
         Args:
-            database_path: Path to the SQLite database file. Defaults to "swu_cards.db".
+            database_path: Path of the database to build. Defaults to the
+                shared card database (SWU_DB_PATH or ~/.swu/swu_cards.db).
+                The build is written next to it and swapped in on close.
+            base_url: API root to fetch from. Defaults to SWU_API_BASE_URL or
+                BASE_URL, so ingest can run against a local fake server.
+            max_retries: Retries per page after 429/5xx responses, timeouts
+                and dropped connections. Defaults to 3.
+            backoff: Initial retry delay in seconds, doubled on every retry.
+                A Retry-After header takes precedence.
+            timeout: Request timeout in seconds. Defaults to 30.
+            wait_for_build: Wait for another build of the same database to
+                finish. If False, raise database.BuildInProgress instead.
+
+        The build, and with it the database's build lock, starts with
+        build_database() or the first write; close the client (or use it as
+        a context manager) to publish or abandon it.
         """
-        self.database_path = database_path
+        self.database_path = database_path or database.database_path()
+        self._temp_db_path = None
+        self.base_url = base_url or os.getenv("SWU_API_BASE_URL", self.BASE_URL)
+        if not self.base_url.endswith("/"):
+            self.base_url += "/"
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.wait_for_build = wait_for_build
         self.session = requests.Session()
         self._db_connection = None
         
@@ -42,17 +84,24 @@ class SWUApiClient:
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
-        
-        # Initialize database schema
-        self._init_database()
 
     def __enter__(self):
         """Context manager entry point."""
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager exit point."""
-        self._close_db_connection()
+        """Context manager exit point; a failed build is not published."""
+        self._close_db_connection(publish=exc_type is None)
+        self.session.close()
+
+    def __del__(self):
+        # A client dropped mid-build must not keep holding the build lock
+        if getattr(self, "_db_connection", None) is not None:
+            self.close()
+
+    def close(self):
+        """Abandon an unpublished build, releasing its build lock, and close the session."""
+        self._close_db_connection(publish=False)
         self.session.close()
 
     def _get_db_connection(self):
@@ -62,45 +111,52 @@ class SWUApiClient:
             sqlite3.Connection: An active database connection.
         """
         if self._db_connection is None:
-            # Use the user's home directory for the database
-            home_dir = os.path.expanduser("~")
-            db_dir = os.path.join(home_dir, '.swu')
-            os.makedirs(db_dir, exist_ok=True)
-            
-            self.database_path = os.path.join(db_dir, 'swu_cards.db')
-            logging.info(f"Using database at: {self.database_path}")
+            # Build into a scratch file next to the served database
+            self._temp_db_path = database.prepare_build(self.database_path, blocking=self.wait_for_build)
+            logging.info(f"Building database at: {self._temp_db_path}")
             
             try:
-                # Create a new database connection
-                self._db_connection = sqlite3.connect(self.database_path)
-                self._db_connection.row_factory = sqlite3.Row
-                
-                # Set pragmas for better performance
-                self._db_connection.execute("PRAGMA foreign_keys = ON")
-                self._db_connection.execute("PRAGMA cache_size = -2000")  # Use 2MB cache
-                
+                self._db_connection = database.connect_build(self._temp_db_path)
+                self._init_database()
             except sqlite3.Error as e:
                 logging.error(f"Error connecting to database: {e}")
-                logging.error(f"Database path: {self.database_path}")
+                logging.error(f"Database path: {self._temp_db_path}")
+                if self._db_connection is not None:
+                    self._db_connection.close()
+                    self._db_connection = None
+                database.abandon_build(self._temp_db_path)
                 raise
                 
         return self._db_connection
         
-    def _close_db_connection(self):
-        """Close the database connection if it exists and move the temporary file to the final location."""
+    def _close_db_connection(self, publish: bool = True):
+        """Close the database connection and publish the build.
+        
+        Args:
+            publish: Atomically replace the served database with the build.
+                Pass False after a failed build to leave it untouched.
+        """
         if self._db_connection is not None:
             try:
+                if publish:
+                    record_changes(self._db_connection, self.database_path)
+                    write_snapshot(self._db_connection)
+                    database.finish_build(self._db_connection)
                 self._db_connection.close()
                 self._db_connection = None
                 
-                # Move the temporary file to the final location
-                if hasattr(self, '_temp_db_path') and os.path.exists(self._temp_db_path):
-                    if os.path.exists(self.database_path):
-                        os.remove(self.database_path)
-                    os.rename(self._temp_db_path, self.database_path)
+                if publish:
+                    database.publish_build(self._temp_db_path, self.database_path)
+                    logging.info(f"Published database at: {self.database_path}")
+                else:
+                    database.abandon_build(self._temp_db_path)
                     
             except Exception as e:
                 logging.error(f"Error closing database connection: {e}")
+                if self._db_connection is not None:
+                    self._db_connection.close()
+                    self._db_connection = None
+                database.abandon_build(self._temp_db_path)
                 raise
 
     def _init_database(self):
@@ -123,89 +179,18 @@ class SWUApiClient:
             DROP TABLE IF EXISTS card_traits;
             DROP TABLE IF EXISTS card_keywords;
             DROP TABLE IF EXISTS card_aspects;
+            DROP TABLE IF EXISTS card_neighbors;
+            DROP TABLE IF EXISTS price_stats;
+            DROP TABLE IF EXISTS price_buckets;
             DROP TABLE IF EXISTS price_history;
             DROP TABLE IF EXISTS cards;
         ''')
         
         # Create tables with enhanced schema
-        cursor.executescript('''
-            -- Main cards table with additional fields
-            CREATE TABLE IF NOT EXISTS cards (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                subtitle TEXT,
-                energy_cost INTEGER,
-                type TEXT NOT NULL,
-                type2 TEXT,
-                rarity TEXT,
-                text TEXT,
-                text_styled TEXT,
-                epic_action TEXT,
-                deploy_box TEXT,
-                attack INTEGER,
-                health INTEGER,
-                image_uri TEXT,
-                image_back_uri TEXT,
-                price_usd REAL,
-                set_name TEXT,
-                set_code TEXT,
-                card_number TEXT,
-                release_date TEXT,
-                last_updated TEXT,
-                is_unique BOOLEAN,
-                artist TEXT,
-                serial_code TEXT
-            );
-            
-            -- Price history tracking for market analysis
-            CREATE TABLE IF NOT EXISTS price_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                card_id TEXT,
-                price_usd REAL,
-                source TEXT,
-                timestamp TEXT,
-                FOREIGN KEY(card_id) REFERENCES cards(id)
-            );
-            
-            -- Card aspects (factions/alignments) with colors
-            CREATE TABLE IF NOT EXISTS card_aspects (
-                card_id TEXT,
-                aspect_name TEXT,
-                aspect_color TEXT,
-                FOREIGN KEY(card_id) REFERENCES cards(id),
-                PRIMARY KEY(card_id, aspect_name)
-            );
-            
-            -- Keywords (game mechanics and abilities)
-            CREATE TABLE IF NOT EXISTS card_keywords (
-                card_id TEXT,
-                keyword TEXT,
-                FOREIGN KEY(card_id) REFERENCES cards(id),
-                PRIMARY KEY(card_id, keyword)
-            );
-            
-            -- Traits (Force, Pilot, etc.)
-            CREATE TABLE IF NOT EXISTS card_traits (
-                card_id TEXT,
-                trait TEXT,
-                FOREIGN KEY(card_id) REFERENCES cards(id),
-                PRIMARY KEY(card_id, trait)
-            );
-            
-            -- Arenas (Ground, Space, etc.)
-            CREATE TABLE IF NOT EXISTS card_arenas (
-                card_id TEXT,
-                arena TEXT,
-                FOREIGN KEY(card_id) REFERENCES cards(id),
-                PRIMARY KEY(card_id, arena)
-            );
-            
-            -- Create indices for common queries
-            CREATE INDEX IF NOT EXISTS idx_card_name ON cards(name);
-            CREATE INDEX IF NOT EXISTS idx_card_type ON cards(type);
-            CREATE INDEX IF NOT EXISTS idx_card_set ON cards(set_name);
-            CREATE INDEX IF NOT EXISTS idx_card_cost ON cards(energy_cost);
-        ''')
+        cursor.executescript(CARD_SCHEMA)
+        cursor.executescript(FILTER_INDEXES)
+        cursor.executescript(PRICE_SCHEMA)
+        cursor.executescript(NEIGHBOR_SCHEMA)
         
         conn.commit()
 
@@ -400,6 +385,8 @@ class SWUApiClient:
         """Fetch a page of cards from the API.
         
         Makes the actual API request with appropriate parameters and error handling.
+        Rate limiting (429), transient server errors, timeouts and dropped
+        connections are retried up to max_retries times with backoff.
         
         Args:
             page: Page number to fetch. Defaults to 1.
@@ -408,7 +395,7 @@ class SWUApiClient:
         Returns:
             dict: API response containing card data
         """
-        endpoint = urljoin(self.BASE_URL, "card-list")
+        endpoint = urljoin(self.base_url, "card-list")
         logging.info(f"Fetching cards from API: page={page}, page_size={page_size}")
         
         params = {
@@ -421,20 +408,51 @@ class SWUApiClient:
             "populate": "*"  # Request all related data
         }
         
-        try:
-            response = self.session.get(endpoint, params=params)
-            response.raise_for_status()
-            data = response.json()
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                with INGEST_FETCH_SECONDS.time():
+                    response = self.session.get(endpoint, params=params, timeout=self.timeout)
+                    if response.status_code in self.RETRY_STATUSES and not last_attempt:
+                        reason = f"HTTP {response.status_code}"
+                        delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                    else:
+                        response.raise_for_status()
+                        data = response.json()
+                        break
+            except self.RETRY_EXCEPTIONS as e:
+                if last_attempt:
+                    INGEST_ERRORS.inc()
+                    logging.error(f"API request failed: {e}")
+                    raise
+                reason = str(e)
+                delay = self._retry_delay(attempt, None)
+            except requests.RequestException as e:
+                INGEST_ERRORS.inc()
+                logging.error(f"API request failed: {e}")
+                raise
             
-            # Log the first card's structure for debugging
-            if page == 1 and data.get('data'):
-                first_card = data['data'][0]
-                logging.debug(f"First card structure: {first_card}")
-                
-            return data
-        except requests.RequestException as e:
-            logging.error(f"API request failed: {e}")
-            raise
+            INGEST_RETRIES.inc()
+            logging.warning(f"API request failed ({reason}), retrying page {page} in {delay:.2f}s")
+            time.sleep(delay)
+        
+        INGEST_PAGES.inc()
+        
+        # Log the first card's structure for debugging
+        if page == 1 and data.get('data'):
+            first_card = data['data'][0]
+            logging.debug(f"First card structure: {first_card}")
+            
+        return data
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Seconds to wait before a retry: Retry-After if given, else exponential backoff."""
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt)
 
     def fetch_all_cards(self) -> List[Dict]:
         """Fetch all cards from the API."""
@@ -464,6 +482,8 @@ class SWUApiClient:
 
     def build_database(self):
         """Build the database with all card data."""
+        # Take the build lock before fetching, so a busy database fails fast
+        self._get_db_connection()
         try:
             cards = self.fetch_all_cards()
             cards_stored = 0
@@ -471,9 +491,20 @@ class SWUApiClient:
             for card in cards:
                 self.store_card_data(*self.process_card_data(card))
                 cards_stored += 1
+                INGEST_CARDS.inc()
                 if cards_stored % 100 == 0:
                     logging.info(f"Stored {cards_stored} cards")
             
+            # Imported prices and the neighbor table of the last vector build
+            # live only in the database being replaced
+            conn = self._get_db_connection()
+            carried = carry_over_prices(conn, self.database_path)
+            if carried:
+                logging.info(f"Carried over {carried} price snapshots")
+            carried = carry_over_neighbors(conn, self.database_path)
+            if carried:
+                logging.info(f"Carried over {carried} card neighbors")
+            
             logging.info(f"Database build complete. {cards_stored} cards stored successfully.")
         except Exception as e:
             logging.error(f"Error building database: {e}")
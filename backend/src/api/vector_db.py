@@ -2,9 +2,11 @@ from qdrant_client import QdrantClient
 from qdrant_client.http import models
 from openai import OpenAI
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import numpy as np
 import logging
 from dotenv import load_dotenv
+from .metrics import VECTOR_EMBEDDINGS, VECTOR_EMBEDDING_SECONDS, VECTOR_SEARCHES, VECTOR_UPSERTS
 
 # Load environment variables
 load_dotenv()
@@ -13,6 +15,12 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def point_id(card_id: str):
+    """Qdrant point ID for a card; numeric card IDs must be sent as integers."""
+    return int(card_id) if str(card_id).isdigit() else card_id
+
+
 class VectorDB:
     def __init__(self):
         """Initialize the vector database client."""
@@ -68,11 +76,13 @@ class VectorDB:
     def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for any text using OpenAI's API."""
         try:
-            response = OpenAI.Embedding.create(
-                model="text-embedding-3-small",
-                input=text.strip(),
-                encoding_format="float"
-            )
+            with VECTOR_EMBEDDING_SECONDS.time():
+                response = OpenAI.Embedding.create(
+                    model="text-embedding-3-small",
+                    input=text.strip(),
+                    encoding_format="float"
+                )
+            VECTOR_EMBEDDINGS.inc()
             return response['data'][0]['embedding']
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
@@ -115,6 +125,7 @@ class VectorDB:
                         }
                     )]
                 )
+                VECTOR_UPSERTS.labels(self.rules_collection_name).inc()
                 logger.info(f"Indexed rules section: {section.get('title', f'Section {i}')}")
         except Exception as e:
             logger.error(f"Error indexing rules: {e}")
@@ -128,7 +139,7 @@ class VectorDB:
             self.qdrant.upsert(
                 collection_name=self.collection_name,
                 points=[models.PointStruct(
-                    id=card['id'],
+                    id=point_id(card['id']),
                     vector=embedding,
                     payload={
                         'name': card['name'],
@@ -142,12 +153,37 @@ class VectorDB:
                     }
                 )]
             )
+            VECTOR_UPSERTS.labels(self.collection_name).inc()
             logger.info(f"Indexed card: {card['name']}")
 
         except Exception as e:
             logger.error(f"Error indexing card {card.get('name')}: {e}")
             raise
 
+    def card_vectors(self, batch_size: int = 256) -> Tuple[List[str], np.ndarray]:
+        """Every card embedding in the collection, scrolled in batches.
+
+        Returns:
+            Tuple of (card IDs, embedding matrix with one row per card)
+        """
+        card_ids: List[str] = []
+        vectors: List[List[float]] = []
+        offset = None
+        while True:
+            points, offset = self.qdrant.scroll(
+                collection_name=self.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=False,
+                with_vectors=True
+            )
+            for point in points:
+                card_ids.append(str(point.id))
+                vectors.append(point.vector)
+            if offset is None:
+                break
+        return card_ids, np.array(vectors, dtype=np.float32)
+
     async def find_similar_cards(self, card_id: str, limit: int = 5) -> List[Dict]:
         """Find cards similar to the given card."""
         try:
@@ -156,10 +192,12 @@ class VectorDB:
                 collection_name=self.collection_name,
                 query_vector=self.qdrant.retrieve(
                     collection_name=self.collection_name,
-                    ids=[card_id]
+                    ids=[point_id(card_id)],
+                    with_vectors=True
                 )[0].vector,
                 limit=limit + 1  # Add 1 to account for the query card itself
             )
+            VECTOR_SEARCHES.labels(self.collection_name).inc()
 
             # Filter out the query card and return similar cards
             similar_cards = [
@@ -185,6 +223,7 @@ class VectorDB:
                 query_vector=embedding,
                 limit=limit
             )
+            VECTOR_SEARCHES.labels(self.collection_name).inc()
 
             return [hit.payload for hit in search_result]
 
@@ -200,7 +239,8 @@ class VectorDB:
             for card_id in deck_cards:
                 card_vector = self.qdrant.retrieve(
                     collection_name=self.collection_name,
-                    ids=[card_id]
+                    ids=[point_id(card_id)],
+                    with_vectors=True
                 )[0].vector
                 deck_vectors.append(card_vector)
 
@@ -213,6 +253,7 @@ class VectorDB:
                 query_vector=avg_vector,
                 limit=limit + len(deck_cards)  # Add extra to account for filtering
             )
+            VECTOR_SEARCHES.labels(self.collection_name).inc()
 
             # Filter out cards already in the deck
             suggestions = [
@@ -1,10 +1,11 @@
 # build_database.py
 
 from ..api.swu_api_client import SWUApiClient
+from ..api.database import connect_serving, database_path as get_database_path
+from ..api.image_cache import ImageCache, card_image_urls
 import logging
 from datetime import datetime
 import sqlite3
-import os
 
 def verify_database(database_path: str):
     """Verify the database contents and provide a summary."""
@@ -59,6 +60,22 @@ def verify_database(database_path: str):
     finally:
         conn.close()
 
+def prefetch_images(database_path: str):
+    """Fetch every card image and render its thumbnail and WebP variants.
+
+    Run after a build so the API serves images from the local cache
+    (SWU_IMAGE_CACHE) instead of fetching them on first request.
+    """
+    conn = connect_serving(database_path, immutable=False)
+    try:
+        urls = list(card_image_urls(conn))
+    finally:
+        conn.close()
+    
+    logging.info(f"Prefetching {len(set(urls))} card images")
+    result = ImageCache().prefetch(urls)
+    logging.info(f"  Images cached: {result['images']}, failed: {result['failed']}")
+
 def main():
     # Set up logging with debug level
     logging.basicConfig(
@@ -67,10 +84,8 @@ def main():
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
     
-    # Get the absolute path to the database file
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    backend_dir = os.path.dirname(os.path.dirname(current_dir))
-    database_path = os.path.join(backend_dir, 'swu_cards.db')
+    # The database the API serves (SWU_DB_PATH or ~/.swu/swu_cards.db)
+    database_path = get_database_path()
     
     logging.info(f"Starting database build at {datetime.now()}")
     logging.info(f"Using database at: {database_path}")
@@ -80,12 +95,15 @@ def main():
         client = SWUApiClient(database_path=database_path)
         client.build_database()
         
-        # Close the client's connection before verifying
+        # Close the client's connection, publishing the build, before verifying
         client._close_db_connection()
         
         # Now verify the database contents
         verify_database(database_path)
         
+        # Thumbnails and WebP variants ahead of the first requests
+        prefetch_images(database_path)
+        
         # Log completion information
         logging.info(f"\nBuild Summary:")
         logging.info(f"Database build completed at {datetime.now()}")
@@ -2,6 +2,10 @@ import sqlite3
 import os
 import asyncio
 from ..api.vector_db import VectorDB
+from ..api import database
+from ..api.database import connect_serving, database_path
+from ..api.card_neighbors import write_neighbors
+from ..api.card_queries import load_all_cards
 from .rules_parser import parse_rulebook
 import logging
 from typing import List, Dict
@@ -12,50 +16,15 @@ logger = logging.getLogger(__name__)
 
 async def get_all_cards() -> List[Dict]:
     """Fetch all cards from the SQLite database with their related data."""
-    # Get the database path from the user's home directory
-    home_dir = os.path.expanduser("~")
-    db_path = os.path.join(home_dir, '.swu', 'swu_cards.db')
+    db_path = database_path()
     
     if not os.path.exists(db_path):
         raise FileNotFoundError(f"Database not found at {db_path}")
     
-    conn = sqlite3.connect(db_path)
+    conn = connect_serving(db_path)
     conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
     try:
-        # Get all cards
-        cards = []
-        cursor.execute("SELECT * FROM cards")
-        for row in cursor:
-            card = dict(row)
-            card_id = str(card["id"])
-            
-            # Get aspects
-            cursor.execute(
-                "SELECT aspect_name, aspect_color FROM card_aspects WHERE card_id = ?",
-                [card_id]
-            )
-            card["aspects"] = [dict(row) for row in cursor.fetchall()]
-            
-            # Get keywords
-            cursor.execute(
-                "SELECT keyword FROM card_keywords WHERE card_id = ?",
-                [card_id]
-            )
-            card["keywords"] = [row["keyword"] for row in cursor.fetchall()]
-            
-            # Get traits
-            cursor.execute(
-                "SELECT trait FROM card_traits WHERE card_id = ?",
-                [card_id]
-            )
-            card["traits"] = [row["trait"] for row in cursor.fetchall()]
-            
-            cards.append(card)
-            
-        return cards
-        
+        return load_all_cards(conn)
     finally:
         conn.close()
 
@@ -89,6 +58,27 @@ def get_rulebook_sections() -> List[Dict[str, str]]:
     
     return parse_rulebook(rulebook_path)
 
+def build_neighbor_table(vector_db: VectorDB) -> int:
+    """Store the top-k neighbors of every indexed card in the card database.
+
+    All embeddings are read from the collection once and scored with one
+    batched pass; the result is published like any other build.
+    """
+    card_ids, vectors = vector_db.card_vectors()
+    db_path = database_path()
+    build_path = database.prepare_build(db_path, copy_existing=True)
+    conn = database.connect_build(build_path)
+    try:
+        rows = write_neighbors(conn, card_ids, vectors)
+        database.finish_build(conn)
+    except Exception:
+        conn.close()
+        database.abandon_build(build_path)
+        raise
+    conn.close()
+    database.publish_build(build_path, db_path)
+    return rows
+
 async def main():
     try:
         # Initialize vector database
@@ -120,6 +110,11 @@ async def main():
                 logger.error(f"Error processing card {card.get('name')}: {e}")
                 continue
         
+        # Precompute "similar cards" for the API
+        logger.info("Computing card neighbors...")
+        rows = build_neighbor_table(vector_db)
+        logger.info(f"Stored {rows} card neighbors")
+        
         logger.info("Vector database build completed successfully!")
         
     except Exception as e:
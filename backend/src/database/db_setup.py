@@ -2,6 +2,7 @@
 import sqlite3
 import os
 from .import_sample_data import import_sample_data
+from .schema import FILTER_INDEXES, PRICE_SCHEMA
 
 def setup_db():
     # Get the absolute path to the backend directory
@@ -118,6 +119,8 @@ def setup_db():
         CREATE INDEX idx_card_traits_card_id ON card_traits(card_id);
         CREATE INDEX idx_card_arenas_card_id ON card_arenas(card_id);
     ''')
+    cursor.executescript(FILTER_INDEXES)
+    cursor.executescript(PRICE_SCHEMA)
     
     conn.commit()
     conn.close()
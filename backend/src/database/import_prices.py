@@ -0,0 +1,434 @@
+# import_prices.py
+
+"""Bulk price snapshot import.
+
+Price files are dropped into a directory (SWU_PRICE_DROP, default
+~/.swu/prices) and imported in one pass:
+
+    python -m src.database.import_prices [files or directories ...]
+
+Accepted formats are CSV with a header row, a JSON list (or an object with
+a "data" list) and JSON lines (.jsonl/.ndjson). Each record needs a price
+(price_usd or price) and a card, either by id (card_id or id) or by
+set_code and card_number. timestamp (or date) may be ISO 8601, a date or
+epoch seconds and defaults to the file's modification time; source
+defaults to the file name.
+
+Snapshots are appended to price_history in batches, duplicates of a
+(card_id, timestamp, source) already stored are skipped, and the day/week
+buckets and rolling aggregates of every card that received new rows are
+recomputed. Like a catalog build, the import writes a copy of the
+database and swaps it in once complete, so the API never sees a partial
+import.
+"""
+import csv
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from ..api import database
+from ..api.catalog_changes import record_changes
+from ..api.catalog_snapshot import write_snapshot
+from .schema import PRICE_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+PRICE_DROP_ENV = "SWU_PRICE_DROP"
+PRICE_FILE_EXTENSIONS = (".csv", ".json", ".jsonl", ".ndjson")
+
+# Rows per executemany
+BATCH_SIZE = 5000
+
+# Downsampling periods stored in price_buckets
+PERIODS = ("day", "week")
+
+# Rolling windows kept in price_stats, in days
+WINDOWS = {"1d": 1, "7d": 7, "30d": 30}
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+Snapshot = Tuple[str, float, str, str]
+
+
+def price_drop_path() -> str:
+    """Directory price files are dropped into (SWU_PRICE_DROP or ~/.swu/prices)."""
+    path = os.getenv(PRICE_DROP_ENV)
+    if path:
+        return os.path.abspath(os.path.expanduser(path))
+    return os.path.join(os.path.expanduser("~"), ".swu", "prices")
+
+
+def normalize_timestamp(value) -> Optional[str]:
+    """UTC timestamp as stored in price_history (ISO 8601, seconds, no offset).
+
+    Accepts datetimes, epoch seconds and ISO 8601 strings, with or without a
+    time or offset; naive values are taken to be UTC. Returns None for
+    anything unparseable.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, (int, float)):
+        moment = datetime.fromtimestamp(value, timezone.utc)
+    else:
+        text = str(value).strip()
+        try:
+            moment = datetime.fromtimestamp(float(text), timezone.utc)
+        except ValueError:
+            try:
+                moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+            except ValueError:
+                return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+def bucket_start(timestamp: str, period: str) -> str:
+    """Start date of the day or week (starting Monday) containing timestamp."""
+    day = datetime.strptime(timestamp[:10], "%Y-%m-%d")
+    if period == "week":
+        day -= timedelta(days=day.weekday())
+    return day.strftime("%Y-%m-%d")
+
+
+def read_price_file(path: str) -> Iterator[Dict]:
+    """Raw records of a price file, by extension."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if extension == ".csv":
+            yield from csv.DictReader(f)
+        elif extension in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif extension == ".json":
+            data = json.load(f)
+            yield from data["data"] if isinstance(data, dict) else data
+        else:
+            raise ValueError(f"Unsupported price file: {path}")
+
+
+def _card_lookup(conn: sqlite3.Connection) -> Tuple[set, Dict[Tuple[str, str], str]]:
+    """Known card ids, and card ids by (set_code, card_number)."""
+    ids = set()
+    by_number = {}
+    for card_id, set_code, card_number in conn.execute(
+            "SELECT id, set_code, card_number FROM cards"):
+        ids.add(card_id)
+        if set_code and card_number:
+            by_number[(set_code.upper(), str(card_number).lstrip("0"))] = card_id
+    return ids, by_number
+
+
+def parse_snapshots(records: Iterable[Dict], cards: Tuple[set, Dict], default_source: str,
+                    default_timestamp: str, report: Dict) -> Iterator[Snapshot]:
+    """(card_id, price, source, timestamp) rows for the records naming a known card.
+
+    Records without a usable price or timestamp are counted as invalid,
+    records for cards not in the catalog as unknown.
+    """
+    ids, by_number = cards
+    for record in records:
+        report["rows"] += 1
+        card_id = record.get("card_id") or record.get("id")
+        if card_id in (None, "") and record.get("set_code") and record.get("card_number"):
+            card_id = by_number.get(
+                (str(record["set_code"]).upper(), str(record["card_number"]).lstrip("0")))
+        card_id = str(card_id).strip() if card_id not in (None, "") else None
+
+        price = record.get("price_usd", record.get("price"))
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            price = None
+        timestamp = record.get("timestamp", record.get("date"))
+        timestamp = normalize_timestamp(timestamp) if timestamp not in (None, "") else default_timestamp
+
+        if price is None or price < 0 or timestamp is None:
+            report["invalid"] += 1
+        elif card_id not in ids:
+            report["unknown_cards"] += 1
+        else:
+            yield card_id, price, record.get("source") or default_source, timestamp
+
+
+def append_snapshots(conn: sqlite3.Connection, snapshots: Iterable[Snapshot],
+                     touched: Dict[str, str], report: Dict) -> None:
+    """Append snapshots to price_history in batches of BATCH_SIZE.
+
+    Snapshots already stored are ignored. touched is updated with the
+    earliest newly stored timestamp of each card.
+    """
+    batch: List[Snapshot] = []
+
+    def flush():
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO price_history (card_id, price_usd, source, timestamp) "
+            "VALUES (?, ?, ?, ?)", batch
+        )
+        inserted = conn.total_changes - before
+        report["inserted"] += inserted
+        report["duplicates"] += len(batch) - inserted
+        # Duplicates can't be told apart here, so the earliest timestamp of the
+        # batch stands in; recomputing a few extra buckets is harmless
+        if inserted:
+            for card_id, _, _, timestamp in batch:
+                if timestamp < touched.get(card_id, "~"):
+                    touched[card_id] = timestamp
+        batch.clear()
+
+    for snapshot in snapshots:
+        batch.append(snapshot)
+        if len(batch) >= BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+
+
+def _buckets(card_id: str, rows: Sequence[Tuple[str, float]], period: str) -> Iterator[Tuple]:
+    """OHLC/mean rows for price_buckets from (timestamp, price) rows in time order."""
+    current = None
+    for timestamp, price in rows:
+        start = bucket_start(timestamp, period)
+        if current is None or current[0] != start:
+            if current is not None:
+                yield _bucket_row(card_id, period, current)
+            current = [start, price, price, price, price, 0.0, 0]
+        current[2] = max(current[2], price)
+        current[3] = min(current[3], price)
+        current[4] = price
+        current[5] += price
+        current[6] += 1
+    if current is not None:
+        yield _bucket_row(card_id, period, current)
+
+
+def _bucket_row(card_id: str, period: str, bucket: List) -> Tuple:
+    start, open_, high, low, close, total, samples = bucket
+    return card_id, period, start, open_, high, low, close, round(total / samples, 4), samples
+
+
+def _rolling_stats(conn: sqlite3.Connection, card_id: str) -> Optional[Tuple]:
+    """price_stats row for a card, with windows ending at its latest snapshot.
+
+    change_Nd compares the latest price with the last one at or before N
+    days earlier; it is NULL until the history covers the window.
+    """
+    latest = conn.execute(
+        "SELECT timestamp, price_usd FROM price_history WHERE card_id = ? "
+        "ORDER BY timestamp DESC LIMIT 1", (card_id,)
+    ).fetchone()
+    if latest is None:
+        return None
+    last_timestamp, last_price = latest
+    last = datetime.strptime(last_timestamp, TIMESTAMP_FORMAT)
+
+    changes = []
+    for days in WINDOWS.values():
+        cutoff = (last - timedelta(days=days)).strftime(TIMESTAMP_FORMAT)
+        reference = conn.execute(
+            "SELECT price_usd FROM price_history WHERE card_id = ? AND timestamp <= ? "
+            "ORDER BY timestamp DESC LIMIT 1", (card_id, cutoff)
+        ).fetchone()
+        if reference is None:
+            changes.append((None, None))
+        else:
+            change = round(last_price - reference[0], 4)
+            pct = round(100 * change / reference[0], 2) if reference[0] else None
+            changes.append((change, pct))
+
+    cutoff_7d = (last - timedelta(days=7)).strftime(TIMESTAMP_FORMAT)
+    cutoff_30d = (last - timedelta(days=30)).strftime(TIMESTAMP_FORMAT)
+    mean_7d = conn.execute(
+        "SELECT AVG(price_usd) FROM price_history WHERE card_id = ? AND timestamp > ?",
+        (card_id, cutoff_7d)
+    ).fetchone()[0]
+    mean_30d, low_30d, high_30d, samples_30d = conn.execute(
+        "SELECT AVG(price_usd), MIN(price_usd), MAX(price_usd), COUNT(*) "
+        "FROM price_history WHERE card_id = ? AND timestamp > ?", (card_id, cutoff_30d)
+    ).fetchone()
+
+    return (
+        card_id, last_price, last_timestamp,
+        changes[0][0], changes[1][0], changes[2][0],
+        changes[0][1], changes[1][1], changes[2][1],
+        round(mean_7d, 4), round(mean_30d, 4), low_30d, high_30d, samples_30d,
+    )
+
+
+def refresh_aggregates(conn: sqlite3.Connection, touched: Dict[str, str]) -> None:
+    """Recompute buckets and rolling aggregates of cards with new snapshots.
+
+    Args:
+        conn: Build connection
+        touched: Card id -> earliest new timestamp. Buckets are rebuilt from
+            the start of the week containing it; earlier ones are unchanged.
+    """
+    for card_id, earliest in touched.items():
+        since = bucket_start(earliest, "week")
+        rows = conn.execute(
+            "SELECT timestamp, price_usd FROM price_history "
+            "WHERE card_id = ? AND timestamp >= ? ORDER BY timestamp", (card_id, since)
+        ).fetchall()
+        conn.execute(
+            "DELETE FROM price_buckets WHERE card_id = ? AND bucket_start >= ?", (card_id, since)
+        )
+        for period in PERIODS:
+            conn.executemany(
+                "INSERT INTO price_buckets (card_id, period, bucket_start, open, high, low, "
+                "close, mean, samples) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                _buckets(card_id, rows, period)
+            )
+        stats = _rolling_stats(conn, card_id)
+        if stats is not None:
+            conn.execute(f"INSERT OR REPLACE INTO price_stats VALUES ({', '.join('?' * 14)})", stats)
+    refresh_card_prices(conn, touched)
+
+
+def refresh_card_prices(conn: sqlite3.Connection, card_ids: Optional[Iterable[str]] = None) -> None:
+    """Set cards.price_usd to the latest snapshot price (all cards by default)."""
+    update = (
+        "UPDATE cards SET price_usd = "
+        "(SELECT last_price FROM price_stats WHERE price_stats.card_id = cards.id) "
+        "WHERE id IN (SELECT card_id FROM price_stats)"
+    )
+    if card_ids is None:
+        conn.execute(update)
+    else:
+        conn.executemany(update + " AND id = ?", ((card_id,) for card_id in card_ids))
+
+
+def carry_over_prices(conn: sqlite3.Connection, published_path: str) -> int:
+    """Copy price history and aggregates from the published database into a build.
+
+    Catalog builds start from an empty file; this keeps the imported price
+    history of every card the new catalog still has. Call it once the cards
+    are stored.
+
+    Returns:
+        Number of price_history rows copied
+    """
+    if not os.path.exists(published_path):
+        return 0
+    conn.commit()
+    conn.execute("ATTACH DATABASE ? AS published", (published_path,))
+    try:
+        tables = {row[0] for row in conn.execute(
+            "SELECT name FROM published.sqlite_master WHERE type = 'table'")}
+        if "price_history" not in tables:
+            return 0
+        before = conn.total_changes
+        conn.execute(
+            "INSERT OR IGNORE INTO price_history (card_id, price_usd, source, timestamp) "
+            "SELECT card_id, price_usd, source, timestamp FROM published.price_history "
+            "WHERE card_id IN (SELECT id FROM cards)"
+        )
+        copied = conn.total_changes - before
+        for table in ("price_buckets", "price_stats"):
+            if table in tables:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {table} SELECT * FROM published.{table} "
+                    "WHERE card_id IN (SELECT id FROM cards)"
+                )
+        refresh_card_prices(conn)
+        conn.commit()
+        return copied
+    finally:
+        conn.execute("DETACH DATABASE published")
+
+
+def import_price_files(paths: Sequence[str], db_path: Optional[str] = None) -> Dict:
+    """Import price files into the card database and publish the result.
+
+    Args:
+        paths: Price files to import
+        db_path: Card database; defaults to database_path()
+
+    Returns:
+        Counts of rows read, inserted, duplicate, invalid and for unknown
+        cards, the cards updated and the seconds taken
+    """
+    db_path = db_path or database.database_path()
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database not found at {db_path}")
+
+    start = time.perf_counter()
+    report = {"files": len(paths), "rows": 0, "inserted": 0, "duplicates": 0,
+              "invalid": 0, "unknown_cards": 0}
+    touched: Dict[str, str] = {}
+
+    build_path = database.prepare_build(db_path, copy_existing=True)
+    conn = database.connect_build(build_path)
+    try:
+        conn.executescript(PRICE_SCHEMA)
+        cards = _card_lookup(conn)
+        for path in paths:
+            default_timestamp = normalize_timestamp(os.path.getmtime(path))
+            source = os.path.splitext(os.path.basename(path))[0]
+            logger.info("Importing prices from %s", path)
+            append_snapshots(
+                conn, parse_snapshots(read_price_file(path), cards, source, default_timestamp, report),
+                touched, report
+            )
+        refresh_aggregates(conn, touched)
+        # The change log and the snapshot carry cards.price_usd
+        if touched:
+            record_changes(conn, db_path)
+            write_snapshot(conn)
+        database.finish_build(conn)
+    except Exception:
+        conn.close()
+        database.abandon_build(build_path)
+        raise
+    conn.close()
+    database.publish_build(build_path, db_path)
+
+    report["cards_updated"] = len(touched)
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def price_files(paths: Sequence[str]) -> List[str]:
+    """Price files named directly or found at the top level of directories."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith(PRICE_FILE_EXTENSIONS)
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    drop = price_drop_path()
+    files = price_files(sys.argv[1:] or [drop])
+    if not files:
+        print(f"No price files to import in {drop}")
+        return
+
+    report = import_price_files(files)
+    print(json.dumps(report, indent=2))
+
+    # Imported files from the drop directory are moved aside so the next
+    # run only picks up new ones
+    processed = os.path.join(drop, "processed")
+    for path in files:
+        if os.path.dirname(os.path.abspath(path)) == drop:
+            os.makedirs(processed, exist_ok=True)
+            shutil.move(path, os.path.join(processed, os.path.basename(path)))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import os
 from typing import List, Dict
 import logging
 import re
+from collections import Counter
 
 logger = logging.getLogger(__name__)
 
@@ -71,4 +72,128 @@ def parse_rulebook(file_path: str) -> List[Dict[str, str]]:
         
     except Exception as e:
         logger.error(f"Error parsing rulebook: {e}")
-        raise 
\ No newline at end of file
+        raise 
+
+# Running page headers in the extracted rulebook are prefixed with the page
+# number, e.g. "CONTENTS GLOSSARY 2810. Saboteur" is page 28 followed by the
+# heading "10. Saboteur".
+_PAGE_HEADER_PATTERN = re.compile(r'^CONTENTS GLOSSARY \d*\.?\s*')
+_SEE_ALSO_PATTERN = re.compile(r'\bSee (?=\d)')
+_RULE_REFERENCE_PATTERN = re.compile(r'^(\d+(?:\.\d+)*)\.\s*(?:for more on\s+)?(.*)$')
+_KEYWORD_HEADING_PATTERN = re.compile(r'^(?:\d+\.\s*)?([A-Z][A-Za-z\-]+)(?:\s+(?:X|\[Y\]))?$')
+
+
+def _read_rulebook_lines(file_path: str) -> List[str]:
+    """Read the cleaned rulebook and strip page-header noise from each line."""
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Rulebook not found at: {file_path}")
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f]
+
+    return [_PAGE_HEADER_PATTERN.sub('', line) for line in lines if line]
+
+
+def _is_heading(line: str) -> bool:
+    return any(c.isalpha() for c in line) and line == line.upper()
+
+
+def parse_glossary(file_path: str) -> List[Dict]:
+    """Parse the Index/Glossary at the end of the rulebook.
+
+    Each glossary entry is an upper-case term followed by a short summary that
+    ends with one or more "See <rule number>. <title>" references.
+
+    Args:
+        file_path: Path to the cleaned rulebook text file
+
+    Returns:
+        List of dictionaries with the term, its summary text and the rule
+        numbers and titles it refers to
+    """
+    lines = _read_rulebook_lines(file_path)
+
+    # The glossary starts at its chapter heading, after the table of contents
+    start = next(
+        (i for i, line in enumerate(lines)
+         if line.endswith("INDEX/GLOSSARY") and len(line) < 30),
+        None
+    )
+    if start is None:
+        logger.warning("No glossary found in rulebook")
+        return []
+
+    entries = []
+    current = None
+    for line in lines[start + 1:]:
+        if line in ("INDEX/GLOSSARY", "13. INDEX/GLOSSARY") or line.startswith("©"):
+            continue
+        if _is_heading(line) and len(line) < 60:
+            current = {"term": line.strip('"'), "text": []}
+            entries.append(current)
+        elif current:
+            current["text"].append(line)
+
+    glossary = []
+    for entry in entries:
+        text = " ".join(entry["text"])
+        references = []
+        # References follow the first "See", separated by "&" or "& See"
+        see_also = _SEE_ALSO_PATTERN.search(text)
+        if see_also:
+            for part in re.split(r'\s*&\s*(?:See\s+)?', text[see_also.end():]):
+                match = _RULE_REFERENCE_PATTERN.match(part.strip())
+                if match:
+                    references.append({
+                        "number": match.group(1),
+                        "title": match.group(2).strip().strip('"')
+                    })
+        glossary.append({
+            "term": entry["term"],
+            "text": text,
+            "references": references
+        })
+
+    logger.info(f"Successfully parsed {len(glossary)} glossary entries from rulebook")
+    return glossary
+
+
+def parse_keyword_rules(file_path: str, keywords: List[str]) -> Dict[str, str]:
+    """Extract the full rules passage for each keyword ability.
+
+    Keyword abilities are laid out as a heading line ("Sentinel", "Raid X",
+    "Smuggle [Y]") followed by lettered sub-rules, up to the next keyword
+    heading or section heading.
+
+    Args:
+        file_path: Path to the cleaned rulebook text file
+        keywords: Keyword names to look for
+
+    Returns:
+        Dictionary mapping each keyword found to its passage text
+    """
+    lines = _read_rulebook_lines(file_path)
+    wanted = {keyword.lower(): keyword for keyword in keywords}
+
+    # Chapter names repeat on every page; they are not section boundaries
+    running_headers = {
+        line for line, count in Counter(lines).items()
+        if count >= 3 and _is_heading(line)
+    }
+
+    passages = {}
+    current = None
+    for i, line in enumerate(lines):
+        match = _KEYWORD_HEADING_PATTERN.match(line)
+        next_line = lines[i + 1] if i + 1 < len(lines) else ""
+        if match and match.group(1).lower() in wanted and next_line.startswith("a."):
+            current = wanted[match.group(1).lower()]
+            passages[current] = [line]
+        elif current is None or line in running_headers:
+            continue
+        elif _is_heading(line):
+            current = None
+        else:
+            passages[current].append(line)
+
+    return {keyword: "\n".join(text) for keyword, text in passages.items()}
@@ -0,0 +1,184 @@
+# Card tables created by the ingest client and the synthetic catalog
+# generator, with the indices for the most common lookups.
+CARD_SCHEMA = '''
+    -- Main cards table with additional fields
+    CREATE TABLE IF NOT EXISTS cards (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        subtitle TEXT,
+        energy_cost INTEGER,
+        type TEXT NOT NULL,
+        type2 TEXT,
+        rarity TEXT,
+        text TEXT,
+        text_styled TEXT,
+        epic_action TEXT,
+        deploy_box TEXT,
+        attack INTEGER,
+        health INTEGER,
+        image_uri TEXT,
+        image_back_uri TEXT,
+        price_usd REAL,
+        set_name TEXT,
+        set_code TEXT,
+        card_number TEXT,
+        release_date TEXT,
+        last_updated TEXT,
+        is_unique BOOLEAN,
+        artist TEXT,
+        serial_code TEXT
+    );
+
+    -- Price history tracking for market analysis
+    CREATE TABLE IF NOT EXISTS price_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        card_id TEXT,
+        price_usd REAL,
+        source TEXT,
+        timestamp TEXT,
+        FOREIGN KEY(card_id) REFERENCES cards(id)
+    );
+
+    -- Card aspects (factions/alignments) with colors
+    CREATE TABLE IF NOT EXISTS card_aspects (
+        card_id TEXT,
+        aspect_name TEXT,
+        aspect_color TEXT,
+        FOREIGN KEY(card_id) REFERENCES cards(id),
+        PRIMARY KEY(card_id, aspect_name)
+    );
+
+    -- Keywords (game mechanics and abilities)
+    CREATE TABLE IF NOT EXISTS card_keywords (
+        card_id TEXT,
+        keyword TEXT,
+        FOREIGN KEY(card_id) REFERENCES cards(id),
+        PRIMARY KEY(card_id, keyword)
+    );
+
+    -- Traits (Force, Pilot, etc.)
+    CREATE TABLE IF NOT EXISTS card_traits (
+        card_id TEXT,
+        trait TEXT,
+        FOREIGN KEY(card_id) REFERENCES cards(id),
+        PRIMARY KEY(card_id, trait)
+    );
+
+    -- Arenas (Ground, Space, etc.)
+    CREATE TABLE IF NOT EXISTS card_arenas (
+        card_id TEXT,
+        arena TEXT,
+        FOREIGN KEY(card_id) REFERENCES cards(id),
+        PRIMARY KEY(card_id, arena)
+    );
+
+    -- Create indices for common queries
+    CREATE INDEX IF NOT EXISTS idx_card_name ON cards(name);
+    CREATE INDEX IF NOT EXISTS idx_card_type ON cards(type);
+    CREATE INDEX IF NOT EXISTS idx_card_set ON cards(set_name);
+    CREATE INDEX IF NOT EXISTS idx_card_cost ON cards(energy_cost);
+'''
+
+# Indexes that keep the card filters index-driven.
+#
+# The related tables are keyed (card_id, value), which serves hydration but
+# not "which cards have this value". The reversed (value, card_id) indexes
+# cover the semi-joins built by CardFilters.to_sql, and the composite cards
+# indexes serve the most common type/cost and set/rarity combinations.
+FILTER_INDEXES = '''
+    CREATE INDEX IF NOT EXISTS idx_card_aspects_name ON card_aspects(aspect_name, card_id);
+    CREATE INDEX IF NOT EXISTS idx_card_keywords_keyword ON card_keywords(keyword, card_id);
+    CREATE INDEX IF NOT EXISTS idx_card_traits_trait ON card_traits(trait, card_id);
+    CREATE INDEX IF NOT EXISTS idx_card_arenas_arena ON card_arenas(arena, card_id);
+    CREATE INDEX IF NOT EXISTS idx_card_type_cost ON cards(type, energy_cost);
+    CREATE INDEX IF NOT EXISTS idx_card_set_rarity ON cards(set_code, rarity);
+    CREATE INDEX IF NOT EXISTS idx_card_rarity ON cards(rarity);
+    CREATE INDEX IF NOT EXISTS idx_card_attack ON cards(attack);
+    CREATE INDEX IF NOT EXISTS idx_card_health ON cards(health);
+'''
+
+# Price history indexes and the tables derived from it (see
+# database/import_prices.py). Snapshots are unique per card, time and
+# source, so re-importing a file is a no-op, and the (card_id, timestamp)
+# prefix serves every per-card range scan. Charts read the day/week buckets
+# and the movers list reads the rolling aggregates, never the raw rows.
+PRICE_SCHEMA = '''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_price_history_card_time
+        ON price_history(card_id, timestamp, source);
+
+    CREATE TABLE IF NOT EXISTS price_buckets (
+        card_id TEXT,
+        period TEXT,
+        bucket_start TEXT,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        mean REAL,
+        samples INTEGER,
+        PRIMARY KEY(card_id, period, bucket_start)
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS price_stats (
+        card_id TEXT PRIMARY KEY,
+        last_price REAL,
+        last_timestamp TEXT,
+        change_1d REAL,
+        change_7d REAL,
+        change_30d REAL,
+        pct_1d REAL,
+        pct_7d REAL,
+        pct_30d REAL,
+        mean_7d REAL,
+        mean_30d REAL,
+        low_30d REAL,
+        high_30d REAL,
+        samples_30d INTEGER
+    );
+'''
+
+# Columnar snapshot of the catalog (see api/catalog_snapshot.py), written
+# into every build so it is published together with the cards it holds
+SNAPSHOT_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS catalog_snapshot (
+        format INTEGER PRIMARY KEY,
+        version TEXT NOT NULL,
+        created TEXT NOT NULL,
+        data BLOB NOT NULL
+    );
+'''
+
+# Catalog versions and the per-card change log (see api/catalog_changes.py).
+# card_digests fingerprints every card so the next build can tell which
+# cards it added, updated and removed.
+CHANGES_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS catalog_versions (
+        version INTEGER PRIMARY KEY,
+        created TEXT NOT NULL,
+        added INTEGER NOT NULL,
+        updated INTEGER NOT NULL,
+        removed INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS card_changes (
+        version INTEGER,
+        card_id TEXT,
+        change TEXT NOT NULL,
+        PRIMARY KEY(version, card_id)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS card_digests (
+        card_id TEXT PRIMARY KEY,
+        digest TEXT NOT NULL
+    ) WITHOUT ROWID;
+'''
+
+# Precomputed nearest neighbors of every card by embedding similarity (see
+# api/card_neighbors.py), so "similar cards" is one primary key range scan
+NEIGHBOR_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS card_neighbors (
+        card_id TEXT,
+        rank INTEGER,
+        neighbor_id TEXT,
+        score REAL,
+        PRIMARY KEY(card_id, rank)
+    ) WITHOUT ROWID;
+'''
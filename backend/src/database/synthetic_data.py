@@ -0,0 +1,392 @@
+"""Synthetic card catalogs for benchmarks and load tests.
+
+Generates catalogs of any size whose shape follows the real sets: the mix
+of card types and rarities, one or two aspects per card, a long tail of
+traits and keywords, costs clustered around 2-4 and stats that grow with
+cost. The same seed and size always produce the same catalog.
+
+Cards are produced in the shape returned by load_all_cards, and can be
+written to a database with the ingest schema or turned into records in the
+shape of the SWU admin API (see to_api_record).
+"""
+import os
+import math
+import random
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
+from .schema import CARD_SCHEMA, FILTER_INDEXES, PRICE_SCHEMA
+from ..api.catalog_changes import record_changes
+from ..api.catalog_snapshot import write_snapshot
+
+# Catalog sizes the benchmark suite runs at
+CATALOG_SIZES = (1000, 10000, 100000)
+
+# Released sets, in order; larger catalogs continue with made-up sets
+SETS: List[Tuple[str, str, str]] = [
+    ("SOR", "Spark of Rebellion", "2024-03-08"),
+    ("SHD", "Shadows of the Galaxy", "2024-07-12"),
+    ("TWI", "Twilight of the Republic", "2024-11-08"),
+    ("JTL", "Jump to Lightspeed", "2025-03-14"),
+    ("LOF", "Legends of the Force", "2025-07-11"),
+]
+CARDS_PER_SET = 260
+
+# Share of each card type in a set
+TYPE_WEIGHTS = {"Unit": 0.56, "Event": 0.19, "Upgrade": 0.13, "Leader": 0.07, "Base": 0.05}
+
+RARITY_WEIGHTS = {
+    "Common": 0.40, "Uncommon": 0.30, "Rare": 0.20, "Legendary": 0.06, "Special": 0.04,
+}
+# Leaders have their own rarity mix; bases are always Common
+LEADER_RARITY_WEIGHTS = {"Common": 0.25, "Rare": 0.60, "Legendary": 0.10, "Special": 0.05}
+
+ASPECT_COLORS = {
+    "Vigilance": "Blue", "Command": "Green", "Aggression": "Red",
+    "Cunning": "Yellow", "Heroism": "White", "Villainy": "Black",
+}
+PRIMARY_ASPECTS = ("Vigilance", "Command", "Aggression", "Cunning")
+ALIGNMENT_ASPECTS = ("Heroism", "Villainy")
+
+# Keywords with their share among keyworded cards; numbered keywords take 1-3
+KEYWORD_WEIGHTS = {
+    "Sentinel": 0.14, "Ambush": 0.11, "Overwhelm": 0.09, "Raid": 0.12, "Restore": 0.10,
+    "Saboteur": 0.08, "Shielded": 0.07, "Grit": 0.05, "Bounty": 0.06, "Smuggle": 0.06,
+    "Coordinate": 0.04, "Exploit": 0.03, "Piloting": 0.03, "Hidden": 0.02,
+}
+NUMBERED_KEYWORDS = ("Raid", "Restore", "Exploit")
+
+# Traits roughly follow a Zipf distribution: a few are on most cards
+UNIT_TRAITS = [
+    "Rebel", "Imperial", "Underworld", "Trooper", "Vehicle", "Fighter", "Force",
+    "Official", "Republic", "Separatist", "Bounty Hunter", "Jedi", "Sith", "Droid",
+    "Clone", "Capital Ship", "Transport", "Mandalorian", "Spectre", "Wookiee",
+    "Creature", "Twi'lek", "New Republic", "First Order", "Resistance", "Inquisitor",
+    "Gungan", "Night", "Speeder", "Walker",
+]
+UPGRADE_TRAITS = ["Item", "Weapon", "Armor", "Condition", "Modification", "Learned", "Innate"]
+EVENT_TRAITS = ["Tactic", "Trick", "Plan", "Disaster", "Learned", "Force", "Gambit"]
+
+# Units by cost; the curve peaks at 2-4 like the real sets
+UNIT_COST_WEIGHTS = [0.02, 0.08, 0.18, 0.20, 0.17, 0.14, 0.10, 0.06, 0.03, 0.02]
+SPACE_SHARE = 0.28
+
+NAME_FIRST = [
+    "Darth", "Captain", "General", "Admiral", "Commander", "Grand", "Agent", "Lieutenant",
+    "Sergeant", "Moff", "Master", "Chancellor", "Governor", "Count", "Director", "Colonel",
+]
+NAME_LAST = [
+    "Vader", "Solo", "Skywalker", "Organa", "Tarkin", "Thrawn", "Rex", "Syndulla", "Wren",
+    "Bridger", "Kenobi", "Maul", "Fett", "Krennic", "Andor", "Erso", "Tano", "Dooku",
+    "Grievous", "Windu", "Vos", "Ventress", "Pryce", "Konstantine", "Calrissian", "Ackbar",
+]
+UNIT_NOUNS = [
+    "Marine", "Guard", "Pilot", "Trooper", "Interceptor", "Frigate", "Cruiser", "Speeder",
+    "Walker", "Scout", "Commando", "Sniper", "Gunship", "Destroyer", "Smuggler", "Assassin",
+]
+UNIT_ADJECTIVES = [
+    "Battlefield", "Vigilant", "Elite", "Veteran", "Rogue", "Imperial", "Rebel", "Hired",
+    "Covert", "Reinforced", "Outer Rim", "Shadow", "Crimson", "Alliance", "Clone", "Mining",
+]
+EVENT_NAMES = [
+    "Strike", "Ambush", "Escape", "Rally", "Sabotage", "Bombardment", "Diversion",
+    "Gambit", "Uprising", "Reprisal", "Barrage", "Surprise", "Maneuver", "Ultimatum",
+]
+BASE_NAMES = [
+    "Base", "Outpost", "Station", "Fortress", "Tower", "Hangar", "Palace", "Citadel",
+]
+PLACES = [
+    "Echo", "Tarkintown", "Jedha", "Dagobah", "Lothal", "Kestro", "Coruscant", "Mustafar",
+    "Kashyyyk", "Mos Eisley", "Nevarro", "Chopper", "Administrator's", "Capital",
+]
+SUBTITLES = [
+    "Dark Lord of the Sith", "Faithful Friend", "Rebel Leader", "Heroic Pilot",
+    "Agent of the Empire", "Disintegrator", "Scourge of the Rim", "Hero of Yavin",
+    "Galactic Hero", "Master Tactician", "Stay on Target", "Daring Smuggler",
+]
+ARTISTS = [
+    "Borja Pindado", "Alexandr Elichev", "Tony Foti", "Mike Capprotti", "Jake Murray",
+    "Ario Murti", "Sara Betsy", "Helge C. Balzer", "Nicholas Gregory", "Tiffany Turrill",
+]
+ABILITIES = [
+    "When Played: Deal {n} damage to a unit.",
+    "On Attack: You may exhaust an enemy unit with {n} or less power.",
+    "When Defeated: Draw a card.",
+    "Each other friendly {trait} unit gets +{n}/+0.",
+    "Action [Exhaust]: Give a Shield token to a friendly unit.",
+    "While you control another {trait} unit, this unit gets +{n}/+{n}.",
+    "When Played: Heal {n} damage from a base.",
+    "When Played: Search the top {n} cards of your deck for a {trait} card and draw it.",
+    "This unit can't attack bases.",
+    "Attached unit gets +{n}/+{n}.",
+]
+PRICE_MEDIANS = {"Common": 0.1, "Uncommon": 0.25, "Rare": 1.5, "Legendary": 6.0, "Special": 3.0}
+
+
+def _pick(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _zipf_sample(rng: random.Random, values: Sequence[str], count: int) -> List[str]:
+    """count distinct values, favouring those early in the list."""
+    weights = [1 / (rank + 1) for rank in range(len(values))]
+    picked: List[str] = []
+    while len(picked) < count:
+        value = rng.choices(values, weights=weights)[0]
+        if value not in picked:
+            picked.append(value)
+    return picked
+
+
+def _set_for(position: int) -> Tuple[str, str, str]:
+    index = position // CARDS_PER_SET
+    if index < len(SETS):
+        return SETS[index]
+    year = 2025 + (index - len(SETS) + 2) // 3
+    month = 1 + 4 * ((index - len(SETS) + 2) % 3)
+    return (f"X{index + 1:02d}", f"Synthetic Set {index + 1}", f"{year}-{month:02d}-01")
+
+
+def _aspects(rng: random.Random, card_type: str) -> List[str]:
+    if card_type == "Leader":
+        return [rng.choice(PRIMARY_ASPECTS), rng.choice(ALIGNMENT_ASPECTS)]
+    if card_type == "Base":
+        return [rng.choice(PRIMARY_ASPECTS)] if rng.random() < 0.9 else []
+    roll = rng.random()
+    if roll < 0.45:
+        return [rng.choice(PRIMARY_ASPECTS), rng.choice(ALIGNMENT_ASPECTS)]
+    if roll < 0.80:
+        return [rng.choice(PRIMARY_ASPECTS)]
+    if roll < 0.94:
+        return [rng.choice(ALIGNMENT_ASPECTS)]
+    return []
+
+
+def _keywords(rng: random.Random, card_type: str) -> List[str]:
+    chance = {"Unit": 0.55, "Leader": 0.35, "Upgrade": 0.25}.get(card_type, 0.0)
+    if rng.random() >= chance:
+        return []
+    count = 1 if rng.random() < 0.8 else 2
+    keywords = set()
+    while len(keywords) < count:
+        keywords.add(_pick(rng, KEYWORD_WEIGHTS))
+    return [
+        f"{keyword} {rng.randint(1, 3)}" if keyword in NUMBERED_KEYWORDS else keyword
+        for keyword in sorted(keywords)
+    ]
+
+
+def _traits(rng: random.Random, card_type: str) -> List[str]:
+    if card_type in ("Unit", "Leader"):
+        return _zipf_sample(rng, UNIT_TRAITS, rng.choices([1, 2, 3], weights=[0.3, 0.5, 0.2])[0])
+    if card_type == "Upgrade":
+        return _zipf_sample(rng, UPGRADE_TRAITS, rng.choices([1, 2], weights=[0.8, 0.2])[0])
+    if card_type == "Event":
+        return _zipf_sample(rng, EVENT_TRAITS, 1) if rng.random() < 0.6 else []
+    return []
+
+
+def _name(rng: random.Random, card_type: str, unique: bool) -> str:
+    if card_type == "Base":
+        return f"{rng.choice(PLACES)} {rng.choice(BASE_NAMES)}"
+    if card_type == "Event":
+        return f"{rng.choice(UNIT_ADJECTIVES)} {rng.choice(EVENT_NAMES)}"
+    if unique:
+        return f"{rng.choice(NAME_FIRST)} {rng.choice(NAME_LAST)}"
+    return f"{rng.choice(UNIT_ADJECTIVES)} {rng.choice(UNIT_NOUNS)}"
+
+
+def _text(rng: random.Random, traits: List[str], keywords: List[str]) -> str:
+    trait = traits[0] if traits else rng.choice(UNIT_TRAITS)
+    abilities = [
+        rng.choice(ABILITIES).format(n=rng.randint(1, 4), trait=trait)
+        for _ in range(rng.choices([0, 1, 2, 3], weights=[0.1, 0.5, 0.3, 0.1])[0])
+    ]
+    return " ".join(keywords + abilities) or None
+
+
+def _stats(rng: random.Random, card_type: str) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """(energy_cost, attack, health) for a card type."""
+    if card_type == "Unit":
+        cost = rng.choices(range(len(UNIT_COST_WEIGHTS)), weights=UNIT_COST_WEIGHTS)[0]
+        attack = max(0, cost + rng.randint(-2, 1))
+        health = max(1, cost + rng.randint(-1, 2))
+        return cost, attack, health
+    if card_type == "Leader":
+        return rng.randint(4, 7), rng.randint(2, 5), rng.randint(5, 8)
+    if card_type == "Base":
+        return None, None, rng.choice([25, 26, 27, 28, 30])
+    if card_type == "Upgrade":
+        return rng.randint(1, 5), rng.randint(0, 3), rng.randint(0, 3)
+    return rng.choices(range(9), weights=[4, 10, 14, 12, 8, 5, 3, 2, 1])[0], None, None
+
+
+def generate_cards(count: int, seed: int = 7) -> List[Dict]:
+    """Generate a catalog of count cards.
+
+    Args:
+        count: Number of cards
+        seed: Random seed; the same seed and count give the same catalog
+
+    Returns:
+        Cards with every cards column plus aspects, keywords, traits and
+        arenas, ordered by id
+    """
+    rng = random.Random(seed)
+    cards: List[Dict] = []
+    for position in range(count):
+        card_id = str(position + 1)
+        set_code, set_name, release_date = _set_for(position)
+        card_type = _pick(rng, TYPE_WEIGHTS)
+        if card_type == "Leader":
+            rarity = _pick(rng, LEADER_RARITY_WEIGHTS)
+        elif card_type == "Base":
+            rarity = "Common"
+        else:
+            rarity = _pick(rng, RARITY_WEIGHTS)
+        unique = card_type == "Leader" or (card_type == "Unit" and rng.random() < 0.3)
+
+        aspects = sorted(_aspects(rng, card_type))
+        keywords = sorted(_keywords(rng, card_type))
+        traits = sorted(_traits(rng, card_type))
+        cost, attack, health = _stats(rng, card_type)
+        if card_type == "Unit":
+            arenas = ["Space" if rng.random() < SPACE_SHARE else "Ground"]
+        elif card_type == "Leader":
+            arenas = ["Ground"]
+        else:
+            arenas = []
+        text = _text(rng, traits, keywords)
+        price = round(PRICE_MEDIANS[rarity] * math.exp(rng.gauss(0, 0.8)), 2)
+
+        cards.append({
+            "id": card_id,
+            "name": _name(rng, card_type, unique),
+            "subtitle": rng.choice(SUBTITLES) if unique or card_type == "Base" else None,
+            "energy_cost": cost,
+            "type": card_type,
+            "type2": None,
+            "rarity": rarity,
+            "text": text,
+            "text_styled": f"<p>{text}</p>" if text else None,
+            "epic_action": "Epic Action: If you control 6 or more resources, deploy this leader."
+            if card_type == "Leader" else None,
+            "deploy_box": "On Attack: Deal 1 damage to a unit." if card_type == "Leader" else None,
+            "attack": attack,
+            "health": health,
+            "image_uri": f"https://cdn.starwarsunlimited.com/{set_code}_{card_id}_front.png",
+            "image_back_uri": f"https://cdn.starwarsunlimited.com/{set_code}_{card_id}_back.png"
+            if card_type == "Leader" else None,
+            "price_usd": price,
+            "set_name": set_name,
+            "set_code": set_code,
+            "card_number": str(position % CARDS_PER_SET + 1),
+            "release_date": release_date,
+            "last_updated": "2025-01-01T00:00:00",
+            "is_unique": int(unique),
+            "artist": rng.choice(ARTISTS),
+            "serial_code": None,
+            "aspects": [
+                {"aspect_name": aspect, "aspect_color": ASPECT_COLORS[aspect]} for aspect in aspects
+            ],
+            "keywords": keywords,
+            "traits": traits,
+            "arenas": arenas,
+        })
+    return cards
+
+
+def _relation(values: List[str], **extra) -> Dict:
+    return {"data": [
+        {"id": i + 1, "attributes": {"name": value, **extra.get(value, {})}}
+        for i, value in enumerate(values)
+    ]}
+
+
+def _media(url: Optional[str]) -> Dict:
+    if url is None:
+        return {"data": None}
+    return {"data": {"attributes": {"url": url, "formats": {"card": {"url": url}}}}}
+
+
+def to_api_record(card: Dict) -> Dict:
+    """A generated card in the shape of an SWU admin API card-list entry.
+
+    The result is what SWUApiClient.process_card_data expects, so ingest
+    can be exercised without the real API.
+    """
+    aspects = [aspect["aspect_name"] for aspect in card["aspects"]]
+    return {
+        "id": int(card["id"]),
+        "attributes": {
+            "title": card["name"],
+            "subtitle": card["subtitle"],
+            "cost": card["energy_cost"],
+            "power": card["attack"],
+            "hp": card["health"],
+            "text": card["text"],
+            "epicAction": card["epic_action"],
+            "deployBox": card["deploy_box"],
+            "cardNumber": int(card["card_number"]),
+            "serialCode": card["serial_code"],
+            "unique": bool(card["is_unique"]),
+            "artist": card["artist"],
+            "type": {"data": {"id": 1, "attributes": {"name": card["type"]}}},
+            "rarity": {"data": {"attributes": {"name": card["rarity"]}}},
+            "expansion": {"data": {"attributes": {"name": card["set_name"], "code": card["set_code"]}}},
+            "artFront": _media(card["image_uri"]),
+            "artBack": _media(card["image_back_uri"]),
+            "aspects": _relation(
+                aspects, **{aspect: {"color": ASPECT_COLORS[aspect]} for aspect in aspects}
+            ),
+            "keywords": _relation(card["keywords"]),
+            "traits": _relation(card["traits"]),
+            "arenas": _relation(card["arenas"]),
+        },
+    }
+
+
+def write_catalog(conn: sqlite3.Connection, cards: List[Dict]) -> None:
+    """Insert generated cards and their related rows into the card tables."""
+    columns = [column for column in cards[0] if column not in ("aspects", "keywords", "traits", "arenas")]
+    conn.executemany(
+        f"INSERT INTO cards ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+        ([card[column] for column in columns] for card in cards)
+    )
+    conn.executemany(
+        "INSERT INTO card_aspects (card_id, aspect_name, aspect_color) VALUES (?, ?, ?)",
+        ((card["id"], a["aspect_name"], a["aspect_color"]) for card in cards for a in card["aspects"])
+    )
+    for table, column, field in (
+        ("card_keywords", "keyword", "keywords"),
+        ("card_traits", "trait", "traits"),
+        ("card_arenas", "arena", "arenas"),
+    ):
+        conn.executemany(
+            f"INSERT INTO {table} (card_id, {column}) VALUES (?, ?)",
+            ((card["id"], value) for card in cards for value in card[field])
+        )
+    conn.commit()
+
+
+def build_catalog(db_path: str, count: int, seed: int = 7) -> List[Dict]:
+    """Create a fresh database at db_path holding a generated catalog.
+
+    Any existing file at db_path is replaced.
+
+    Returns:
+        The generated cards
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    cards = generate_cards(count, seed)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(CARD_SCHEMA)
+        conn.executescript(FILTER_INDEXES)
+        conn.executescript(PRICE_SCHEMA)
+        write_catalog(conn, cards)
+        record_changes(conn)
+        write_snapshot(conn)
+    finally:
+        conn.close()
+    return cards
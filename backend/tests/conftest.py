@@ -0,0 +1,196 @@
+import os
+import sys
+import sqlite3
+import pytest
+
+# Make the backend "src" package importable when running pytest from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.schema import FILTER_INDEXES, PRICE_SCHEMA  # noqa: E402
+
+SCHEMA = '''
+    CREATE TABLE cards (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        subtitle TEXT,
+        energy_cost INTEGER,
+        type TEXT NOT NULL,
+        type2 TEXT,
+        rarity TEXT,
+        text TEXT,
+        text_styled TEXT,
+        epic_action TEXT,
+        deploy_box TEXT,
+        attack INTEGER,
+        health INTEGER,
+        image_uri TEXT,
+        image_back_uri TEXT,
+        price_usd REAL,
+        set_name TEXT,
+        set_code TEXT,
+        card_number TEXT,
+        release_date TEXT,
+        last_updated TEXT,
+        is_unique BOOLEAN,
+        artist TEXT,
+        serial_code TEXT
+    );
+    CREATE TABLE price_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        card_id TEXT,
+        price_usd REAL,
+        source TEXT,
+        timestamp TEXT
+    );
+    CREATE TABLE card_aspects (
+        card_id TEXT,
+        aspect_name TEXT,
+        aspect_color TEXT,
+        PRIMARY KEY(card_id, aspect_name)
+    );
+    CREATE TABLE card_keywords (
+        card_id TEXT,
+        keyword TEXT,
+        PRIMARY KEY(card_id, keyword)
+    );
+    CREATE TABLE card_traits (
+        card_id TEXT,
+        trait TEXT,
+        PRIMARY KEY(card_id, trait)
+    );
+    CREATE TABLE card_arenas (
+        card_id TEXT,
+        arena TEXT,
+        PRIMARY KEY(card_id, arena)
+    );
+'''
+
+# (id, name, subtitle, cost, type, rarity, attack, health, set_code, unique)
+CARDS = [
+    ("1", "Darth Vader", "Dark Lord of the Sith", 7, "Leader", "Rare", 5, 8, "SOR", 1),
+    ("2", "Luke Skywalker", "Faithful Friend", 6, "Leader", "Rare", 4, 7, "SOR", 1),
+    ("3", "Echo Base", "Defend the Shield Generator", None, "Base", "Common", None, 30, "SOR", 0),
+    ("4", "Administrator's Tower", None, None, "Base", "Common", None, 28, "SOR", 0),
+    ("5", "Battlefield Marine", None, 2, "Unit", "Common", 3, 3, "SOR", 0),
+    ("6", "Vigilant Honor Guards", None, 4, "Unit", "Common", 4, 4, "SOR", 0),
+    ("7", "TIE/ln Fighter", None, 1, "Unit", "Common", 2, 1, "SOR", 0),
+    ("8", "Wing Leader", None, 2, "Unit", "Uncommon", 2, 2, "SOR", 0),
+    ("9", "Boba Fett", "Disintegrator", 5, "Unit", "Legendary", 5, 5, "SHD", 1),
+    ("10", "Force Choke", None, 2, "Event", "Uncommon", None, None, "SOR", 0),
+    ("11", "Academy Training", None, 2, "Upgrade", "Common", 2, 2, "SOR", 0),
+    ("12", "Bounty Hunter Crew", None, 5, "Unit", "Uncommon", 3, 5, "SHD", 0),
+]
+
+ASPECTS = [
+    ("1", "Aggression"), ("1", "Villainy"),
+    ("2", "Vigilance"), ("2", "Heroism"),
+    ("3", "Vigilance"),
+    ("4", "Villainy"),
+    ("5", "Command"), ("5", "Heroism"),
+    ("6", "Vigilance"),
+    ("7", "Villainy"),
+    ("8", "Command"), ("8", "Heroism"),
+    ("9", "Cunning"), ("9", "Villainy"),
+    ("10", "Aggression"), ("10", "Villainy"),
+    ("11", "Command"),
+    ("12", "Cunning"),
+]
+
+KEYWORDS = [
+    ("6", "Sentinel"),
+    ("8", "Overwhelm"),
+    ("9", "Bounty"),
+    ("9", "Raid 2"),
+    ("12", "Smuggle"),
+]
+
+TRAITS = [
+    ("1", "Force"), ("1", "Imperial"), ("1", "Sith"),
+    ("2", "Force"), ("2", "Rebel"), ("2", "Jedi"),
+    ("5", "Rebel"), ("5", "Trooper"),
+    ("6", "Rebel"), ("6", "Trooper"),
+    ("7", "Imperial"), ("7", "Vehicle"), ("7", "Fighter"),
+    ("8", "Rebel"), ("8", "Vehicle"), ("8", "Fighter"),
+    ("9", "Underworld"), ("9", "Bounty Hunter"),
+    ("10", "Force"),
+    ("11", "Learned"),
+    ("12", "Underworld"), ("12", "Bounty Hunter"),
+]
+
+ARENAS = [
+    ("1", "Ground"), ("2", "Ground"),
+    ("5", "Ground"), ("6", "Ground"),
+    ("7", "Space"), ("8", "Space"),
+    ("9", "Ground"), ("12", "Ground"),
+]
+
+
+def load_sample_cards(conn: sqlite3.Connection) -> None:
+    """Create the card schema and fill it with a small, varied catalog."""
+    conn.executescript(SCHEMA)
+    conn.executescript(FILTER_INDEXES)
+    conn.executescript(PRICE_SCHEMA)
+    conn.executemany(
+        "INSERT INTO cards (id, name, subtitle, energy_cost, type, rarity, attack, health, "
+        "set_code, is_unique, set_name, text, image_uri) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            card + ("Spark of Rebellion" if card[8] == "SOR" else "Shadows of the Galaxy",
+                    f"Rules text for {card[1]}.",
+                    f"https://example.com/{card[0]}.png")
+            for card in CARDS
+        ]
+    )
+    conn.executemany(
+        "INSERT INTO card_aspects (card_id, aspect_name, aspect_color) VALUES (?, ?, ?)",
+        [(card_id, aspect, None) for card_id, aspect in ASPECTS]
+    )
+    conn.executemany("INSERT INTO card_keywords (card_id, keyword) VALUES (?, ?)", KEYWORDS)
+    conn.executemany("INSERT INTO card_traits (card_id, trait) VALUES (?, ?)", TRAITS)
+    conn.executemany("INSERT INTO card_arenas (card_id, arena) VALUES (?, ?)", ARENAS)
+    conn.commit()
+
+
+@pytest.fixture
+def card_db():
+    """In-memory card database with a small sample catalog."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    load_sample_cards(conn)
+    yield conn
+    conn.close()
+
+
+# Module globals main.py caches its indexes and serving state in
+API_STATE = (
+    "rules_index", "card_index", "catalog_version", "deck_analyzer", "deck_validator",
+    "image_cache", "catalog_snapshot", "catalog_refresher", "retired_path",
+)
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """main.py serving the sample catalog from a database file of its own."""
+    # VectorDB is created at import time and only checks that a key is set
+    monkeypatch.setenv("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY") or "test")
+    monkeypatch.setenv("SWU_RELOAD_CHECK_SECONDS", "0")
+    from src.api import main
+
+    path = str(tmp_path / "swu_cards.db")
+    conn = sqlite3.connect(path)
+    load_sample_cards(conn)
+    conn.close()
+    monkeypatch.setattr(main, "DB_PATH", path)
+    monkeypatch.setattr(main, "serving_path", path)
+    for name in API_STATE:
+        monkeypatch.setattr(main, name, None)
+    return main
+
+
+@pytest.fixture
+def api_client(api):
+    """TestClient for the API, with its startup and shutdown hooks run."""
+    from fastapi.testclient import TestClient
+
+    with TestClient(api.app) as client:
+        yield client
@@ -0,0 +1,55 @@
+import orjson
+
+
+def test_unknown_leader_or_base_is_rejected(api_client):
+    assert api_client.get("/api/cards?leader=1&base=4").json()["total"] == 4
+    for path in ("/api/cards", "/api/cards/facets", "/api/cards/stream"):
+        response = api_client.get(f"{path}?leader=1&base=missing")
+        assert response.status_code == 422, path
+        assert response.json()["detail"] == "Unknown base card ID: missing"
+    assert api_client.get("/api/cards?leader=nope").status_code == 422
+
+
+def test_bulk_validation(api, api_client, monkeypatch):
+    deck = b'{"leader": "1", "base": "4", "cards": [{"id": "7", "count": 3}]}'
+    response = api_client.post("/api/decks/validate/bulk?format=limited", content=deck + b"\n\nnot json\n" + deck)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert lines[1]["errors"][0]["code"] == "INVALID_JSON"
+
+    monkeypatch.setattr(api, "MAX_DECKS_PER_REQUEST", 2)
+    assert api_client.post("/api/decks/validate/bulk", content=b"\n".join([deck] * 3)).status_code == 413
+    monkeypatch.setattr(api, "MAX_BULK_BODY_BYTES", 100)
+    assert api_client.post("/api/decks/validate/bulk", content=deck + b"\n" + deck).status_code == 413
+
+
+def test_admin_endpoints_need_a_token(api_client, monkeypatch):
+    monkeypatch.delenv("SWU_ADMIN_TOKEN", raising=False)
+    assert api_client.get("/api/admin/sql/top").status_code == 403
+    assert api_client.post("/api/admin/catalog/sync").status_code == 403
+
+    monkeypatch.setenv("SWU_ADMIN_TOKEN", "secret")
+    assert api_client.get("/api/admin/sql/slow").status_code == 403
+    assert api_client.get("/api/admin/sql/slow", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = api_client.get("/api/admin/sql/slow", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200 and "queries" in response.json()
+
+
+def test_stream_matches_card_list(api_client):
+    for query in ("", "type=Unit&cost_max=4", "aspect=Villainy&sort=-cost", "search=fett"):
+        total = api_client.get(f"/api/cards?limit=100&{query}").json()["total"]
+        response = api_client.get(f"/api/cards/stream?{query}")
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert len(response.content.splitlines()) == total, query
+
+    response = api_client.get("/api/cards/stream?type=Leader&fields=id,name&sort=name")
+    cards = [orjson.loads(line) for line in response.content.splitlines()]
+    assert cards == [{"id": "1", "name": "Darth Vader"}, {"id": "2", "name": "Luke Skywalker"}]
+
+
+def test_fuzzy_search_streams_the_index_matches(api_client):
+    query = "search=darth%20vadr&fuzzy=true&sort=name&fields=id,name"
+    cards = api_client.get(f"/api/cards?limit=100&{query}").json()["cards"]
+    streamed = [orjson.loads(line) for line in api_client.get(f"/api/cards/stream?{query}").content.splitlines()]
+    assert streamed == cards and cards[0]["name"] == "Darth Vader"
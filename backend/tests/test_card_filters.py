@@ -0,0 +1,68 @@
+import pytest
+from src.api.card_filters import CardFilters, card_filters
+from src.api.card_index import CardIndex
+from src.api.card_queries import query_cards
+
+FILTER_COMBINATIONS = [
+    CardFilters(aspect=["Villainy", "Aggression"]),
+    CardFilters(aspect=["Villainy", "Aggression"], aspect_mode="all"),
+    CardFilters(type=["Unit"], ranges={"cost": (2, 4)}),
+    CardFilters(set=["SOR"], rarity=["Common", "Uncommon"]),
+    CardFilters(keyword=["Sentinel", "Overwhelm"], trait=["Rebel"], arena=["Ground"]),
+    CardFilters(ranges={"attack": (3, None), "health": (None, 5)}),
+    CardFilters(unique=True, type=["Unit", "Leader"]),
+    CardFilters(leader="1", base="4", type=["Unit", "Event"]),
+    CardFilters(cost=[1, 2], arena=["Space"]),
+]
+
+
+@pytest.mark.parametrize("filters", FILTER_COMBINATIONS)
+def test_filters_are_index_driven(card_db, filters):
+    where, params = filters.to_sql()
+    plan = [
+        row[3] for row in card_db.execute(
+            f"EXPLAIN QUERY PLAN SELECT c.* FROM cards c{where} ORDER BY c.name, c.id", params
+        )
+    ]
+    scans = [step for step in plan if step.startswith("SCAN")]
+    assert not scans, plan
+    assert any("INDEX" in step for step in plan), plan
+
+
+@pytest.mark.parametrize("filters", FILTER_COMBINATIONS + [
+    CardFilters(),
+    CardFilters(search="fighter"),
+    CardFilters(aspect=["Villainy", "Nonexistent"], aspect_mode="all"),
+])
+@pytest.mark.parametrize("sort", ["name", "-name", "cost", "-attack"])
+def test_index_matches_sql(card_db, filters, sort):
+    index = CardIndex.build(card_db)
+    total, cards = index.query(filters, sort, offset=0, limit=100)
+    sql_total, sql_cards = query_cards(card_db, filters, sort, offset=0, limit=100)
+    assert total == sql_total
+    assert [card["id"] for card in cards] == [card["id"] for card in sql_cards]
+
+
+def test_leader_base_compatibility(card_db):
+    # Darth Vader (Aggression, Villainy) with Administrator's Tower (Villainy)
+    total, cards = CardIndex.build(card_db).query(CardFilters(leader="1", base="4"))
+    assert {card["name"] for card in cards} == {
+        "Darth Vader", "Administrator's Tower", "TIE/ln Fighter", "Force Choke"
+    }
+
+
+def test_card_filters_dependency_builds_ranges():
+    filters = card_filters(
+        search="", aspect=["Villainy"], aspect_mode="any", type=None, set=None,
+        rarity=None, cost=None, keyword=None, trait=None, arena=None,
+        cost_min=2, cost_max=None, attack_min=None, attack_max=4,
+        health_min=None, health_max=None, unique=None, leader=None, base=None
+    )
+    assert filters.aspect == ["Villainy"] and filters.type == []
+    assert filters.search is None
+    assert filters.ranges == {"cost": (2, None), "attack": (None, 4)}
+
+
+def test_compatibility_with_unknown_card(card_db):
+    with pytest.raises(ValueError):
+        CardIndex.build(card_db).compatible_mask(["1", "missing"])
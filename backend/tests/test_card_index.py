@@ -0,0 +1,76 @@
+import pytest
+from src.api.card_filters import CardFilters
+from src.api.card_index import CardIndex
+
+
+@pytest.fixture
+def card_index(card_db):
+    return CardIndex.build(card_db)
+
+
+def counts(result, facet):
+    return {entry["value"]: entry["count"] for entry in result["facets"][facet]}
+
+
+def test_unfiltered_facet_counts(card_index):
+    result = card_index.facet_counts(CardFilters())
+    assert result["total"] == 12
+    assert counts(result, "type") == {"Base": 2, "Event": 1, "Leader": 2, "Unit": 6, "Upgrade": 1}
+    assert counts(result, "aspect")["Villainy"] == 5
+    assert counts(result, "set") == {"SHD": 2, "SOR": 10}
+    assert counts(result, "keyword")["Sentinel"] == 1
+
+
+def test_filters_and_across_facets_or_within(card_index):
+    result = card_index.facet_counts(CardFilters(aspect=["Villainy"], type=["Unit", "Leader"]))
+    assert result["total"] == 3
+    # Other facets are narrowed by every selection
+    assert counts(result, "arena") == {"Ground": 2, "Space": 1}
+
+
+def test_facet_ignores_its_own_selection(card_index):
+    result = card_index.facet_counts(CardFilters(type=["Unit"]))
+    assert counts(result, "type")["Leader"] == 2
+    assert counts(result, "aspect")["Villainy"] == 2
+
+
+def test_numeric_facet_and_search(card_index):
+    result = card_index.facet_counts(CardFilters(cost=[2], search="marine"))
+    assert result["total"] == 1
+    assert counts(result, "cost")[5] == 0
+
+
+def test_unknown_value_matches_nothing(card_index):
+    assert card_index.facet_counts(CardFilters(trait=["Droid"]))["total"] == 0
+
+
+def test_query_pages_in_name_order(card_index):
+    total, cards = card_index.query(CardFilters(), limit=3)
+    assert total == 12
+    assert [card["name"] for card in cards] == [
+        "Academy Training", "Administrator's Tower", "Battlefield Marine"
+    ]
+    _, cards = card_index.query(CardFilters(), offset=10, limit=5)
+    assert [card["name"] for card in cards] == ["Vigilant Honor Guards", "Wing Leader"]
+
+
+def test_query_filters_match_facet_total(card_index):
+    filters = CardFilters(aspect=["Villainy"], type=["Unit", "Leader"])
+    total, cards = card_index.query(filters)
+    assert total == card_index.facet_counts(filters)["total"] == 3
+    assert {card["id"] for card in cards} == {"1", "7", "9"}
+    assert cards[0]["aspects"] and "traits" in cards[0]
+
+
+def test_query_sorts_by_stat_with_missing_values_last(card_index):
+    _, cards = card_index.query(CardFilters(), sort="cost")
+    costs = [card["energy_cost"] for card in cards]
+    assert costs[:2] == [1, 2] and costs[-2:] == [None, None]
+    # Ties are broken by name
+    assert [card["name"] for card in cards[1:5]] == [
+        "Academy Training", "Battlefield Marine", "Force Choke", "Wing Leader"
+    ]
+
+    _, cards = card_index.query(CardFilters(), sort="-cost")
+    costs = [card["energy_cost"] for card in cards]
+    assert costs[0] == 7 and costs[-1] is None
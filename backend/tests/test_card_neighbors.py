@@ -0,0 +1,76 @@
+import sqlite3
+import numpy as np
+from src.api.card_neighbors import (
+    carry_over_neighbors, similar_cards, top_k_neighbors, write_neighbors
+)
+from src.api.card_queries import load_all_cards
+
+
+def test_top_k_matches_brute_force():
+    vectors = np.random.default_rng(3).standard_normal((300, 16))
+    indexes, scores = top_k_neighbors(vectors, k=5, block_size=64)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    similarity = normalized @ normalized.T
+    np.fill_diagonal(similarity, -np.inf)
+    expected = np.argsort(-similarity, axis=1)[:, :5]
+    assert (indexes == expected).all()
+    assert np.allclose(scores, np.take_along_axis(similarity, expected, axis=1), atol=1e-5)
+    assert (np.diff(scores, axis=1) <= 0).all()
+
+
+def test_top_k_is_capped_by_catalog_size():
+    indexes, _ = top_k_neighbors(np.eye(3), k=10)
+    assert indexes.shape == (3, 2)
+
+
+def _neighbor_db(card_db):
+    # Cards 1 and 10 point the same way, 2 and 5 close to each other
+    ids = [card["id"] for card in load_all_cards(card_db)]
+    vectors = np.random.default_rng(5).standard_normal((len(ids), 8))
+    vectors[ids.index("10")] = vectors[ids.index("1")] * 2
+    vectors[ids.index("5")] = vectors[ids.index("2")] + 0.01
+    write_neighbors(card_db, ids, vectors, k=len(ids) - 1)
+    return ids
+
+
+def test_similar_cards_is_one_lookup(card_db):
+    _neighbor_db(card_db)
+    statements = []
+    card_db.set_trace_callback(statements.append)
+    cards = similar_cards(card_db, "1", limit=3)
+    card_db.set_trace_callback(None)
+
+    assert cards[0]["id"] == "10" and cards[0]["score"] > 0.999
+    assert len(cards) == 3 and "aspects" in cards[0]
+    # Table check, the neighbor lookup, then hydration of the related tables
+    assert len(statements) == 2 + 4
+
+
+def test_similar_cards_filters_neighbors(card_db):
+    _neighbor_db(card_db)
+    units = similar_cards(card_db, "2", limit=20, types=["Unit"])
+    assert units[0]["id"] == "5" and {card["type"] for card in units} == {"Unit"}
+    heroic = similar_cards(card_db, "2", limit=20, aspects=["Heroism"])
+    assert all(any(a["aspect_name"] == "Heroism" for a in card["aspects"]) for card in heroic)
+    assert len(heroic) < len(similar_cards(card_db, "2", limit=20))
+
+
+def test_neighbors_survive_a_catalog_rebuild(card_db, tmp_path):
+    _neighbor_db(card_db)
+    published = str(tmp_path / "published.db")
+    card_db.commit()
+    card_db.execute("VACUUM INTO ?", (published,))
+
+    rebuilt = sqlite3.connect(":memory:")
+    rebuilt.executescript(
+        "CREATE TABLE cards (id TEXT PRIMARY KEY);"
+        "INSERT INTO cards VALUES ('1'), ('10'), ('2');"
+    )
+    write_neighbors(rebuilt, [], np.zeros((0, 8)))
+    assert carry_over_neighbors(rebuilt, published) == 6
+    rebuilt.close()
+
+
+def test_missing_neighbor_table(card_db):
+    assert similar_cards(card_db, "1") == []
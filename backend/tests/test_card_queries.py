@@ -0,0 +1,79 @@
+import pytest
+from src.api.card_fields import parse_fields, project_card
+from src.api.card_filters import CardFilters
+from src.api.card_queries import fetch_cards_by_ids, iter_card_batches, load_all_cards, query_cards
+
+
+def test_fetch_cards_by_ids_is_set_based(card_db):
+    statements = []
+    card_db.set_trace_callback(statements.append)
+    found = fetch_cards_by_ids(card_db, ["9", "5", "missing", "9"])
+    card_db.set_trace_callback(None)
+
+    # One query for cards plus one per related table, however many IDs
+    assert len(statements) == 5
+    assert set(found) == {"9", "5"}
+    assert found["9"]["keywords"] == ["Bounty", "Raid 2"]
+    assert {a["aspect_name"] for a in found["9"]["aspects"]} == {"Cunning", "Villainy"}
+    assert found["5"]["arenas"] == ["Ground"]
+
+
+def test_fetch_cards_by_ids_empty(card_db):
+    assert fetch_cards_by_ids(card_db, []) == {}
+
+
+def test_batch_matches_full_catalog(card_db):
+    catalog = {card["id"]: card for card in load_all_cards(card_db)}
+    found = fetch_cards_by_ids(card_db, list(catalog))
+    for card_id, card in catalog.items():
+        assert found[card_id]["traits"] == card["traits"]
+        assert found[card_id]["name"] == card["name"]
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields("name, aspects,id,name") == ["id", "name", "aspects"]
+    with pytest.raises(ValueError, match="Unknown fields: power"):
+        parse_fields("name,power")
+
+
+def test_projection_is_pushed_into_sql(card_db):
+    statements = []
+    card_db.set_trace_callback(statements.append)
+    fields = parse_fields("name,energy_cost,type,aspects,image_uri")
+    found = fetch_cards_by_ids(card_db, ["9", "5"], fields)
+    card_db.set_trace_callback(None)
+
+    # The column list is narrowed and only card_aspects is read
+    assert len(statements) == 2
+    assert statements[0].startswith("SELECT id, name, energy_cost, type, image_uri FROM cards")
+    assert "card_aspects" in statements[1]
+    assert set(found["9"]) == {"id", "name", "energy_cost", "type", "aspects", "image_uri"}
+
+
+def test_projected_query_matches_full_query(card_db):
+    fields = parse_fields("name,traits")
+    filters = CardFilters(type=["Unit"])
+    _, full = query_cards(card_db, filters, "-attack")
+    _, projected = query_cards(card_db, filters, "-attack", fields=fields)
+    assert projected == [project_card(card, fields) for card in full]
+
+
+def test_card_batches_stream_the_full_result(card_db):
+    filters = CardFilters(type=["Unit"])
+    total, expected = query_cards(card_db, filters, "-cost", limit=100)
+    batches = list(iter_card_batches(card_db, filters, "-cost", batch_size=2))
+    assert [len(batch) for batch in batches] == [2] * (total // 2) + [total % 2] * (total % 2)
+    assert [card for batch in batches for card in batch] == expected
+
+
+def test_card_batches_hydrate_each_batch_once(card_db):
+    statements = []
+    card_db.set_trace_callback(statements.append)
+    batches = iter_card_batches(card_db, CardFilters(), fields=["id", "name", "keywords"], batch_size=5)
+    cards = [card for batch in batches for card in batch]
+    card_db.set_trace_callback(None)
+
+    # The cards query, then one keywords query per batch
+    assert len(statements) == 1 + -(-len(cards) // 5)
+    assert set(cards[0]) == {"id", "name", "keywords"}
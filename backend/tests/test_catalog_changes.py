@@ -0,0 +1,109 @@
+import json
+import shutil
+import sqlite3
+import pytest
+from src.api import catalog_changes
+from src.api.catalog_changes import changes_since, current_version, record_changes
+from src.api.catalog_snapshot import read_header, read_snapshot, write_snapshot
+from src.database.import_prices import import_price_files
+from src.database.synthetic_data import build_catalog
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = str(tmp_path / "swu_cards.db")
+    build_catalog(path, 20)
+    return path
+
+
+def _rebuild(path, tmp_path, sql):
+    """Publish a copy of the database at path with sql applied to it."""
+    build = str(tmp_path / "build.db")
+    shutil.copyfile(path, build)
+    conn = sqlite3.connect(build)
+    conn.executescript(sql)
+    record = record_changes(conn, path)
+    write_snapshot(conn)
+    conn.close()
+    shutil.move(build, path)
+    return record
+
+
+def _changes(path, since, fields=None):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return changes_since(conn, since, fields)
+    finally:
+        conn.close()
+
+
+def test_first_build_adds_every_card(catalog_path):
+    changes = _changes(catalog_path, 0, ["id", "name"])
+    assert (changes["version"], len(changes["added"]), changes["updated"], changes["removed"]) == (1, 20, [], [])
+    assert set(changes["added"][0]) == {"id", "name"}
+    assert _changes(catalog_path, 1)["added"] == []
+
+
+def test_rebuilds_record_versions_and_net_changes(tmp_path, catalog_path):
+    record = _rebuild(catalog_path, tmp_path, """
+        UPDATE cards SET energy_cost = 9, last_updated = '2030-01-01' WHERE id = '1';
+        UPDATE cards SET last_updated = '2030-01-01' WHERE id = '2';
+        DELETE FROM cards WHERE id = '3';
+        INSERT INTO cards (id, name, type) VALUES ('new', 'New Card', 'Unit');
+    """)
+    assert record == {"version": 2, "added": 1, "updated": 1, "removed": 1}
+
+    _rebuild(catalog_path, tmp_path, """
+        UPDATE cards SET attack = 1 WHERE id = 'new';
+        DELETE FROM cards WHERE id = '4';
+    """)
+    since_1 = _changes(catalog_path, 1, ["id", "energy_cost"])
+    assert since_1["version"] == 3
+    assert [card["id"] for card in since_1["added"]] == ["new"]
+    assert since_1["updated"] == [{"id": "1", "energy_cost": 9}]
+    assert sorted(since_1["removed"]) == ["3", "4"]
+
+    since_2 = _changes(catalog_path, 2)
+    assert [card["id"] for card in since_2["updated"]] == ["new"] and since_2["removed"] == ["4"]
+
+    with pytest.raises(ValueError):
+        _changes(catalog_path, 4)
+    conn = sqlite3.connect(catalog_path)
+    assert read_header(read_snapshot(conn))["catalog_version"] == 3
+    conn.close()
+
+
+def test_old_versions_are_trimmed(tmp_path, catalog_path, monkeypatch):
+    monkeypatch.setattr(catalog_changes, "CHANGE_LOG_VERSIONS", 2)
+    for cost in (11, 12, 13):
+        _rebuild(catalog_path, tmp_path, f"UPDATE cards SET energy_cost = {cost} WHERE id = '1'")
+    assert _changes(catalog_path, 0) is None
+    assert _changes(catalog_path, 1) is None
+    assert [card["id"] for card in _changes(catalog_path, 2)["updated"]] == ["1"]
+
+
+def test_price_imports_keep_the_version(tmp_path, catalog_path):
+    prices = tmp_path / "shop.jsonl"
+    prices.write_text(json.dumps({"card_id": "5", "price": 2.5, "timestamp": "2024-03-01"}) + "\n")
+    import_price_files([str(prices)], catalog_path)
+    changes = _changes(catalog_path, 1)
+    assert (changes["version"], changes["updated"]) == (1, [])
+    prices = {card["id"]: card["price_usd"] for card in _changes(catalog_path, 0, ["id", "price_usd"])["added"]}
+    assert prices["5"] == 2.5
+
+
+def test_databases_without_a_change_log(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "old.db"))
+    conn.execute("CREATE TABLE cards (id TEXT PRIMARY KEY, name TEXT)")
+    assert current_version(conn) is None and changes_since(conn, 0) is None
+    conn.close()
+
+
+def test_unchanged_rebuilds_keep_the_version(tmp_path, catalog_path):
+    for _ in range(3):
+        record = _rebuild(catalog_path, tmp_path, "UPDATE cards SET last_updated = '2031-01-01'")
+        assert record == {"version": 1, "added": 0, "updated": 0, "removed": 0}
+    changes = _changes(catalog_path, 0)
+    assert changes["version"] == 1 and len(changes["added"]) == 20
+    assert _rebuild(catalog_path, tmp_path, "DELETE FROM cards WHERE id = '1'")["version"] == 2
@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import pytest
+from src.api import database
+from src.api.catalog_refresh import CatalogRefresher, catalog_diff, sync_catalog
+from src.database.synthetic_data import build_catalog
+
+
+def _card_count(path):
+    conn = database.connect_serving(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _publish(path, size, tmp_path):
+    scratch = str(tmp_path / f"build-{size}.db")
+    build_catalog(scratch, size)
+    database.publish_build(scratch, path)
+
+
+def test_catalog_diff():
+    old = [{"id": "1", "name": "A"}, {"id": "2", "name": "B"}, {"id": "3", "name": "C"}]
+    new = [{"id": "1", "name": "A"}, {"id": "2", "name": "B2"}, {"id": "4", "name": "D"}]
+    assert catalog_diff(old, new) == {"added": 1, "updated": 1, "removed": 1}
+    assert catalog_diff([], new) == {"added": 3, "updated": 0, "removed": 0}
+
+
+def test_pinned_builds_get_their_own_page_cache(tmp_path):
+    path = str(tmp_path / "swu_cards.db")
+    _publish(path, 10, tmp_path)
+    first = database.pin_serving(path)
+    anchor = database.connect_serving(first)
+
+    _publish(path, 20, tmp_path)
+    # The old build's cache outlives the rename under its own name only
+    second = database.pin_serving(path)
+    assert second != first and os.path.samefile(second, path)
+    assert (_card_count(first), _card_count(second)) == (10, 20)
+
+    database.unpin_serving(first, path)
+    assert not os.path.exists(first)
+    assert anchor.execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 10
+    anchor.close()
+    assert database.pin_serving(path) == second
+
+
+def test_pins_of_exited_processes_are_removed(tmp_path):
+    path = str(tmp_path / "swu_cards.db")
+    _publish(path, 5, tmp_path)
+    stale = os.path.join(f"{path}.pins", "999999999-1.db")
+    os.makedirs(os.path.dirname(stale))
+    os.link(path, stale)
+    database.pin_serving(path)
+    assert not os.path.exists(stale)
+
+
+def test_sync_records_status_and_reloads():
+    changes = {"added": 2, "updated": 0, "removed": 1}
+    calls = []
+
+    def reload(force=False):
+        calls.append(force)
+        return changes if len(calls) == 1 else None
+
+    refresher = CatalogRefresher(reload, sync=lambda: {"published": "db"})
+    status = refresher.sync_now()
+    assert (status["syncs"], status["reloads"], status["last_changes"]) == (1, 1, changes)
+    assert status["last_sync_error"] is None and status["last_sync_seconds"] >= 0
+    assert refresher.check() is None and refresher.status["reloads"] == 1
+
+
+def test_failed_sync_keeps_serving():
+    def sync():
+        raise sqlite3.OperationalError("disk I/O error")
+
+    refresher = CatalogRefresher(lambda force=False: pytest.fail("no reload after a failed sync"), sync)
+    status = refresher.sync_now()
+    assert status["last_sync_error"] == "disk I/O error"
+    assert (status["syncs"], status["reloads"], status["running"]) == (1, 0, False)
+
+
+def test_sync_is_skipped_while_another_build_runs(tmp_path):
+    path = str(tmp_path / "swu_cards.db")
+    _publish(path, 5, tmp_path)
+    build = database.prepare_build(path)
+    try:
+        refresher = CatalogRefresher(lambda force=False: pytest.fail("nothing to reload"),
+                                     lambda: sync_catalog(path))
+        status = refresher.sync_now()
+        assert (status["syncs"], status["running"], status["last_sync_error"]) == (0, False, None)
+    finally:
+        database.abandon_build(build)
+
+
+def _publish_with(path, sql):
+    build = database.prepare_build(path, copy_existing=True)
+    conn = sqlite3.connect(build)
+    conn.executescript(sql)
+    conn.close()
+    database.publish_build(build, path)
+
+
+def test_reload_swaps_in_a_published_build(api, api_client):
+    first = api_client.get("/api/cards?type=Unit")
+    assert first.json()["total"] == 6
+
+    _publish_with(api.DB_PATH, "INSERT INTO cards (id, name, type) VALUES ('13', 'Snowspeeder', 'Unit')")
+    assert api.reload_catalog() == {"added": 1, "updated": 0, "removed": 0}
+    second = api_client.get("/api/cards?type=Unit")
+    assert second.json()["total"] == 7 and second.headers["etag"] != first.headers["etag"]
+    assert api_client.get("/api/cards/13").json()["name"] == "Snowspeeder"
+    pinned = api.serving_path
+    assert pinned != api.DB_PATH and os.path.samefile(pinned, api.DB_PATH)
+
+    _publish_with(api.DB_PATH, "DELETE FROM cards WHERE id = '5'")
+    assert api.reload_catalog() == {"added": 0, "updated": 0, "removed": 1}
+    assert api_client.get("/api/cards?type=Unit").json()["total"] == 6
+    # Requests may still be opening the link just swapped out
+    assert os.path.exists(pinned) and os.path.exists(api.serving_path)
+    assert api.reload_catalog() is None
+    assert api.reload_catalog(force=True) is not None and os.path.exists(api.serving_path)
+
+    _publish_with(api.DB_PATH, "DELETE FROM cards WHERE id = '6'")
+    api.reload_catalog()
+    assert not os.path.exists(pinned) and os.path.exists(api.retired_path)
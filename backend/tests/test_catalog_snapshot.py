@@ -0,0 +1,53 @@
+import sqlite3
+import pytest
+from src.api.card_queries import load_all_cards
+from src.api.catalog_snapshot import (
+    decode_snapshot, encode_snapshot, parse_range, read_header, read_snapshot
+)
+from src.database.synthetic_data import build_catalog, generate_cards
+
+
+def test_snapshot_round_trips_the_catalog(card_db):
+    cards = load_all_cards(card_db)
+    data = encode_snapshot(cards)
+    assert decode_snapshot(data) == cards
+    assert read_header(data)["rows"] == len(cards)
+
+
+def test_snapshot_is_compact_and_deterministic():
+    cards = generate_cards(2000)
+    data = encode_snapshot(cards)
+    assert decode_snapshot(data) == cards
+    assert encode_snapshot(generate_cards(2000)) == data
+
+    header = read_header(data)
+    columns = {column["name"]: column for column in header["columns"]}
+    assert columns["type"]["dtype"] == "|u1" and columns["attack"]["dtype"] == "|i1"
+    assert columns["aspects"]["type"] == "list"
+    assert all((header["body"] + column["data"][0]) % 8 == 0 for column in columns.values())
+
+    cards[0]["price_usd"] += 1
+    assert read_header(encode_snapshot(cards))["version"] != header["version"]
+
+
+def test_builds_store_a_snapshot(tmp_path):
+    path = str(tmp_path / "cards.db")
+    build_catalog(path, 50)
+    conn = sqlite3.connect(path)
+    data = read_snapshot(conn)
+    assert decode_snapshot(data) == load_all_cards(conn)
+    conn.execute("DROP TABLE catalog_snapshot")
+    assert read_snapshot(conn) is None
+    conn.close()
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9,20-29", 100) is None
+    assert parse_range("bytes=10-19", 100) == (10, 19)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    for unsatisfiable in ("bytes=100-", "bytes=20-10", "bytes=abc", "bytes=-0"):
+        with pytest.raises(ValueError):
+            parse_range(unsatisfiable, 100)
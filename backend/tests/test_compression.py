@@ -0,0 +1,87 @@
+import gzip
+import zlib
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from src.api import compression
+from src.api.compression import CompressionMiddleware, negotiate_encoding
+
+LARGE = {"cards": [{"id": str(i), "text": "When Played: Deal 2 damage to a unit."} for i in range(100)]}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large():
+        return ORJSONResponse(LARGE)
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/image")
+    async def image():
+        return PlainTextResponse(b"x" * 2000, media_type="image/png")
+
+    @app.get("/stream")
+    async def stream():
+        lines = (b'{"line": %d}\n' % i for i in range(200))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+
+def raw_get(client, path, accept_encoding):
+    # httpx decodes bodies transparently; stream to see the bytes on the wire
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0.5, br") == "br"
+    assert negotiate_encoding("br;q=0.2, gzip;q=0.8") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("*") == "br"
+
+
+def test_gzip_above_threshold(client):
+    response, body = raw_get(client, "/large", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(body)
+    assert gzip.decompress(body) == ORJSONResponse(LARGE).body
+
+
+def test_brotli_preferred(client):
+    brotli = pytest.importorskip("brotli")
+    response, body = raw_get(client, "/large", "gzip, deflate, br")
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(body) == ORJSONResponse(LARGE).body
+
+
+def test_small_and_binary_responses_pass_through(client):
+    response, body = raw_get(client, "/small", "gzip")
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert body == b'{"ok":true}'
+
+    response, body = raw_get(client, "/image", "gzip")
+    assert "content-encoding" not in response.headers and len(body) == 2000
+
+    response, body = raw_get(client, "/large", "identity")
+    assert "content-encoding" not in response.headers
+
+
+def test_streamed_body_is_compressed_incrementally(client, monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    response, body = raw_get(client, "/stream", "br, gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = zlib.decompress(body, 16 + zlib.MAX_WBITS).splitlines()
+    assert len(lines) == 200 and lines[-1] == b'{"line": 199}'
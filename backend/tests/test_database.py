@@ -0,0 +1,122 @@
+import glob
+import os
+import sqlite3
+import pytest
+from src.api import database
+from src.api.swu_api_client import SWUApiClient
+from src.database.synthetic_data import build_catalog
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = str(tmp_path / "swu_cards.db")
+    build_catalog(path, 200)
+    yield path
+    database.close_serving()
+
+
+def test_database_path_honours_env(monkeypatch, tmp_path):
+    monkeypatch.setenv(database.DB_PATH_ENV, str(tmp_path / "cards.db"))
+    assert database.database_path() == str(tmp_path / "cards.db")
+    monkeypatch.delenv(database.DB_PATH_ENV)
+    assert database.database_path().endswith(os.path.join(".swu", "swu_cards.db"))
+
+
+def test_serving_connection_is_read_only(catalog_path):
+    conn = database.connect_serving(catalog_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 200
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] == database.SERVING_MMAP_SIZE
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM cards")
+    finally:
+        conn.close()
+
+
+def test_serving_connection_requires_an_existing_file(tmp_path):
+    with pytest.raises(sqlite3.OperationalError):
+        database.connect_serving(str(tmp_path / "missing.db"))
+    assert not os.path.exists(tmp_path / "missing.db")
+
+
+def test_warm_up_reads_every_page(catalog_path):
+    warmed = database.warm_up(catalog_path)
+    assert warmed["pages"] > 0
+    assert warmed["bytes"] == os.path.getsize(catalog_path)
+
+
+def test_build_connection_uses_wal_until_finished(tmp_path):
+    path = str(tmp_path / "build.db")
+    conn = database.connect_build(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.execute("CREATE TABLE t (x)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    database.finish_build(conn)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()
+    assert not os.path.exists(path + "-wal")
+
+    served = database.connect_serving(path)
+    assert served.execute("SELECT x FROM t").fetchall() == [(1,)]
+    served.close()
+
+
+def test_client_publishes_only_finished_builds(tmp_path, catalog_path):
+    path = str(tmp_path / "served.db")
+    with pytest.raises(RuntimeError):
+        with SWUApiClient(path):
+            raise RuntimeError("build failed")
+    assert not os.path.exists(path) and not glob.glob(path + ".*.building*")
+
+    with SWUApiClient(path) as client:
+        assert client._get_db_connection().execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 0
+        assert not os.path.exists(path)
+    assert os.path.exists(path) and not glob.glob(path + ".*.building*")
+    conn = database.connect_serving(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()
+
+
+def test_clients_hold_the_build_lock_only_while_building(tmp_path):
+    path = str(tmp_path / "served.db")
+    idle = SWUApiClient(path, wait_for_build=False)
+    assert not database.build_in_progress(path)
+
+    client = SWUApiClient(path, wait_for_build=False)
+    client._get_db_connection()
+    assert database.build_in_progress(path)
+    del client
+    assert not database.build_in_progress(path) and not glob.glob(path + ".*.building*")
+
+    with SWUApiClient(path, wait_for_build=False) as client:
+        client._get_db_connection()
+    assert os.path.exists(path) and not database.build_in_progress(path)
+    idle.close()
+
+
+def test_builds_of_one_database_are_serialized(tmp_path, catalog_path):
+    first = database.prepare_build(catalog_path, copy_existing=True)
+    assert database.build_in_progress(catalog_path)
+    with pytest.raises(database.BuildInProgress):
+        database.prepare_build(catalog_path, blocking=False)
+    with pytest.raises(database.BuildInProgress):
+        SWUApiClient(catalog_path, wait_for_build=False).build_database()
+    # Other databases build independently
+    other = database.prepare_build(str(tmp_path / "other.db"), blocking=False)
+    database.abandon_build(other)
+
+    database.publish_build(first, catalog_path)
+    assert not database.build_in_progress(catalog_path)
+    second = database.prepare_build(catalog_path, blocking=False)
+    assert second != first and os.path.exists(second)
+    database.abandon_build(second)
+    assert not os.path.exists(second) and not database.build_in_progress(catalog_path)
+
+
+def test_leftover_builds_are_removed(catalog_path):
+    leftover = database.prepare_build(catalog_path)
+    # As if the process building it had died: the lock goes, the file stays
+    database._release_build(leftover)
+    build = database.prepare_build(catalog_path)
+    assert not os.path.exists(leftover)
+    database.abandon_build(build)
@@ -0,0 +1,85 @@
+import sqlite3
+import tracemalloc
+import pytest
+from src.api.card_index import CardIndex
+from src.api.deck_analysis import DeckAnalyzer
+from src.api.decklist import Decklist
+from src.database.synthetic_data import build_catalog
+
+
+@pytest.fixture
+def analyzer(card_db):
+    return DeckAnalyzer(CardIndex.build(card_db))
+
+
+def deck(cards, leader="1", base="4"):
+    return Decklist(
+        leader=leader, base=base,
+        cards=[{"id": card_id, "count": count} for card_id, count in cards.items()]
+    )
+
+
+def test_cost_curve_and_totals(analyzer):
+    result = analyzer.analyze(deck({"7": 3, "5": 3, "9": 2, "1": 1}))
+    assert result["total_cards"] == 9
+    assert result["cost_curve"] == {
+        "0": 0, "1": 3, "2": 3, "3": 0, "4": 0, "5": 2, "6": 0, "7+": 1
+    }
+    assert result["average_cost"] == round((3 * 1 + 3 * 2 + 2 * 5 + 7) / 9, 2)
+
+
+def test_aspect_penalty_against_leader_and_base(analyzer):
+    result = analyzer.analyze(deck({"7": 3, "5": 3, "9": 2}))
+    penalty = result["aspect_penalty"]
+    assert penalty["provided"] == ["Aggression", "Villainy"]
+    # Battlefield Marine misses Command and Heroism, Boba Fett misses Cunning
+    assert {c["id"]: c["penalty"] for c in penalty["cards"]} == {"5": 4, "9": 2}
+    assert penalty["total"] == 3 * 4 + 2 * 2
+
+
+def test_arena_split_counts_units_only(analyzer):
+    result = analyzer.analyze(deck({"7": 3, "5": 3, "10": 2, "11": 1}))
+    assert result["arenas"] == {"Ground": 3, "Space": 3}
+
+
+def test_trait_and_keyword_density(analyzer):
+    result = analyzer.analyze(deck({"9": 2, "12": 2}))
+    traits = {t["value"]: t for t in result["traits"]}
+    assert traits["Underworld"]["count"] == 4
+    assert traits["Underworld"]["density"] == 1.0
+    assert result["traits"][0]["value"] in ("Bounty Hunter", "Underworld")
+    keywords = {k["value"]: k["count"] for k in result["keywords"]}
+    assert keywords == {"Bounty": 2, "Raid 2": 2, "Smuggle": 2}
+
+
+def test_unknown_cards_are_reported(analyzer):
+    result = analyzer.analyze(deck({"5": 1, "nope": 2}, leader="missing"))
+    assert result["unknown_cards"] == ["nope", "missing"]
+    assert result["total_cards"] == 1
+
+
+def test_batch_matches_single_analysis(analyzer):
+    decks = [deck({"7": 3, "5": 3}), deck({"9": 1}, leader="2", base="3"), deck({})]
+    assert analyzer.analyze_many(decks) == [analyzer.analyze(d) for d in decks]
+    assert analyzer.analyze(deck({}))["average_cost"] is None
+
+
+def test_large_batch_memory_is_bounded(tmp_path):
+    path = str(tmp_path / "catalog.db")
+    build_catalog(path, 5000)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    analyzer = DeckAnalyzer(CardIndex.build(conn))
+    conn.close()
+    ids = analyzer.card_index.ids
+    decks = [deck({ids[(i * 7 + j) % len(ids)]: 3 for j in range(16)}, ids[i % 50], ids[-1])
+             for i in range(2000)]
+
+    tracemalloc.start()
+    results = analyzer.analyze_many(decks)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(results) == 2000 and results[0]["total_cards"] == 48
+    # Working memory beyond the results; dense decks x catalog matrices
+    # would need 40 MB each
+    assert peak - retained < 5_000_000
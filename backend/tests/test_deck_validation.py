@@ -0,0 +1,56 @@
+import pytest
+from src.api.card_index import CardIndex
+from src.api.deck_validation import DeckValidator
+from src.api.decklist import Decklist
+
+
+@pytest.fixture
+def validator(card_db):
+    return DeckValidator(CardIndex.build(card_db))
+
+
+def codes(errors):
+    return sorted(error["code"] for error in errors)
+
+
+def test_legal_limited_deck(validator):
+    # Limited has no copy limit, so the small sample catalog can fill 30 cards
+    deck = Decklist(leader="1", base="4", cards=[{"id": "7", "count": 15}, {"id": "10", "count": 15}])
+    assert validator.validate(deck, format="limited") == []
+
+
+def test_premier_size_and_copy_limits(validator):
+    deck = Decklist(leader="1", base="4", cards=[{"id": "7", "count": 4}, {"id": "10", "count": 3}])
+    errors = validator.validate(deck)
+    assert codes(errors) == ["DECK_TOO_SMALL", "TOO_MANY_COPIES"]
+    too_many = next(error for error in errors if error["code"] == "TOO_MANY_COPIES")
+    assert too_many["count"] == 4 and too_many["maximum"] == 3
+    assert next(e for e in errors if e["code"] == "DECK_TOO_SMALL")["size"] == 7
+
+
+def test_leader_and_base_slots(validator):
+    assert codes(validator.validate(Decklist(cards=[{"id": "7", "count": 30}]), "limited")) == [
+        "MISSING_BASE", "MISSING_LEADER"
+    ]
+    deck = Decklist(leader="3", base="1", cards=[{"id": "2", "count": 1}, {"id": "7", "count": 29}])
+    assert codes(validator.validate(deck, "limited")) == [
+        "COMMAND_CARD_IN_DECK", "INVALID_BASE", "INVALID_LEADER"
+    ]
+
+
+def test_set_rotation_and_unknown_cards(validator):
+    deck = Decklist(leader="1", base="4", cards=[
+        {"id": "9", "count": 1}, {"id": "7", "count": 29}, {"id": "missing", "count": 1}
+    ])
+    errors = validator.validate(deck, "limited", legal_sets=["SOR"])
+    assert codes(errors) == ["SET_NOT_LEGAL", "UNKNOWN_CARD"]
+    assert errors[0]["set_code"] == "SHD"
+    assert validator.validate(deck, "limited", legal_sets=["SOR", "SHD"])[0]["card_id"] == "missing"
+
+
+def test_validate_raw_reports_malformed_decklists(validator):
+    raw = {"leader": "1", "base": "4", "cards": [{"id": "7", "count": 30}]}
+    assert validator.validate_raw(raw, "limited") == []
+    assert codes(validator.validate_raw({"cards": [{"count": 2}]})) == ["INVALID_DECKLIST"]
+    assert codes(validator.validate_raw({"cards": [{"id": "7", "count": 0}]})) == ["INVALID_DECKLIST"]
+    assert codes(validator.validate_raw([1, 2])) == ["INVALID_DECKLIST"]
@@ -0,0 +1,63 @@
+import time
+import pytest
+import requests
+from benchmarks.fake_swu_api import FakeSWUApi, generated_catalog
+from src.api.swu_api_client import SWUApiClient
+
+
+@pytest.fixture
+def records():
+    return generated_catalog(120, seed=3)
+
+
+def _client(tmp_path, api, **kwargs):
+    return SWUApiClient(str(tmp_path / "ingest.db"), base_url=api.base_url, backoff=0, **kwargs)
+
+
+def test_card_list_uses_strapi_pagination(records):
+    with FakeSWUApi(records, max_page_size=50) as api:
+        response = requests.get(api.base_url + "card-list", params={
+            "pagination[page]": 3, "pagination[pageSize]": 100, "populate": "*",
+        })
+    body = response.json()
+    assert response.status_code == 200
+    assert body["meta"]["pagination"] == {"page": 3, "pageSize": 50, "pageCount": 3, "total": 120}
+    assert [card["id"] for card in body["data"]] == [card["id"] for card in records[100:]]
+
+
+def test_unknown_paths_return_strapi_errors(records):
+    with FakeSWUApi(records) as api:
+        response = requests.get(api.base_url + "cards")
+    assert response.status_code == 404
+    assert response.json()["error"]["name"] == "NotFoundError"
+
+
+def test_client_ingests_through_injected_faults(tmp_path, records):
+    with FakeSWUApi(records, max_page_size=25, throttle_rate=0.2, retry_after=0,
+                    error_rate=0.2, drop_rate=0.2, seed=5) as api:
+        with _client(tmp_path, api, max_retries=10) as client:
+            client.build_database()
+            stored = client._get_db_connection().execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    assert stored == 120
+    assert api.stats["pages"] == 5
+    assert api.stats["rate_limited"] + api.stats["errors"] + api.stats["dropped"] > 0
+
+
+def test_client_gives_up_after_max_retries(tmp_path, records):
+    with FakeSWUApi(records, error_rate=1.0) as api:
+        with _client(tmp_path, api, max_retries=2) as client:
+            with pytest.raises(requests.HTTPError):
+                client.fetch_cards(page=1)
+    assert api.stats["requests"] == 3
+
+
+def test_client_honours_retry_after(tmp_path, records):
+    with FakeSWUApi(records, max_page_size=10, rate_limit=5, retry_after=0.3) as api:
+        with _client(tmp_path, api, max_retries=3) as client:
+            start = time.perf_counter()
+            for page in range(1, 8):
+                client.fetch_cards(page=page, page_size=10)
+            elapsed = time.perf_counter() - start
+    assert api.stats["rate_limited"] >= 1 and api.stats["pages"] == 7
+    assert elapsed >= 0.3
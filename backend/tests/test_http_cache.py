@@ -0,0 +1,98 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from src.api.http_cache import (
+    ConditionalCacheMiddleware, database_version, etag_matches, make_etag
+)
+
+
+@pytest.fixture
+def app_state():
+    return {"version": "v1", "calls": 0}
+
+
+@pytest.fixture
+def client(app_state):
+    app = FastAPI()
+    app.add_middleware(ConditionalCacheMiddleware, version=lambda: app_state["version"])
+
+    @app.get("/api/cards")
+    async def cards(page: int = 1):
+        app_state["calls"] += 1
+        return {"page": page}
+
+    @app.get("/api/types")
+    async def types():
+        return ["Unit"]
+
+    @app.get("/api/cards/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="Card not found")
+
+    @app.post("/api/cards/batch")
+    async def batch():
+        return {}
+
+    return TestClient(app)
+
+
+def test_make_etag_normalizes_query():
+    assert make_etag("v1", "/api/cards", "page=2&aspect=A") == make_etag("v1", "/api/cards", "aspect=A&page=2")
+    assert make_etag("v1", "/api/cards", "page=2") != make_etag("v2", "/api/cards", "page=2")
+    assert make_etag("v1", "/api/cards", "page=2").startswith('W/"')
+
+
+def test_etag_matches():
+    assert etag_matches('W/"abc"', 'W/"abc"')
+    assert etag_matches('"x", "abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('W/"abd"', 'W/"abc"')
+
+
+def test_if_none_match_skips_the_handler(client, app_state):
+    response = client.get("/api/cards?page=2")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"].startswith("public, max-age=60")
+    assert app_state["calls"] == 1
+
+    response = client.get("/api/cards?page=2", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag and response.content == b""
+    assert app_state["calls"] == 1
+
+    # A new catalog version invalidates the tag
+    app_state["version"] = "v2"
+    response = client.get("/api/cards?page=2", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and app_state["calls"] == 2
+
+
+def test_cache_policies(client, app_state):
+    assert "max-age=86400" in client.get("/api/types").headers["cache-control"]
+    assert "etag" not in client.get("/api/cards/missing").headers
+    assert "etag" not in client.post("/api/cards/batch").headers
+
+    app_state["version"] = None
+    assert "etag" not in client.get("/api/cards").headers
+
+
+def test_database_version_changes_on_rebuild(tmp_path):
+    db_path = tmp_path / "cards.db"
+    assert database_version(str(db_path)) is None
+    db_path.write_bytes(b"one")
+    first = database_version(str(db_path))
+    db_path.write_bytes(b"rebuilt")
+    assert database_version(str(db_path)) != first
+
+
+def test_lifespan_events_pass_through():
+    app = FastAPI()
+    app.add_middleware(ConditionalCacheMiddleware, version=lambda: "v1")
+    started = []
+
+    @app.on_event("startup")
+    async def startup():
+        started.append(True)
+
+    with TestClient(app):
+        pass
+    assert started == [True]
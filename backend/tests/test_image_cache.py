@@ -0,0 +1,129 @@
+import io
+import os
+from urllib.parse import unquote, urlsplit
+import pytest
+from src.api import image_cache
+from src.api.image_cache import ImageCache, ImageFetchError, fetch_url, sniff_content_type
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def fetch_file(url):
+    """Fetcher for the file:// URLs the tests use in place of remote art."""
+    try:
+        with open(unquote(urlsplit(url).path), "rb") as f:
+            return f.read()
+    except OSError as e:
+        raise ImageFetchError(f"Failed to fetch {url}: {e}") from e
+
+
+def _fixture_image(path, size=(750, 1050), color=(200, 30, 30)):
+    Image.new("RGB", size, color).save(path, "PNG")
+    return path.as_uri()
+
+
+@pytest.fixture
+def art(tmp_path):
+    """Two local card images standing in for the remote art."""
+    (tmp_path / "art").mkdir()
+    return [
+        _fixture_image(tmp_path / "art" / "front.png"),
+        _fixture_image(tmp_path / "art" / "back.png", color=(20, 20, 200)),
+    ]
+
+
+@pytest.fixture
+def fetches():
+    return []
+
+
+@pytest.fixture
+def cache(tmp_path, fetches):
+    def counting_fetch(url):
+        fetches.append(url)
+        return fetch_file(url)
+    return ImageCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024, fetch=counting_fetch)
+
+
+def test_fetch_url_refuses_local_files(art, tmp_path):
+    for url in (art[0], str(tmp_path / "art" / "front.png"), "ftp://example.com/a.png"):
+        with pytest.raises(ImageFetchError, match="only http"):
+            fetch_url(url)
+
+
+def test_variants_are_rendered_once(cache, art, fetches):
+    data, content_type = cache.get(art[0], "thumb.webp")
+    assert content_type == "image/webp" and sniff_content_type(data) == "image/webp"
+    assert Image.open(io.BytesIO(data)).size == (300, 420)
+
+    jpeg, content_type = cache.get(art[0], "full.jpeg")
+    assert content_type == "image/jpeg"
+    assert Image.open(io.BytesIO(jpeg)).size == (750, 1050)
+
+    assert cache.get(art[0], "thumb.webp") == (data, "image/webp")
+    assert fetches == [art[0]]
+
+
+def test_identical_images_are_stored_once(cache, art, tmp_path):
+    copy = tmp_path / "art" / "copy.png"
+    copy.write_bytes((tmp_path / "art" / "front.png").read_bytes())
+    cache.get(art[0], "thumb.webp")
+    size = cache.size()
+    cache.get(copy.as_uri(), "thumb.webp")
+    assert cache.size() == size
+
+
+def test_least_recently_used_files_are_evicted(cache, art, fetches, monkeypatch):
+    monkeypatch.setattr(image_cache, "TOUCH_INTERVAL", 0)
+    cache.get(art[0], "full.webp")
+    cache.get(art[1], "full.webp")
+    data, _ = cache.get(art[0], "full.webp")
+
+    # Room for the most recently used file only
+    cache.max_bytes = len(data)
+    assert cache.evict() == 3
+    assert cache.size() == len(data)
+    assert cache.get(art[0], "full.webp") == (data, "image/webp")
+    assert fetches == art
+    cache.get(art[1], "full.webp")
+    assert fetches == art + [art[1]]
+
+
+def test_prefetch_reports_failures(cache, art, tmp_path):
+    result = cache.prefetch(art + art + [(tmp_path / "missing.png").as_uri()])
+    assert result == {"images": 2, "failed": 1}
+    assert len(os.listdir(os.path.join(cache.root, "blobs"))) > 0
+
+
+def test_originals_are_served_without_pillow(cache, art, monkeypatch):
+    monkeypatch.setattr(image_cache, "Image", None)
+    data, content_type = cache.get(art[0], "thumb.webp")
+    assert content_type == "image/png"
+
+
+@pytest.fixture
+def api_images(api, tmp_path, art, monkeypatch):
+    """The API serving images through a cache that maps card art URLs to local files."""
+    local = {"https://example.com/1.png": art[0], "https://example.com/2.png": art[1]}
+
+    def fetch(url):
+        if url not in local:
+            raise ImageFetchError(f"Failed to fetch {url}: 404")
+        return fetch_file(local[url])
+
+    monkeypatch.setattr(api, "image_cache", ImageCache(str(tmp_path / "api-cache"), fetch=fetch))
+    return api
+
+
+def test_image_endpoint(api_images, api_client):
+    response = api_client.get("/api/images/1")
+    assert response.status_code == 200 and response.headers["content-type"] == "image/webp"
+    assert Image.open(io.BytesIO(response.content)).size == (300, 420)
+    assert response.headers["cache-control"].startswith("public, max-age=604800")
+    assert api_client.get("/api/images/2?size=full&format=jpeg").headers["content-type"] == "image/jpeg"
+
+    assert api_client.get("/api/images/missing").status_code == 404
+    response = api_client.get("/api/images/1?side=back")
+    assert response.status_code == 404 and response.json()["detail"] == "Card has no back image"
+    response = api_client.get("/api/images/3")
+    assert response.status_code == 502 and "cache-control" not in response.headers
@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from src.api.metrics import MetricsMiddleware, instrument_connection, process_memory
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/things/{thing_id}")
+    async def thing(thing_id: str):
+        conn = instrument_connection(sqlite3.connect(":memory:"))
+        rows = conn.execute(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 12) "
+            "SELECT x FROM n"
+        ).fetchall()
+        leader = conn.execute("SELECT 'Darth Vader' AS name").fetchone()
+        conn.close()
+        return {"id": thing_id, "cards": len(rows), "leader": leader["name"]}
+
+    return TestClient(app)
+
+
+def test_request_metrics_use_route_templates(client):
+    route = {"route": "/things/{thing_id}"}
+    before = sample("swu_http_requests_total", method="GET", status="200", **route)
+    statements = sample("swu_sql_statements_per_request_sum", **route)
+    rows = sample("swu_sql_rows_per_request_sum", **route)
+
+    assert client.get("/things/a").json()["cards"] == 12
+    client.get("/things/b")
+
+    assert sample("swu_http_requests_total", method="GET", status="200", **route) == before + 2
+    assert sample("swu_http_request_duration_seconds_count", method="GET", **route) >= 2
+    # Two statements per request, reading 12 rows and one row
+    assert sample("swu_sql_statements_per_request_sum", **route) == statements + 4
+    assert sample("swu_sql_rows_per_request_sum", **route) == rows + 26
+    assert sample("swu_http_requests_in_flight") == 0
+
+
+def test_unmatched_routes_share_a_label(client):
+    before = sample("swu_http_requests_total", method="GET", route="unmatched", status="404")
+    client.get("/nowhere/1")
+    client.get("/nowhere/2")
+    assert sample("swu_http_requests_total", method="GET", route="unmatched", status="404") == before + 2
+
+
+def test_instrumented_rows_behave_like_sqlite_rows():
+    conn = instrument_connection(sqlite3.connect(":memory:"))
+    row = conn.execute("SELECT 1 AS one, 'a' AS letter").fetchone()
+    assert row["letter"] == "a" and tuple(row) == (1, "a") and row.keys() == ["one", "letter"]
+
+
+def test_process_memory():
+    memory = process_memory()
+    assert set(memory) == {"rss", "pss", "shared", "private"}
+    assert memory["rss"] > 0
+    assert sample("swu_process_memory_bytes", kind="rss") > 0
+
+
+# Run in a fresh interpreter: multi-process mode is chosen at import time
+MULTIPROCESS_SCRIPT = """
+import os, sys
+from prometheus_client import generate_latest
+from src.api.metrics import CACHE_REQUESTS, IN_FLIGHT, metrics_registry, update_process_memory
+
+CACHE_REQUESTS.labels("card_index", "hit").inc()
+pid = os.fork()
+if pid == 0:
+    CACHE_REQUESTS.labels("card_index", "hit").inc(2)
+    IN_FLIGHT.inc()
+    update_process_memory()
+    os._exit(0)
+os.waitpid(pid, 0)
+sys.stdout.write(generate_latest(metrics_registry()).decode())
+"""
+
+
+def test_workers_metrics_are_aggregated(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", MULTIPROCESS_SCRIPT], cwd=backend, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    # The parent's count is not inherited by the child, and both are summed
+    assert 'swu_cache_requests_total{cache="card_index",result="hit"} 3.0' in output
+    assert "swu_http_requests_in_flight 1.0" in output
+    assert 'swu_process_memory_bytes{kind="rss",pid="' in output
@@ -0,0 +1,71 @@
+import pytest
+from src.api.card_filters import CardFilters
+from src.api.card_index import CardIndex
+from src.api.card_queries import load_all_cards
+from src.api.name_index import NameIndex, normalize
+
+
+@pytest.fixture
+def name_index(card_db):
+    return NameIndex(load_all_cards(card_db))
+
+
+def ids(suggestions):
+    return [card["id"] for card in suggestions]
+
+
+def test_normalize():
+    assert normalize("  Administrator's  Tower ") == "administrator s tower"
+    assert normalize("TIE/ln Fighter") == "tie ln fighter"
+    assert normalize("Padmé Amidala") == "padme amidala"
+
+
+def test_names_and_name_subtitle_combinations(name_index):
+    # Names alphabetically, then "Echo Base" by its second word
+    assert ids(name_index.complete("b")) == ["5", "9", "12", "3"]
+    assert ids(name_index.complete("Darth Vader, Dark")) == ["1"]
+    assert ids(name_index.complete("tie/LN")) == ["7"]
+    assert name_index.complete("boba")[0] == {
+        "id": "9", "name": "Boba Fett", "subtitle": "Disintegrator", "type": "Unit",
+        "set_code": "SHD", "card_number": None, "image_uri": "https://example.com/9.png",
+        "thumbnail": "/api/images/9?size=thumb",
+    }
+
+
+def test_subtitles_and_inner_words_rank_after_names(name_index):
+    # "Force Choke" is a name, "Faithful Friend" a subtitle, then
+    # "Boba Fett" and "TIE/ln Fighter" by an inner word
+    assert ids(name_index.complete("f")) == ["10", "2", "9", "7"]
+    # Inner words: "Darth Vader", "Vigilant Honor Guards"
+    assert ids(name_index.complete("v")) == ["6", "1"]
+    assert ids(name_index.complete("leader")) == ["8"]
+
+
+def test_limit_and_no_match(name_index):
+    assert len(name_index.complete("b", limit=2)) == 2
+    assert name_index.complete("zzz") == []
+    assert name_index.complete(" ,") == []
+
+
+def test_fuzzy_matches_rank_by_similarity(name_index):
+    candidates = name_index.fuzzy("Darth Vadar")
+    assert candidates[0]["id"] == "1" and 0.5 < candidates[0]["score"] < 1
+    assert name_index.fuzzy("bobba fet")[0]["id"] == "9"
+    # Exact "name subtitle" keys short-circuit
+    assert [(c["id"], c["score"]) for c in name_index.fuzzy("Luke Skywalker Faithful Friend")] == [("2", 1.0)]
+    assert name_index.fuzzy("qqqq") == []
+
+
+def test_resolve_decklist_lines(name_index):
+    results = name_index.resolve(["3x Battlefeild Marine", "1 Tie/ln fighter", "Yoda"])
+    assert [(r["count"], r["match"] and r["match"]["id"]) for r in results] == [
+        (3, "5"), (1, "7"), (None, None)
+    ]
+    assert results[0]["query"] == "3x Battlefeild Marine"
+
+
+def test_fuzzy_search_filter(card_db):
+    index = CardIndex.build(card_db)
+    total, cards = index.query(CardFilters(search="Wing Leeder", fuzzy=True))
+    assert [card["id"] for card in cards] == ["8"] and total == 1
+    assert index.query(CardFilters(search="Wing Leeder"))[0] == 0
@@ -0,0 +1,139 @@
+import json
+import sqlite3
+import pytest
+from src.api import database
+from src.api.price_queries import price_movers, price_series, price_stats
+from src.database.import_prices import (
+    carry_over_prices, import_price_files, normalize_timestamp
+)
+from src.database.synthetic_data import build_catalog
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = str(tmp_path / "swu_cards.db")
+    build_catalog(path, 20)
+    return path
+
+
+def _write_jsonl(path, records):
+    with open(path, "w") as f:
+        f.writelines(json.dumps(record) + "\n" for record in records)
+    return str(path)
+
+
+def _connect(path):
+    return database.connect_serving(path, immutable=False)
+
+
+def test_normalize_timestamp():
+    assert normalize_timestamp("2024-03-01") == "2024-03-01T00:00:00"
+    assert normalize_timestamp("2024-03-01T12:30:00Z") == "2024-03-01T12:30:00"
+    assert normalize_timestamp("2024-03-01T12:30:00+02:00") == "2024-03-01T10:30:00"
+    assert normalize_timestamp(0) == "1970-01-01T00:00:00"
+    assert normalize_timestamp("yesterday") is None
+
+
+def test_import_appends_snapshots_once(tmp_path, catalog_path):
+    csv_path = tmp_path / "tcg.csv"
+    csv_path.write_text(
+        "set_code,card_number,price,date\n"
+        "SOR,001,1.00,2024-03-01\n"
+        "SOR,2,2.50,2024-03-01\n"
+        "SOR,999,9.99,2024-03-01\n"
+        "SOR,2,n/a,2024-03-02\n"
+    )
+    json_path = _write_jsonl(tmp_path / "shop.jsonl", [
+        {"card_id": "1", "price_usd": 1.25, "timestamp": "2024-03-02T09:00:00Z"},
+    ])
+
+    report = import_price_files([str(csv_path), json_path], catalog_path)
+    assert (report["rows"], report["inserted"], report["unknown_cards"], report["invalid"]) == (5, 3, 1, 1)
+    assert report["cards_updated"] == 2
+
+    again = import_price_files([str(csv_path), json_path], catalog_path)
+    assert (again["inserted"], again["duplicates"], again["cards_updated"]) == (0, 3, 0)
+
+    conn = _connect(catalog_path)
+    rows = conn.execute("SELECT card_id, price_usd, source FROM price_history ORDER BY id").fetchall()
+    assert rows == [("1", 1.0, "tcg"), ("2", 2.5, "tcg"), ("1", 1.25, "shop")]
+    assert conn.execute("SELECT price_usd FROM cards WHERE id = '1'").fetchone()[0] == 1.25
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()
+
+
+def test_series_are_downsampled_into_buckets(tmp_path, catalog_path):
+    # 2024-03-04 is a Monday
+    prices = [("2024-03-04T08:00:00", 1.0), ("2024-03-04T20:00:00", 3.0),
+              ("2024-03-06T12:00:00", 2.0), ("2024-03-11T12:00:00", 4.0)]
+    import_price_files([_write_jsonl(tmp_path / "a.jsonl", [
+        {"card_id": "3", "price": price, "timestamp": timestamp} for timestamp, price in prices
+    ])], catalog_path)
+
+    conn = _connect(catalog_path)
+    days = price_series(conn, "3", "day")
+    assert [day["bucket_start"] for day in days] == ["2024-03-04", "2024-03-06", "2024-03-11"]
+    assert days[0] == {"bucket_start": "2024-03-04", "open": 1.0, "high": 3.0, "low": 1.0,
+                       "close": 3.0, "mean": 2.0, "samples": 2}
+    weeks = price_series(conn, "3", "week")
+    assert [(week["bucket_start"], week["open"], week["close"], week["samples"]) for week in weeks] == [
+        ("2024-03-04", 1.0, 2.0, 3), ("2024-03-11", 4.0, 4.0, 1)]
+    assert price_series(conn, "3", "day", since="2024-03-05", until="2024-03-10") == days[1:2]
+    conn.close()
+
+    # A late snapshot for an earlier week rebuilds that week's buckets
+    import_price_files([_write_jsonl(tmp_path / "b.jsonl", [
+        {"card_id": "3", "price": 0.5, "timestamp": "2024-03-05T00:00:00"}
+    ])], catalog_path)
+    conn = _connect(catalog_path)
+    week = price_series(conn, "3", "week")[0]
+    assert (week["low"], week["samples"]) == (0.5, 4)
+    conn.close()
+
+
+def test_rolling_stats_and_movers(tmp_path, catalog_path):
+    records = []
+    for card_id, start, end in (("1", 10.0, 15.0), ("2", 10.0, 5.0), ("4", 0.1, 0.5)):
+        records += [
+            {"card_id": card_id, "price": start, "timestamp": "2024-03-01"},
+            {"card_id": card_id, "price": end, "timestamp": "2024-03-10"},
+        ]
+    records.append({"card_id": "5", "price": 3.0, "timestamp": "2024-03-10"})
+    import_price_files([_write_jsonl(tmp_path / "p.jsonl", records)], catalog_path)
+
+    conn = _connect(catalog_path)
+    stats = price_stats(conn, "1")
+    assert (stats["last_price"], stats["change_7d"], stats["pct_7d"]) == (15.0, 5.0, 50.0)
+    assert stats["change_30d"] is None and stats["mean_30d"] == 12.5
+    assert price_stats(conn, "5")["change_7d"] is None
+    assert price_stats(conn, "6") is None
+
+    assert [card["id"] for card in price_movers(conn, "7d", "up")] == ["4", "1"]
+    assert [card["id"] for card in price_movers(conn, "7d", "up", min_price=1)] == ["1"]
+    assert [card["id"] for card in price_movers(conn, "7d", "down")] == ["2"]
+    conn.close()
+
+
+def test_prices_survive_a_catalog_rebuild(tmp_path, catalog_path):
+    import_price_files([_write_jsonl(tmp_path / "p.jsonl", [
+        {"card_id": "1", "price": 1.5, "timestamp": "2024-03-01"},
+        {"card_id": "15", "price": 9.0, "timestamp": "2024-03-01"},
+    ])], catalog_path)
+
+    # The new catalog no longer has card 15
+    rebuilt = str(tmp_path / "rebuilt.db")
+    build_catalog(rebuilt, 10)
+    conn = sqlite3.connect(rebuilt)
+    assert carry_over_prices(conn, catalog_path) == 1
+    assert conn.execute("SELECT card_id FROM price_stats").fetchall() == [("1",)]
+    assert conn.execute("SELECT price_usd FROM cards WHERE id = '1'").fetchone()[0] == 1.5
+    conn.close()
+
+
+def test_databases_without_price_tables_have_no_history(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE cards (id TEXT PRIMARY KEY, name TEXT)")
+    assert price_series(conn, "1") == [] and price_stats(conn, "1") is None
+    assert price_movers(conn) == []
+    conn.close()
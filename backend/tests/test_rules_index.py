@@ -0,0 +1,47 @@
+import pytest
+from src.api.rules_index import RulesIndex, normalize_term
+
+
+@pytest.fixture
+def rules_index(card_db):
+    return RulesIndex.build(card_db)
+
+
+def test_lookup_by_rule_number(rules_index):
+    rule = rules_index.lookup("7.5.11")
+    assert rule["title"] == "Sentinel"
+    assert rule["text"].startswith("Sentinel")
+    assert "can't attack your non-Sentinel units" in rule["text"]
+    assert rules_index.lookup("7.5.11.") is rule
+
+
+def test_lookup_by_glossary_term(rules_index):
+    entry = rules_index.lookup("overwhelm")
+    assert entry["term"] == "OVERWHELM"
+    assert [rule["number"] for rule in entry["rules"]] == ["7.5.7"]
+    assert rules_index.lookup("Controller")["term"] == "CONTROL, CONTROLLER"
+
+
+def test_rule_children(rules_index):
+    children = rules_index.get_rule("7.5")["children"]
+    assert "7.5.5" in children and "7.5.11" in children
+    assert children.index("7.5.5") < children.index("7.5.11")
+
+
+def test_rules_for_card(rules_index):
+    keywords = rules_index.rules_for_card("9")
+    assert [k["keyword"] for k in keywords] == ["Bounty", "Raid 2"]
+    assert keywords[1]["rules"][0]["title"] == "Raid"
+    assert rules_index.rules_for_card("5") == []
+    assert rules_index.rules_for_card("unknown") is None
+
+
+def test_unknown_references(rules_index):
+    assert rules_index.lookup("99.1") is None
+    assert rules_index.lookup("Not a keyword") is None
+
+
+def test_normalize_term():
+    assert normalize_term('"Raid 2"') == "raid"
+    assert normalize_term("Smuggle [3]") == "smuggle"
+    assert normalize_term("  Shield   Token ") == "shield token"
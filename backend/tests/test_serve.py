@@ -0,0 +1,69 @@
+import os
+import signal
+import threading
+import time
+import pytest
+from src.api import serve
+from src.api.catalog_refresh import SYNC_INTERVAL_ENV
+from src.api.serve import Supervisor, restart_delay
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def _lines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return dict(line.split() for line in f)
+
+
+@pytest.fixture
+def supervisor(tmp_path, monkeypatch):
+    """Two workers that record their sync interval and then idle."""
+    monkeypatch.setenv(SYNC_INTERVAL_ENV, "300")
+    monkeypatch.delenv(serve.METRICS_DIR_ENV, raising=False)
+    monkeypatch.setattr(serve, "RESTART_BACKOFF", 0.05)
+    log = str(tmp_path / "workers.log")
+
+    def worker(sock, log_level):
+        fd = os.open(log, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        os.write(fd, f"{os.getpid()} {os.environ[SYNC_INTERVAL_ENV]}\n".encode())
+        os.close(fd)
+        time.sleep(60)
+
+    supervisor = Supervisor(None, 2, "info", report_seconds=0, target=worker)
+    thread = threading.Thread(target=supervisor.run)
+    thread.start()
+    yield supervisor, log
+    supervisor.stop()
+    thread.join(10)
+
+
+def test_only_the_first_slot_syncs(supervisor):
+    supervisor, log = supervisor
+    _wait_for(lambda: len(_lines(log)) == 2)
+    intervals = {slot: _lines(log)[str(pid)] for pid, slot in supervisor.children.items()}
+    assert intervals == {0: "300", 1: "0"}
+
+
+def test_dead_worker_restarts_into_its_slot(supervisor):
+    supervisor, log = supervisor
+    _wait_for(lambda: len(_lines(log)) == 2)
+    pid = next(pid for pid, slot in supervisor.children.items() if slot == 1)
+    os.kill(pid, signal.SIGKILL)
+
+    _wait_for(lambda: len(_lines(log)) == 3)
+    _wait_for(lambda: sorted(supervisor.children.values()) == [0, 1])
+    assert pid not in supervisor.children and supervisor.failures == {1: 1}
+    restarted = next(pid for pid, slot in supervisor.children.items() if slot == 1)
+    assert _lines(log)[str(restarted)] == "0"
+
+
+def test_restart_delay_backs_off():
+    assert [restart_delay(n) for n in (1, 2, 3)] == [1.0, 2.0, 4.0]
+    assert restart_delay(20) == serve.RESTART_BACKOFF_MAX
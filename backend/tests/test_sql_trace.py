@@ -0,0 +1,66 @@
+import sqlite3
+import pytest
+from src.api.sql_trace import QueryTracer, TracedConnection, normalize_statement
+
+
+@pytest.fixture
+def traced_db():
+    conn = sqlite3.connect(":memory:", factory=TracedConnection)
+    conn.row_factory = sqlite3.Row
+    conn.tracer = QueryTracer(sample_rate=1.0, slow_ms=1e9)
+    conn.executescript(
+        "CREATE TABLE cards (id TEXT PRIMARY KEY, name TEXT, cost INTEGER);"
+        "CREATE INDEX idx_cards_cost ON cards(cost);"
+    )
+    conn.executemany("INSERT INTO cards VALUES (?, ?, ?)", [(str(i), f"Card {i}", i % 8) for i in range(200)])
+    yield conn
+    conn.close()
+
+
+def test_normalize_statement():
+    assert normalize_statement("SELECT *\n  FROM cards WHERE id IN (?, ?,?)") == \
+        "SELECT * FROM cards WHERE id IN (?, ...)"
+    assert normalize_statement("SELECT * FROM cards WHERE id IN (?)") == \
+        "SELECT * FROM cards WHERE id IN (?, ...)"
+    assert normalize_statement("SELECT * FROM t1 WHERE name = 'x' LIMIT 5") == \
+        "SELECT * FROM t1 WHERE name = ? LIMIT ?"
+
+
+def test_sampled_statements_are_aggregated_by_shape(traced_db):
+    for ids in (["1", "2"], ["3", "4", "5"]):
+        rows = traced_db.execute(
+            f"SELECT * FROM cards WHERE id IN ({', '.join('?' * len(ids))})", ids
+        ).fetchall()
+        assert len(rows) == len(ids)
+    list(traced_db.execute("SELECT name FROM cards WHERE cost = ?", [3]))
+
+    top = {entry["statement"]: entry for entry in traced_db.tracer.top()}
+    lookup = top["SELECT * FROM cards WHERE id IN (?, ...)"]
+    assert lookup["samples"] == 2 and lookup["rows"] == 5
+    assert lookup["total_ms"] >= lookup["max_ms"] > 0
+    assert "USING INDEX" in lookup["plan"][0]
+
+    by_cost = top["SELECT name FROM cards WHERE cost = ?"]
+    assert by_cost["rows"] == 25
+    assert by_cost["plan_fingerprint"] != lookup["plan_fingerprint"]
+
+
+def test_unsampled_statements_are_not_recorded(traced_db):
+    traced_db.tracer = QueryTracer(sample_rate=0.0)
+    assert traced_db.execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 200
+    assert traced_db.tracer.top() == []
+
+
+def test_slow_query_log(traced_db):
+    traced_db.tracer = QueryTracer(sample_rate=1.0, slow_ms=0.0, slow_log_size=2)
+    cursor = traced_db.execute("SELECT * FROM cards ORDER BY name")
+    cursor.fetchmany(10)
+    del cursor  # abandoned mid-result
+    traced_db.execute("SELECT * FROM cards WHERE cost = ?", [1]).fetchone()
+    traced_db.execute("SELECT COUNT(*) FROM cards").fetchall()
+
+    log = list(traced_db.tracer.slow_log)
+    assert len(log) == 2
+    assert log[0]["statement"] == "SELECT * FROM cards WHERE cost = ?"
+    assert log[0]["parameters"] == "[1]" and log[1]["rows"] == 1
+    assert traced_db.tracer.top(order="samples")[0]["samples"] == 1
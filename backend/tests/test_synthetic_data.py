@@ -0,0 +1,69 @@
+import sqlite3
+from collections import Counter
+from src.api.card_index import CardIndex
+from src.api.card_filters import CardFilters
+from src.api.card_queries import load_all_cards
+from src.database.synthetic_data import (
+    ALIGNMENT_ASPECTS, build_catalog, generate_cards, to_api_record
+)
+
+
+def test_generate_cards_is_deterministic():
+    assert generate_cards(300, seed=3) == generate_cards(300, seed=3)
+    assert generate_cards(300, seed=3) != generate_cards(300, seed=4)
+
+
+def test_generated_cards_follow_card_type_rules():
+    cards = generate_cards(2000)
+    types = Counter(card["type"] for card in cards)
+    assert types.most_common(1)[0][0] == "Unit"
+    assert set(types) == {"Unit", "Event", "Upgrade", "Leader", "Base"}
+
+    for card in cards:
+        aspects = [a["aspect_name"] for a in card["aspects"]]
+        if card["type"] == "Leader":
+            assert len(aspects) == 2 and any(a in ALIGNMENT_ASPECTS for a in aspects)
+            assert card["arenas"] == ["Ground"] and card["is_unique"] == 1
+        elif card["type"] == "Base":
+            assert card["energy_cost"] is None and card["health"] >= 25
+            assert card["arenas"] == []
+        elif card["type"] == "Unit":
+            assert card["arenas"] in (["Ground"], ["Space"])
+        else:
+            assert card["arenas"] == []
+
+    # Sets fill up in order
+    assert cards[0]["set_code"] == "SOR" and cards[-1]["set_code"] not in ("SOR", "SHD")
+
+
+def test_build_catalog_round_trips_through_load_all_cards(tmp_path):
+    db_path = str(tmp_path / "catalog.db")
+    cards = build_catalog(db_path, 500, seed=5)
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    loaded = {card["id"]: card for card in load_all_cards(conn)}
+    conn.close()
+
+    assert len(loaded) == 500
+    for card in cards:
+        assert loaded[card["id"]] == card
+
+    index = CardIndex(list(loaded.values()))
+    total, _ = index.query(CardFilters(type=["Leader"]))
+    assert total == sum(card["type"] == "Leader" for card in cards)
+
+
+def test_to_api_record_matches_the_card_list_shape():
+    card = next(card for card in generate_cards(200) if card["type"] == "Leader")
+    record = to_api_record(card)
+    attributes = record["attributes"]
+
+    assert record["id"] == int(card["id"])
+    assert attributes["title"] == card["name"]
+    assert attributes["type"]["data"]["attributes"]["name"] == "Leader"
+    assert attributes["expansion"]["data"]["attributes"]["code"] == card["set_code"]
+    assert attributes["artBack"]["data"]["attributes"]["url"] == card["image_back_uri"]
+    assert [a["attributes"]["name"] for a in attributes["aspects"]["data"]] == \
+        [a["aspect_name"] for a in card["aspects"]]
+    assert [t["attributes"]["name"] for t in attributes["traits"]["data"]] == card["traits"]